@@ -63,3 +63,10 @@ class BES(Common):
 
     def decrypt(self, ciphertext, header=b'', ciphertextIV=None):
         raise ErrNotImplemented
+
+    def encryptStream(self, source, destination, revokedUsers, sessionIV=None, ciphertextIV=None, sessionKey=None,
+                      chunkSizeT8=1 << 20):
+        raise ErrNotImplemented
+
+    def decryptStream(self, source, destination, header, sessionIV=None, ciphertextIV=None, chunkSizeT8=1 << 20):
+        raise ErrNotImplemented
@@ -27,7 +27,7 @@
 #  *********************************************************************************************************************
 
 from py_abstract.Common import Common
-from py_abstract.Error import ErrNotImplemented
+from py_abstract.Error import ErrNotImplemented, ErrParameters
 
 from copy import copy
 
@@ -97,6 +97,98 @@ class BlockCipher(Common):
         self.setKey(key)
         return self.decrypt(block)
 
+    def encryptInto(self, src, dst, srcOffset=0, dstOffset=0):
+        """!
+        Generic method for encryption of the block found at srcOffset in src, written at dstOffset in dst.
+        dst may be src itself (in place encryption with srcOffset == dstOffset).
+
+        @param src: (bytes, bytearray or memoryview) buffer holding the block to encrypt.
+        @param dst: (bytearray or memoryview) writable output buffer.
+        @param srcOffset: (int) optional, position of the block in src.
+        @param dstOffset: (int) optional, position of the encrypted block in dst.
+        """
+        # Comportement par défaut
+        if (srcOffset < 0) or (dstOffset < 0) or (srcOffset + self._blockSizeT8 > len(src)) \
+                or (dstOffset + self._blockSizeT8 > len(dst)):
+            raise ErrParameters
+        dst[dstOffset:dstOffset + self._blockSizeT8] = self.encrypt(src[srcOffset:srcOffset + self._blockSizeT8])
+
+    def decryptInto(self, src, dst, srcOffset=0, dstOffset=0):
+        """!
+        Generic method for decryption of the block found at srcOffset in src, written at dstOffset in dst.
+        dst may be src itself (in place decryption with srcOffset == dstOffset).
+
+        @param src: (bytes, bytearray or memoryview) buffer holding the block to decrypt.
+        @param dst: (bytearray or memoryview) writable output buffer.
+        @param srcOffset: (int) optional, position of the block in src.
+        @param dstOffset: (int) optional, position of the decrypted block in dst.
+        """
+        # Comportement par défaut
+        if (srcOffset < 0) or (dstOffset < 0) or (srcOffset + self._blockSizeT8 > len(src)) \
+                or (dstOffset + self._blockSizeT8 > len(dst)):
+            raise ErrParameters
+        dst[dstOffset:dstOffset + self._blockSizeT8] = self.decrypt(src[srcOffset:srcOffset + self._blockSizeT8])
+
+    def encryptBlocks(self, blocks):
+        """!
+        Generic method for encryption of several independent blocks (e.g. ECB or CTR keystream).
+        Backends faster on many blocks override this method.
+
+        @param blocks: (list of bytes or bytearray, or bytes, bytearray or memoryview) blocks to encrypt, either as a
+        list of blocks or as a buffer whose size is a multiple of the block size.
+        @return:(bytearray) concatenation of the encrypted blocks.
+        """
+        # Comportement par défaut
+        if isinstance(blocks, list):
+            blocks = b''.join(blocks)
+        if (len(blocks) % self._blockSizeT8) != 0:
+            raise ErrParameters
+        output = bytearray(len(blocks))
+        for offset in range(0, len(blocks), self._blockSizeT8):
+            self.encryptInto(blocks, output, offset, offset)
+        return output
+
+    def decryptBlocks(self, blocks):
+        """!
+        Generic method for decryption of several independent blocks (e.g. ECB or CBC decryption).
+        Backends faster on many blocks override this method.
+
+        @param blocks: (list of bytes or bytearray, or bytes, bytearray or memoryview) blocks to decrypt, either as a
+        list of blocks or as a buffer whose size is a multiple of the block size.
+        @return:(bytearray) concatenation of the decrypted blocks.
+        """
+        # Comportement par défaut
+        if isinstance(blocks, list):
+            blocks = b''.join(blocks)
+        if (len(blocks) % self._blockSizeT8) != 0:
+            raise ErrParameters
+        output = bytearray(len(blocks))
+        for offset in range(0, len(blocks), self._blockSizeT8):
+            self.decryptInto(blocks, output, offset, offset)
+        return output
+
+    def encryptUnderKeys(self, keys, blocks):
+        """!
+        Generic method for encryption of the same blocks under each key of a list.
+        The key loaded after the call is unspecified.
+
+        @param keys: (list of bytes or bytearray) keys.
+        @param blocks: (bytes or bytearray) blocks to encrypt, size multiple of the block size.
+        @return:(bytearray) concatenation, for each key, of the encrypted blocks.
+        """
+        # Comportement par défaut
+        blocksSizeT8 = len(blocks)
+        if (blocksSizeT8 % self._blockSizeT8) != 0:
+            raise ErrParameters
+        output = bytearray(blocksSizeT8 * len(keys))
+        offset = 0
+        for key in keys:
+            self.setKey(key)
+            for blockOffset in range(0, blocksSizeT8, self._blockSizeT8):
+                output[offset:offset + self._blockSizeT8] = self.encrypt(blocks[blockOffset:blockOffset + self._blockSizeT8])
+                offset += self._blockSizeT8
+        return output
+
     def getKeySizeT8(self):
         """!
         Returns the key size in bytes.
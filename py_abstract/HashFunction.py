@@ -66,6 +66,24 @@ class HashFunction(Common):
         """
         raise ErrNotImplemented
 
+    def copy(self):
+        """!
+        Abstract method returning an independent copy of the hash function, including the state of the current
+        computation (e.g. to reuse the state reached after absorbing a common prefix).
+
+        @return: (HashFunction) copy.
+        """
+        raise ErrNotImplemented
+
+    def clone(self):
+        """!
+        Generic method returning an independent copy of the hash function, alias of the copy method.
+
+        @return: (HashFunction) copy.
+        """
+        # Comportement par défaut
+        return self.copy()
+
     def oneShot(self, message, messageSizeT1=None):
         """!
         Generic method for computing the digest in one-shot.
@@ -175,3 +175,27 @@ class ModeC(Common):
         endPlaintext = self.decryptFinal()
         return plaintext + endPlaintext
 
+    def encryptOneShotManyKeys(self, IV, plaintext, keys, plaintextSizeT1=None):
+        """!
+        Generic method for encryption in one-shot of the same message under each key of a list.
+        Typically used to wrap a session key under many keys.
+        The key loaded after the call is unspecified.
+
+        @param IV: (bytes or bytearray) IV, common to all keys.
+        @param plaintext: (bytes or bytearray) message to encrypt.
+        @param keys: (list of bytes or bytearray) keys.
+        @param plaintextSizeT1: (int) optional, message size in bits.
+        @return:(bytearray) concatenation, for each key, of the ciphertexts.
+        """
+        # Comportement par défaut
+        if len(keys) == 0:
+            return bytearray(0)
+        ciphertext = self.encryptOneShot(IV, plaintext, keys[0], plaintextSizeT1)
+        ciphertextSizeT8 = len(ciphertext)
+        output = bytearray(ciphertextSizeT8 * len(keys))  # Allocation unique de la sortie
+        output[:ciphertextSizeT8] = ciphertext
+        offset = ciphertextSizeT8
+        for key in keys[1:]:
+            output[offset:offset + ciphertextSizeT8] = self.encryptOneShot(IV, plaintext, key, plaintextSizeT1)
+            offset += ciphertextSizeT8
+        return output
@@ -30,6 +30,7 @@ from py_abstract.BES import BES
 from py_abstract.ModeC import ModeC
 from py_abstract.KDM import KDM
 from py_abstract.Error import *
+from py_public.Stream.ModeStream import ModeStream
 from py_public.Toolbox.ByteArrayTools import ByteArray_fromInt, ByteArray_toInt
 
 from math import log2, ceil
@@ -197,27 +198,66 @@ class NNL01_SD(BES):
         @param plaintextSizeT1: (int) optional, size of the plaintext in bits.
         @return: (bytes or bytearray, bytes or bytearray) ciphertext, header.
         """
+        if ciphertextIV is None:
+            ciphertextIV = sessionIV
+
+        ciphertext, header = self._encryptSessionKey(revokedUsers, sessionIV, sessionKey)
+        ciphertext += self._modeC.encryptOneShot(ciphertextIV, plaintext, sessionKey, plaintextSizeT1)  # Données utiles
+        return ciphertext, header
+
+    def encryptStream(self, source, destination, revokedUsers, sessionIV=None, ciphertextIV=None, sessionKey=None,
+                      chunkSizeT8=1 << 20):
+        """!
+        Encrypts a plaintext read from a source such that only authorized users can decrypt.
+        The encrypted session keys are written first to the destination, then the payload is encrypted chunk by
+        chunk: the plaintext is never loaded in full. The output is the same as the ciphertext of the encrypt method.
+        Only the master can run this method.
+
+        @param source: (str, os.PathLike, file object, bytes-like object or iterable of bytes) plaintext.
+        @param destination: (str, os.PathLike or writable file object) output of the ciphertext.
+        @param revokedUsers: (list of int) list of revoked users.
+        @param sessionIV: (bytes or bytearray) optional, IV for encrypting the key session.
+        @param ciphertextIV: (bytes or bytearray) optional, IV for encrypting the payload.
+        @param sessionKey: (bytes or bytearray) optional, key session.
+        @param chunkSizeT8: (int) optional, size in bytes of the chunks read from the source.
+        @return: (bytes or bytearray) header.
+        """
+        if ciphertextIV is None:
+            ciphertextIV = sessionIV
+
+        encryptedSessionKeys, header = self._encryptSessionKey(revokedUsers, sessionIV, sessionKey)
+        self._modeC.setKey(sessionKey)
+        self._modeC.encryptInit(ciphertextIV)
+        ModeStream(self._modeC, chunkSizeT8).encrypt(source, destination, prefix=encryptedSessionKeys)
+        return header
+
+    def _encryptSessionKey(self, revokedUsers, sessionIV, sessionKey):
+        """!
+        Calcule la couverture des utilisateurs autorisés et chiffre la clé de session pour chacun de ses sous-ensembles.
+
+        @param revokedUsers: (list of int) utilisateurs révoqués.
+        @param sessionIV: (bytes ou bytearray) IV de chiffrement de la clé de session.
+        @param sessionKey: (bytes ou bytearray) clé de session.
+        @return: (bytearray, bytes ou bytearray) clés de session chiffrées concaténées, header.
+        """
         if self._user != "master":
             raise ErrSequence
         if sessionKey is None:
             raise ErrNotImplemented
         if sessionIV is None:
             raise ErrNotImplemented
-        if ciphertextIV is None:
-            ciphertextIV = sessionIV
 
         header = b''
-        ciphertext = b''
+        wrappingKeys = []  # Clés de chiffrement de la clé de session
 
         # S'il n'y a pas d'utilisateur révoqué
         if len(revokedUsers) == 0:
             self._kdm.extract(self._treeLabels[0], self._fixedParameters['kdm-salt'])  # Calcul de la clé globale
             globalKey = self._kdm.expand(self._keySizeT8 * 8, self._fixedParameters['kdm-fixedInfoMiddle'])
-            ciphertext += self._sessionModeC.encryptOneShot(sessionIV, sessionKey,
-                                                            key=globalKey)  # Chiffrement de la clé de session
+            wrappingKeys.append(globalKey)
 
         # S'il y a des utilisateurs révoqués (sans effet sinon)
-        subsets = _buildSubsets(_buildSteinerTree(self._nbUsers, revokedUsers))
+        subsets = _buildSubsets(_buildSteinerTree(self._nbUsers, revokedUsers), self._nbUsers)
         for (i, j) in subsets:  # Pour chaque S_(i,j)
             currentLabel = self._treeLabels[i]  # label_i
             path = _getPath(i, j)  # Chemin de i à j. 0 pour gauche, 1 pour droite
@@ -239,11 +279,10 @@ class NNL01_SD(BES):
             header += ByteArray_fromInt(i,
                                         self._nodeIndexSizeT8)  # Concaténation de (i,j) dans le header à optimiser
             header += ByteArray_fromInt(j, self._nodeIndexSizeT8)
-            ciphertext += self._sessionModeC.encryptOneShot(sessionIV, sessionKey,
-                                                            key=Lij)  # Chiffrement de la clé de session avec L_(i,j)
+            wrappingKeys.append(Lij)
 
-        ciphertext += self._modeC.encryptOneShot(ciphertextIV, plaintext, sessionKey, plaintextSizeT1)  # Données utiles
-        return ciphertext, header
+        # Chiffrement de la clé de session avec chaque L_(i,j) (ou avec la clé globale)
+        return self._sessionModeC.encryptOneShotManyKeys(sessionIV, sessionKey, wrappingKeys), header
 
     def _decryptSessionKey(self, ciphertext, header, sessionIV=None):
         if self._user == "master":
@@ -321,12 +360,50 @@ class NNL01_SD(BES):
         if sessionKey is None:  # Utilisateur révoqué
             return b'', False
 
-        # Récupération et déchiffrement des données utiles
+        # Récupération et déchiffrement des données utiles, sans copie du chiffré
+        payload = memoryview(ciphertext)[self._getNbSubsets(header) * self._keySizeT8:]
+        plaintext = self._modeC.decryptOneShot(ciphertextIV, payload, key=sessionKey)
+        return plaintext, True
+
+    def decryptStream(self, source, destination, header, sessionIV=None, ciphertextIV=None, chunkSizeT8=1 << 20):
+        """!
+        Decrypts a ciphertext read from a source if the user is authorized and returns the decryption flag.
+        Only the encrypted session keys are read before the decryption, then the payload is decrypted chunk by
+        chunk: the ciphertext is never loaded in full. If the user is revoked, nothing is written to the destination.
+        Only a user can run this method.
+
+        @param source: (str, os.PathLike, file object, bytes-like object or iterable of bytes) ciphertext.
+        @param destination: (str, os.PathLike or writable file object) output of the plaintext.
+        @param header: (bytes or byterray) header containing decryption information.
+        @param sessionIV: (bytes or byterray) optional, IV for the decrypting the key session.
+        @param ciphertextIV: (bytes or byterray) optional, IV for the decrypting the payload.
+        @param chunkSizeT8: (int) optional, size in bytes of the chunks read from the source.
+        @return: (Boolean) decryption flag.
+        """
+        if ciphertextIV is None:
+            ciphertextIV = sessionIV
+
+        stream = ModeStream(self._modeC, chunkSizeT8)
+        encryptedSessionKeys, payload = stream.readPrefix(source, self._getNbSubsets(header) * self._keySizeT8)
+        sessionKey = self._decryptSessionKey(encryptedSessionKeys, header, sessionIV)
+        if sessionKey is None:  # Utilisateur révoqué
+            return False
+
+        self._modeC.setKey(sessionKey)
+        self._modeC.decryptInit(ciphertextIV)
+        return stream.decrypt(payload, destination)
+
+    def _getNbSubsets(self, header):
+        """!
+        Nombre de sous-ensembles S_(i,j) du header, c'est-à-dire de clés de session chiffrées.
+
+        @param header: (bytes ou bytearray) header.
+        @return: (int) nombre de clés de session chiffrées.
+        """
         nbSubsets = len(header) // (2 * self._nodeIndexSizeT8)
         if nbSubsets == 0:  # Cas particulier: header vide car pas d'utilisateurs révoqué
             nbSubsets = 1
-        plaintext = self._modeC.decryptOneShot(ciphertextIV, ciphertext[nbSubsets * self._keySizeT8:], key=sessionKey)
-        return plaintext, True
+        return nbSubsets
 
 
 def _userToNode(nbUsers, user):
@@ -366,55 +443,57 @@ def _getPath(i, j):
 def _buildSteinerTree(nbUsers, revokedUsers, SteinerTree=None):
     """!
     Génération ou mise à jour de l'arbre de Steiner des utilisateurs révoqués.
+    L'arbre est stocké de manière creuse : seuls les noeuds marqués sont conservés, la mémoire utilisée est donc
+    proportionnelle au nombre d'utilisateurs révoqués et non au nombre total d'utilisateurs.
 
     @param nbUsers: (int) nombre d'utilisateurs, i.e. feuilles de l'arbre binaire complet.
     @param revokedUsers: (list of int) liste des utilisateurs révoqués ou nouvellement révoqués.
-    @param SteinerTree: (list of Booleans) optionnel, arbre de Steiner à mettre à jour.
-    @return:(list of Booleans) arbre de Steiner
+    @param SteinerTree: (set of int) optionnel, arbre de Steiner à mettre à jour.
+    @return:(set of int) arbre de Steiner, i.e. ensemble des noeuds marqués.
     """
     if SteinerTree is None:
-        SteinerTree = [0] * (2 * nbUsers - 1)  # Arbre vide à l'initialisation
+        SteinerTree = set()  # Arbre vide à l'initialisation
     for user in revokedUsers:
         node = _userToNode(nbUsers, user)  # Position de l'utilisateur dans l'arbre (feuille)
-        while node is not None and SteinerTree[node] == 0:
-            SteinerTree[node] = 1  # Noeud ajoutée à l'arbre de Steiner
+        while node is not None and node not in SteinerTree:
+            SteinerTree.add(node)  # Noeud ajouté à l'arbre de Steiner
             node = _getParentNode(node)  # Noeud parent
     return SteinerTree
 
 
-def _buildSubsets(SteinerTree):
+def _buildSubsets(SteinerTree, nbUsers):
     """!
     Génération des subsets S_(i,j) à partir de l'arbre de Steiner.
+    Seuls les noeuds marqués de l'arbre sont parcourus.
 
-    @param SteinerTree: (list of Booleans) arbre de Steiner
+    @param SteinerTree: (set of int) arbre de Steiner, i.e. ensemble des noeuds marqués.
+    @param nbUsers: (int) nombre d'utilisateurs, i.e. feuilles de l'arbre binaire complet.
     @return:(list of (i,j) as integers) liste des couples (i,j).
     """
     # Cas particulier, SteinerTree vide
-    if SteinerTree[0] == 0:
+    if 0 not in SteinerTree:
         return []
 
     # Cas général
+    firstLeaf = nbUsers - 1  # Index de la première feuille
     subsets = []
     # Pile de taille max la profondeur de l'arbre
     stack = [0]  # racine de l'arbre à l'initialisation
-    while len(stack) > 0:
-        node = stack.pop()  # début de la chaine maximale de degrée 1
-        start = node
-        stop = None
-        while stop is None:
-            if 2 * node + 1 >= len(SteinerTree):  # Si le noeud est une feuille
-                stop = node  # Fin de la chaine maximale de degrée 1
-                if start != stop:
-                    subsets.append((start, stop))  # Subset (i,j)
-            elif SteinerTree[_getLeftChild(node)] and SteinerTree[_getRightChild(node)]:  # Si le noeud et de degrée 2
-                stack += [_getRightChild(node), _getLeftChild(node)]  # Noeuds fils à explorer
-                stop = node  # Fin de la chaine maximale de degrée 1
-                if start != stop:
-                    subsets.append((start, stop))  # Subset (i,j)
-            elif SteinerTree[_getLeftChild(node)]:  # Degrée 1, fils gauche seulement
-                node = _getLeftChild(node)
-            elif SteinerTree[_getRightChild(node)]:  # Degrée 1, fils droit seulement
-                node = _getRightChild(node)
+    while stack:
+        start = node = stack.pop()  # début de la chaine maximale de degrée 1
+        while node < firstLeaf:  # Tant que le noeud n'est pas une feuille
+            left = 2 * node + 1
+            right = left + 1
+            if left in SteinerTree:
+                if right in SteinerTree:  # Si le noeud est de degrée 2
+                    stack.append(right)  # Noeuds fils à explorer
+                    stack.append(left)
+                    break  # Fin de la chaine maximale de degrée 1
+                node = left  # Degrée 1, fils gauche seulement
+            else:
+                node = right  # Degrée 1, fils droit seulement
+        if start != node:
+            subsets.append((start, node))  # Subset (i,j)
     return subsets
 
 
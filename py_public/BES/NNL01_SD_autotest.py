@@ -26,14 +26,15 @@
 #  Classification : OPEN
 #  *********************************************************************************************************************
 
-from py_public.BES.NNL01_SD import NNL01_SD
+from py_public.BES.NNL01_SD import NNL01_SD, _buildSteinerTree, _buildSubsets, _userToNode, _getParentNode
 from py_public.BlockCipher.AES import AES256
 from py_public.ModeC.CTR import CTR
 from py_public.HashFunction.HashFunction_hashlib import SHA256
 from py_public.ModeI.HMAC import HMAC
 from py_public.KDF.SP800_108_CTR import SP800_108_CTR
 from py_public.KDM.SP800_56C_twoSteps import SP800_56C_twoSteps
-from random import randint
+from random import randint, sample
+from io import BytesIO
 
 kdf = SP800_108_CTR(HMAC(SHA256()), 16)
 kdm = SP800_56C_twoSteps(HMAC(SHA256()), kdf)
@@ -88,3 +89,95 @@ for n in range(1, 21):  # 20 tests aléatoires
             raise Exception("Autotest NNL01_SD : erreur vecteur interne (utilisateur révoqué)\n" + str(revokedUsers))
         if i not in revokedUsers and (plaintext != b'message' or flag != True):
             raise Exception("Autotest NNL01_SD : erreur vecteur interne (utilisateur autorisé)\n" + str(revokedUsers))
+
+"""
+Partie 2 : Chiffrement par flux.
+Le chiffré écrit par encryptStream est identique à celui de encrypt, et decryptStream déchiffre depuis un fichier, un
+memoryview ou un itérable de morceaux.
+"""
+
+message = bytes(range(256)) * 40 + b'fin'
+revokedUsers = [3, 17, 64, 100]
+ciphertext, header = besMaster.encrypt(message, revokedUsers, sessionIV, sessionKey=sessionKey)
+
+output = BytesIO()
+headerStream = besMaster.encryptStream(BytesIO(message), output, revokedUsers, sessionIV, sessionKey=sessionKey,
+                                       chunkSizeT8=1000)
+if output.getvalue() != ciphertext or headerStream != header:
+    raise Exception("Autotest NNL01_SD : erreur chiffrement par flux")
+
+for i in [0, 3, 17, 42, 127]:
+    chunks = [ciphertext[k:k + 333] for k in range(0, len(ciphertext), 333)]
+    for source in [BytesIO(ciphertext), memoryview(ciphertext), chunks]:
+        output = BytesIO()
+        flag = besUser[i].decryptStream(source, output, header, sessionIV, chunkSizeT8=1000)
+        if i in revokedUsers and (output.getvalue() != b'' or flag != False):
+            raise Exception("Autotest NNL01_SD : erreur déchiffrement par flux (utilisateur révoqué)")
+        if i not in revokedUsers and (output.getvalue() != message or flag != True):
+            raise Exception("Autotest NNL01_SD : erreur déchiffrement par flux (utilisateur autorisé)")
+
+
+"""
+Partie 3 : Arbre de Steiner creux.
+L'arbre de Steiner stocké sous forme d'ensemble de noeuds marqués et les subsets qui en sont déduits sont identiques à
+ceux de la construction par tableau de 2 * nbUsers - 1 noeuds, pour des ensembles aléatoires d'utilisateurs révoqués,
+aucun révoqué, tous révoqués, et pour un arbre mis à jour par des révocations successives.
+"""
+
+
+def _buildDenseSteinerTree(nbUsers, revokedUsers, SteinerTree=None):
+    # Construction de référence : tableau de tous les noeuds de l'arbre binaire complet
+    if SteinerTree is None:
+        SteinerTree = [0] * (2 * nbUsers - 1)
+    for user in revokedUsers:
+        node = _userToNode(nbUsers, user)
+        while node is not None and SteinerTree[node] == 0:
+            SteinerTree[node] = 1
+            node = _getParentNode(node)
+    return SteinerTree
+
+
+def _buildDenseSubsets(SteinerTree):
+    if SteinerTree[0] == 0:
+        return []
+    subsets = []
+    stack = [0]
+    while len(stack) > 0:
+        node = stack.pop()
+        start = node
+        stop = None
+        while stop is None:
+            if 2 * node + 1 >= len(SteinerTree):  # Feuille
+                stop = node
+                if start != stop:
+                    subsets.append((start, stop))
+            elif SteinerTree[2 * node + 1] and SteinerTree[2 * node + 2]:  # Degré 2
+                stack += [2 * node + 2, 2 * node + 1]
+                stop = node
+                if start != stop:
+                    subsets.append((start, stop))
+            elif SteinerTree[2 * node + 1]:  # Degré 1, fils gauche
+                node = 2 * node + 1
+            elif SteinerTree[2 * node + 2]:  # Degré 1, fils droit
+                node = 2 * node + 2
+    return subsets
+
+
+for nbUsers in [1, 2, 8, 64, 1024]:
+    revokedSets = [[], list(range(nbUsers))] + [sample(range(nbUsers), randint(1, nbUsers)) for _ in range(20)]
+    for revokedUsers in revokedSets:
+        SteinerTree = _buildSteinerTree(nbUsers, revokedUsers)
+        denseSteinerTree = _buildDenseSteinerTree(nbUsers, revokedUsers)
+        if SteinerTree != {node for node in range(2 * nbUsers - 1) if denseSteinerTree[node]}:
+            raise Exception("Autotest NNL01_SD : erreur arbre de Steiner creux\n" + str(revokedUsers))
+        if _buildSubsets(SteinerTree, nbUsers) != _buildDenseSubsets(denseSteinerTree):
+            raise Exception("Autotest NNL01_SD : erreur subsets de l'arbre de Steiner creux\n" + str(revokedUsers))
+
+    # Mise à jour de l'arbre par révocations successives
+    SteinerTree = None
+    denseSteinerTree = None
+    for revokedUsers in revokedSets[2:]:
+        SteinerTree = _buildSteinerTree(nbUsers, revokedUsers, SteinerTree)
+        denseSteinerTree = _buildDenseSteinerTree(nbUsers, revokedUsers, denseSteinerTree)
+        if _buildSubsets(SteinerTree, nbUsers) != _buildDenseSubsets(denseSteinerTree):
+            raise Exception("Autotest NNL01_SD : erreur mise à jour de l'arbre de Steiner creux")
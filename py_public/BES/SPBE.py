@@ -292,6 +292,7 @@ from py_abstract.BES import BES
 from py_abstract.ModeC import ModeC
 from py_abstract.KDM import KDM
 from py_public.Toolbox.ByteArrayTools import ByteArray_fromInt, ByteArray_toInt
+from py_public.Stream.ModeStream import ModeStream
 
 
 class SPBE(BES):
@@ -399,14 +400,57 @@ class SPBE(BES):
         @param plaintextSizeT1: (int) optional, size of the plaintext in bits.
         @return: (bytes or bytearray, bytes or bytearray) ciphertext, header.
         """
+        if ciphertextIV is None:
+            ciphertextIV = sessionIV
+
+        ciphertext, header = self._encryptSessionKey(revokedUsers, sessionIV, sessionKey, timeLimit)
+        ciphertext += self._modeC.encryptOneShot(ciphertextIV, plaintext, sessionKey, plaintextSizeT1)  # payload
+        return ciphertext, header
+
+    def encryptStream(self, source, destination, revokedUsers, sessionIV=None, ciphertextIV=None, sessionKey=None,
+                      chunkSizeT8=1 << 20, timeLimit=60):
+        """!
+        Encrypts a plaintext read from a source such that only authorized users can decrypt.
+        The encrypted session keys are written first to the destination, then the payload is encrypted chunk by
+        chunk: the plaintext is never loaded in full. The output is the same as the ciphertext of the encrypt method.
+        Only the master can run this method.
+
+        @param source: (str, os.PathLike, file object, bytes-like object or iterable of bytes) plaintext.
+        @param destination: (str, os.PathLike or writable file object) output of the ciphertext.
+        @param revokedUsers: (list of int) list of revoked users.
+        @param sessionIV: (bytes or bytearray) optional, IV for encrypting the key session.
+        @param ciphertextIV: (bytes or bytearray) optional, IV for encrypting the payload.
+        @param sessionKey: (bytes or bytearray) optional, key session.
+        @param chunkSizeT8: (int) optional, size in bytes of the chunks read from the source.
+        @param timeLimit: (int) optional, time limit in seconds of the search of the minimal subset of implicants.
+        @return: (bytes or bytearray) header.
+        """
+        if ciphertextIV is None:
+            ciphertextIV = sessionIV
+
+        encryptedSessionKeys, header = self._encryptSessionKey(revokedUsers, sessionIV, sessionKey, timeLimit)
+        self._modeC.setKey(sessionKey)
+        self._modeC.encryptInit(ciphertextIV)
+        ModeStream(self._modeC, chunkSizeT8).encrypt(source, destination, prefix=encryptedSessionKeys)
+        return header
+
+    def _encryptSessionKey(self, revokedUsers, sessionIV, sessionKey, timeLimit):
+        """!
+        Computes the minimal sum-product decomposition of the authorized users and encrypts the session key under the
+        key of each product term.
+
+        @param revokedUsers: (list of int) list of revoked users.
+        @param sessionIV: (bytes or bytearray) IV for encrypting the key session.
+        @param sessionKey: (bytes or bytearray) key session.
+        @param timeLimit: (int) time limit in seconds of the search of the minimal subset of implicants.
+        @return: (bytearray, bytearray) concatenated encrypted session keys, header.
+        """
         if self._user != "master":
             raise ErrSequence
         if sessionKey is None:
             raise ErrNotImplemented
         if sessionIV is None:
             raise ErrNotImplemented
-        if ciphertextIV is None:
-            ciphertextIV = sessionIV
 
         tt = [1] * self._nbUsers  # Generation of the truth table
         for revokedUser in revokedUsers:
@@ -416,7 +460,7 @@ class SPBE(BES):
         implicants = _getMinimalImplicants(implicants, chart, timeLimit=timeLimit)  # Search the minimal subset
 
         header = len(implicants)  # number of product terms of f (see Section 5.3)
-        ciphertext = b''
+        wrappingKeys = []
         for implicant in implicants:  # for each product term
             header <<= self._logNbUsers * 2
             header |= implicant.encode()  # encoding of the current product term (see Section 5.3)
@@ -426,16 +470,15 @@ class SPBE(BES):
                 if implicant[i] is not None:
                     concatenatedLabel += self._labels[i][implicant[i]]  # Concatenate label K_i^j
             derivedKey = self._kdm.expand(self._keySizeT8 * 8, label=concatenatedLabel)
-            ciphertext += self._sessionModeC.encryptOneShot(sessionIV, sessionKey,
-                                                            key=derivedKey)  # Encrypt the session key
+            wrappingKeys.append(derivedKey)
 
-        ciphertext += self._modeC.encryptOneShot(ciphertextIV, plaintext, sessionKey, plaintextSizeT1)  # payload
+        encryptedSessionKeys = self._sessionModeC.encryptOneShotManyKeys(sessionIV, sessionKey, wrappingKeys)
         headerSizeT1 = len(implicants) * 2 * self._logNbUsers + self._logNbUsers
         if headerSizeT1 % 8 != 0:  # padding of the incomplete byte
             header <<= 8 - (headerSizeT1 % 8)
         header = ByteArray_fromInt(header, (headerSizeT1 + 7) // 8)
 
-        return ciphertext, header
+        return encryptedSessionKeys, header
 
     def decrypt(self, ciphertext, header, sessionIV=None, ciphertextIV=None):
         """!
@@ -452,6 +495,51 @@ class SPBE(BES):
         if ciphertextIV is None:
             ciphertextIV = sessionIV
 
+        implicants = self._parseHeader(header)
+        sessionKey = self._decryptSessionKey(ciphertext, implicants, sessionIV)
+        if sessionKey is None:
+            return b'', False  # Revoked user
+
+        payload = memoryview(ciphertext)[len(implicants) * self._keySizeT8:]  # payload, without copy
+        plaintext = self._modeC.decryptOneShot(ciphertextIV, payload, key=sessionKey)
+        return plaintext, True
+
+    def decryptStream(self, source, destination, header, sessionIV=None, ciphertextIV=None, chunkSizeT8=1 << 20):
+        """!
+        Decrypts a ciphertext read from a source if the user is authorized and returns the decryption flag.
+        Only the encrypted session keys are read before the decryption, then the payload is decrypted chunk by
+        chunk: the ciphertext is never loaded in full. If the user is revoked, nothing is written to the destination.
+        Only a user can run this method.
+
+        @param source: (str, os.PathLike, file object, bytes-like object or iterable of bytes) ciphertext.
+        @param destination: (str, os.PathLike or writable file object) output of the plaintext.
+        @param header: (bytes or byterray) header containing decryption information.
+        @param sessionIV: (bytes or byterray) optional, IV for the decrypting the key session.
+        @param ciphertextIV: (bytes or byterray) optional, IV for the decrypting the payload.
+        @param chunkSizeT8: (int) optional, size in bytes of the chunks read from the source.
+        @return: (Boolean) decryption flag.
+        """
+        if ciphertextIV is None:
+            ciphertextIV = sessionIV
+
+        implicants = self._parseHeader(header)
+        stream = ModeStream(self._modeC, chunkSizeT8)
+        encryptedSessionKeys, payload = stream.readPrefix(source, len(implicants) * self._keySizeT8)
+        sessionKey = self._decryptSessionKey(encryptedSessionKeys, implicants, sessionIV)
+        if sessionKey is None:
+            return False  # Revoked user
+
+        self._modeC.setKey(sessionKey)
+        self._modeC.decryptInit(ciphertextIV)
+        return stream.decrypt(payload, destination)
+
+    def _parseHeader(self, header):
+        """!
+        Parses the product terms encoded in a header.
+
+        @param header: (bytes or byterray) header containing decryption information.
+        @return: (list of Implicant) product terms, in the order of the encrypted session keys.
+        """
         nbImplicants = 0x00  # Recover the number of product terms
         for i in range((self._logNbUsers + 7) // 8):
             nbImplicants <<= 8
@@ -469,8 +557,18 @@ class SPBE(BES):
         for i in range(nbImplicants):
             implicants[-i - 1] = _decodeImplicant(header & mask, self._logNbUsers)  # warning, parsed in reversed order
             header >>= self._logNbUsers * 2
+        return implicants
 
-        sessionKey = None
+    def _decryptSessionKey(self, encryptedSessionKeys, implicants, sessionIV):
+        """!
+        Finds the product term covering the user and decrypts the session key.
+
+        @param encryptedSessionKeys: (bytes, bytearray or memoryview) concatenated encrypted session keys (possibly
+        followed by the payload).
+        @param implicants: (list of Implicant) product terms of the header.
+        @param sessionIV: (bytes or byterray) IV for the decrypting the key session.
+        @return: (bytearray) session key, None if the user is revoked.
+        """
         for i in range(len(implicants)):  # decryption of the session key
             implicant = implicants[i]
             if implicant.covers(self._user):  # matching product term found
@@ -481,10 +579,7 @@ class SPBE(BES):
                     if self._key[j][0] == implicant.encode():
                         implicantKey = self._key[j][1]
                     j += 1
-                encryptedSessionKey = ciphertext[i * self._keySizeT8: (i + 1) * self._keySizeT8]  # decryption
-                sessionKey = self._sessionModeC.decryptOneShot(sessionIV, encryptedSessionKey, key=implicantKey)
-                plaintext = self._modeC.decryptOneShot(ciphertextIV, ciphertext[nbImplicants * self._keySizeT8:],
-                                                       key=sessionKey)
-                return plaintext, True
+                encryptedSessionKey = encryptedSessionKeys[i * self._keySizeT8: (i + 1) * self._keySizeT8]  # decryption
+                return self._sessionModeC.decryptOneShot(sessionIV, encryptedSessionKey, key=implicantKey)
 
-        return b'', False  # Revoked user
+        return None  # Revoked user
@@ -26,7 +26,9 @@
 #  Classification : OPEN
 #  *********************************************************************************************************************
 
+from collections import OrderedDict
 from copy import copy
+from struct import pack_into, unpack, unpack_from
 
 from py_abstract.BlockCipher import BlockCipher
 from py_abstract.Error import *
@@ -34,16 +36,25 @@ from py_public.Toolbox.ByteArrayTools import ByteArray_XOR, ByteArray_LROT
 
 
 class AES(BlockCipher):
-    def __init__(self, keySizeT8):
+    def __init__(self, keySizeT8, tTables=False, keyCacheSize=0):
         """!
         AES block cipher.
         Standard defined in FIPS 197.
 
         @param keySizeT8: (int) size of the key in bytes (16, 24 or 32).
+        @param tTables: (Boolean) optional, uses the 32-bit T-tables engine instead of the byte-oriented one.
+        @param keyCacheSize: (int) optional, number of expanded keys kept in a LRU cache (no cache by default).
         """
         name = "AES" + str(keySizeT8*8)
         super().__init__(name, keySizeT8, 16)
-        self._roundKeys = []
+        self._roundKeys = ()
+        self._tTables = tTables
+        self._encryptionWords = ()  # Clés de tour en mots de 32 bits (moteur T-tables)
+        self._decryptionWords = ()  # Clés de tour du déchiffrement équivalent (moteur T-tables)
+        if keyCacheSize < 0:
+            raise ErrParameters
+        self._keyCacheSize = keyCacheSize
+        self._keyCache = OrderedDict()  # Cache LRU clé -> (roundKeys, encryptionWords, decryptionWords)
         if keySizeT8 == 16:
             self._nbRounds = 10
         elif keySizeT8 == 24:
@@ -61,30 +72,36 @@ class AES(BlockCipher):
         """
         if len(key) != self._keySizeT8:
             raise ErrParameters
-        # RAZ des clés de tour
-        self._roundKeys = []
-
-        # Cadencement de clé
-        N = int(self._keySizeT8 / 4)
-        W = [bytearray(4) for i in range(4 * self._nbRounds + 4)]
-        for i in range(4 * self._nbRounds + 4):
-            if i < N:  # Copie de la clé initiale
-                W[i] = bytearray(key[4 * i: 4 * i + 4])
-            elif (i % N) == 0:
-                W[i] = ByteArray_LROT(W[i - 1])  # Rotation
-                for j in range(4):  # SBox
-                    W[i][j] = _SBox[W[i][j]]
-                W[i][0] ^= _Rcon[int(i / N)]  # xor Rcon
-                ByteArray_XOR(W[i], W[i - N], W[i])  # xor round précédent
-            elif (self._keySizeT8 == 32) and ((i % N) == 4):
-                for j in range(4):  # SBox
-                    W[i][j] = _SBox[W[i - 1][j]]
-                ByteArray_XOR(W[i], W[i - N], W[i])  # xor round précédent
-            else:
-                ByteArray_XOR(W[i - 1], W[i - N], W[i])  # xor round précédent
-
-            if (i % 4) == 3:  # chargement clé de tour
-                self._roundKeys.append(W[i - 3] + W[i - 2] + W[i - 1] + W[i])
+        self._roundKeys, self._encryptionWords, self._decryptionWords = self._getKeySchedule(key)
+
+    def _getKeySchedule(self, key):
+        """!
+        Returns the expanded key, from the LRU cache if possible.
+        The expanded key is immutable and can be shared between the cache and the current key.
+
+        @param key: (bytes ou bytearray) key.
+        @return: (tuple of bytes, tuple of int, tuple of int) round keys, and their 32-bit words for encryption and
+        decryption (empty if the T-tables engine is not used).
+        """
+        if self._keyCacheSize > 0:
+            cacheKey = bytes(key)
+            schedule = self._keyCache.get(cacheKey)
+            if schedule is not None:
+                self._keyCache.move_to_end(cacheKey)  # Clé la plus récemment utilisée
+                return schedule
+
+        roundKeys = _keyExpansion(key, self._keySizeT8, self._nbRounds)
+        if self._tTables:
+            encryptionWords = _roundKeysToWords(roundKeys)
+            schedule = (roundKeys, encryptionWords, _decryptionWords(encryptionWords))
+        else:
+            schedule = (roundKeys, (), ())
+
+        if self._keyCacheSize > 0:
+            self._keyCache[cacheKey] = schedule
+            if len(self._keyCache) > self._keyCacheSize:
+                self._keyCache.popitem(last=False)  # Éviction de la clé la moins récemment utilisée
+        return schedule
 
     def encrypt(self, block):
         """!
@@ -95,23 +112,11 @@ class AES(BlockCipher):
         """
         if len(block) != self._blockSizeT8:
             raise ErrParameters
-
-        block = bytearray(block)  # copie
-
-        for i in range(self._nbRounds - 1):
-            _addRoundKey(block, self._roundKeys[i])  # AddRoundKey
-            for j in range(16):  # Sbox
-                block[j] = _SBox[block[j]]
-            _shiftRows(block)  # ShiftRows
-            _mixColumns(block)  # MixColumns
-
-        _addRoundKey(block, self._roundKeys[-2])  # AddRoundKey
-        for j in range(16):  # Sbox
-            block[j] = _SBox[block[j]]
-        _shiftRows(block)  # ShiftRows
-        _addRoundKey(block, self._roundKeys[-1])  # AddRoundKey
-
-        return block
+        if self._tTables:
+            output = bytearray(16)
+            _encryptBlockTTables(block, 0, output, 0, self._encryptionWords)
+            return output
+        return _encryptBlock(bytearray(block), self._roundKeys)  # copie
 
     def decrypt(self, block):
         """!
@@ -122,50 +127,218 @@ class AES(BlockCipher):
         """
         if len(block) != self._blockSizeT8:
             raise ErrParameters
+        if self._tTables:
+            output = bytearray(16)
+            _decryptBlockTTables(block, 0, output, 0, self._decryptionWords)
+            return output
+        return _decryptBlock(bytearray(block), self._roundKeys)  # copie
 
-        block = bytearray(block)  # copie
+    def encryptInto(self, src, dst, srcOffset=0, dstOffset=0):
+        """!
+        Encrypts the block of 128 bits found at srcOffset in src and writes the result at dstOffset in dst.
+        No intermediate block is allocated: dst may be src itself (in place encryption with srcOffset == dstOffset).
 
-        _addRoundKey(block, self._roundKeys[-1])  # AddRoundKey
-        _shiftRowsInv(block)  # ShiftRowsInv
-        for j in range(16):  # SboxInv
-            block[j] = _SBoxInv[block[j]]
-        _addRoundKey(block, self._roundKeys[-2])  # AddRoundKey
+        @param src: (bytes, bytearray or memoryview) buffer holding the block to encrypt.
+        @param dst: (bytearray or memoryview) writable output buffer.
+        @param srcOffset: (int) optional, position of the block in src.
+        @param dstOffset: (int) optional, position of the encrypted block in dst.
+        """
+        if (srcOffset < 0) or (dstOffset < 0) or (srcOffset + 16 > len(src)) or (dstOffset + 16 > len(dst)):
+            raise ErrParameters
+        if self._tTables:
+            _encryptBlockTTables(src, srcOffset, dst, dstOffset, self._encryptionWords)
+            return
+        block = memoryview(dst)[dstOffset:dstOffset + 16]
+        if (src is not dst) or (srcOffset != dstOffset):
+            block[:] = memoryview(src)[srcOffset:srcOffset + 16]
+        _encryptBlock(block, self._roundKeys)  # Chiffrement en place dans dst
+
+    def decryptInto(self, src, dst, srcOffset=0, dstOffset=0):
+        """!
+        Decrypts the block of 128 bits found at srcOffset in src and writes the result at dstOffset in dst.
+        No intermediate block is allocated: dst may be src itself (in place decryption with srcOffset == dstOffset).
 
-        for i in range(self._nbRounds - 1):
-            _mixColumnsInv(block)  # MixColumns
-            _shiftRowsInv(block)  # ShiftRows
-            for j in range(16):  # SboxInv
-                block[j] = _SBoxInv[block[j]]
-            _addRoundKey(block, self._roundKeys[-i-3])  # AddRoundKey
+        @param src: (bytes, bytearray or memoryview) buffer holding the block to decrypt.
+        @param dst: (bytearray or memoryview) writable output buffer.
+        @param srcOffset: (int) optional, position of the block in src.
+        @param dstOffset: (int) optional, position of the decrypted block in dst.
+        """
+        if (srcOffset < 0) or (dstOffset < 0) or (srcOffset + 16 > len(src)) or (dstOffset + 16 > len(dst)):
+            raise ErrParameters
+        if self._tTables:
+            _decryptBlockTTables(src, srcOffset, dst, dstOffset, self._decryptionWords)
+            return
+        block = memoryview(dst)[dstOffset:dstOffset + 16]
+        if (src is not dst) or (srcOffset != dstOffset):
+            block[:] = memoryview(src)[srcOffset:srcOffset + 16]
+        _decryptBlock(block, self._roundKeys)  # Déchiffrement en place dans dst
+
+    def encryptBlocks(self, blocks):
+        """!
+        Encrypts several independent blocks of 128 bits (e.g. ECB or CTR keystream).
+        From a few blocks on, the blocks are encrypted all at once with a bitsliced AES: the blocks are packed into
+        128 Python integers (one per bit position of the state) and every round operation applies to all of them.
 
-        return block
+        @param blocks: (list of bytes or bytearray, or bytes, bytearray or memoryview) blocks to encrypt, either as a
+        list of 16-byte blocks or as a buffer whose size is a multiple of 16 bytes.
+        @return: (bytearray) concatenation of the encrypted blocks.
+        """
+        if isinstance(blocks, list):
+            blocks = b''.join(blocks)
+        if (len(blocks) % self._blockSizeT8) != 0:
+            raise ErrParameters
+        nbBlocks = len(blocks) // self._blockSizeT8
+        if nbBlocks < _bitsliceMinBlocks:  # Peu de blocs : chiffrement bloc par bloc
+            return super().encryptBlocks(blocks)
+        return _bitsliceEncrypt(bytes(blocks), nbBlocks, self._roundKeys)
+
+    def encryptUnderKeys(self, keys, blocks):
+        """!
+        Encrypts the same blocks under each key of a list.
+        The key schedules are computed locally (or taken from the cache): the key currently loaded is left unchanged.
+
+        @param keys: (list of bytes or bytearray) keys.
+        @param blocks: (bytes or bytearray) blocks to encrypt, size multiple of 16 bytes.
+        @return: (bytearray) concatenation, for each key, of the encrypted blocks.
+        """
+        blocksSizeT8 = len(blocks)
+        if (blocksSizeT8 % self._blockSizeT8) != 0:
+            raise ErrParameters
+        for key in keys:
+            if len(key) != self._keySizeT8:
+                raise ErrParameters
+
+        output = bytearray(blocksSizeT8 * len(keys))  # Allocation unique de la sortie
+        offset = 0
+        for key in keys:
+            roundKeys, words, dummy = self._getKeySchedule(key)
+            if self._tTables:
+                for blockOffset in range(0, blocksSizeT8, 16):
+                    _encryptBlockTTables(blocks, blockOffset, output, offset, words)
+                    offset += 16
+                continue
+            for blockOffset in range(0, blocksSizeT8, 16):
+                output[offset:offset + 16] = blocks[blockOffset:blockOffset + 16]
+                _encryptBlock(memoryview(output)[offset:offset + 16], roundKeys)  # Chiffrement en place
+                offset += 16
+        return output
 
 
 class AES128(AES):
-    def __init__(self):
+    def __init__(self, tTables=False, keyCacheSize=0):
         """!
         AES128 block cipher.
         Standard defined in FIPS 197.
+
+        @param tTables: (Boolean) optional, uses the 32-bit T-tables engine instead of the byte-oriented one.
+        @param keyCacheSize: (int) optional, number of expanded keys kept in a LRU cache (no cache by default).
         """
-        super().__init__(16)
+        super().__init__(16, tTables, keyCacheSize)
 
 
 class AES192(AES):
-    def __init__(self):
+    def __init__(self, tTables=False, keyCacheSize=0):
         """!
         AES192 block cipher.
         Standard defined in FIPS 197.
+
+        @param tTables: (Boolean) optional, uses the 32-bit T-tables engine instead of the byte-oriented one.
+        @param keyCacheSize: (int) optional, number of expanded keys kept in a LRU cache (no cache by default).
         """
-        super().__init__(24)
+        super().__init__(24, tTables, keyCacheSize)
 
 
 class AES256(AES):
-    def __init__(self):
+    def __init__(self, tTables=False, keyCacheSize=0):
         """!
         AES256 block cipher.
         Standard defined in FIPS 197.
+
+        @param tTables: (Boolean) optional, uses the 32-bit T-tables engine instead of the byte-oriented one.
+        @param keyCacheSize: (int) optional, number of expanded keys kept in a LRU cache (no cache by default).
         """
-        super().__init__(32)
+        super().__init__(32, tTables, keyCacheSize)
+
+
+def _keyExpansion(key, keySizeT8, nbRounds):
+    """!
+    Cadencement de clé de l'AES.
+
+    @param key: (bytes ou bytearray) clé de taille keySizeT8.
+    @param keySizeT8: (int) taille de la clé en octets (16, 24 ou 32).
+    @param nbRounds: (int) nombre de tours (10, 12 ou 14).
+    @return: (tuple of bytes) clés de tour.
+    """
+    roundKeys = []
+    N = keySizeT8 // 4
+    W = [bytearray(4) for i in range(4 * nbRounds + 4)]
+    for i in range(4 * nbRounds + 4):
+        if i < N:  # Copie de la clé initiale
+            W[i] = bytearray(key[4 * i: 4 * i + 4])
+        elif (i % N) == 0:
+            W[i] = ByteArray_LROT(W[i - 1])  # Rotation
+            for j in range(4):  # SBox
+                W[i][j] = _SBox[W[i][j]]
+            W[i][0] ^= _Rcon[int(i / N)]  # xor Rcon
+            ByteArray_XOR(W[i], W[i - N], W[i])  # xor round précédent
+        elif (keySizeT8 == 32) and ((i % N) == 4):
+            for j in range(4):  # SBox
+                W[i][j] = _SBox[W[i - 1][j]]
+            ByteArray_XOR(W[i], W[i - N], W[i])  # xor round précédent
+        else:
+            ByteArray_XOR(W[i - 1], W[i - N], W[i])  # xor round précédent
+
+        if (i % 4) == 3:  # chargement clé de tour
+            roundKeys.append(bytes(W[i - 3] + W[i - 2] + W[i - 1] + W[i]))
+    return tuple(roundKeys)
+
+
+def _encryptBlock(block, roundKeys):
+    """!
+    Chiffrement AES en place d'un bloc de 128 bits.
+
+    @param block: (bytearray ou memoryview) bloc de 16 octets, modifié en place.
+    @param roundKeys: (tuple of bytes) clés de tour.
+    @return: (bytearray ou memoryview) le bloc chiffré.
+    """
+    for i in range(len(roundKeys) - 2):
+        _addRoundKey(block, roundKeys[i])  # AddRoundKey
+        for j in range(16):  # Sbox
+            block[j] = _SBox[block[j]]
+        _shiftRows(block)  # ShiftRows
+        _mixColumns(block)  # MixColumns
+
+    _addRoundKey(block, roundKeys[-2])  # AddRoundKey
+    for j in range(16):  # Sbox
+        block[j] = _SBox[block[j]]
+    _shiftRows(block)  # ShiftRows
+    _addRoundKey(block, roundKeys[-1])  # AddRoundKey
+
+    return block
+
+
+def _decryptBlock(block, roundKeys):
+    """!
+    Déchiffrement AES en place d'un bloc de 128 bits.
+
+    @param block: (bytearray ou memoryview) bloc de 16 octets, modifié en place.
+    @param roundKeys: (tuple of bytes) clés de tour.
+    @return: (bytearray ou memoryview) le bloc déchiffré.
+    """
+    _addRoundKey(block, roundKeys[-1])  # AddRoundKey
+    _shiftRowsInv(block)  # ShiftRowsInv
+    for j in range(16):  # SboxInv
+        block[j] = _SBoxInv[block[j]]
+    _addRoundKey(block, roundKeys[-2])  # AddRoundKey
+
+    for i in range(len(roundKeys) - 2):
+        _mixColumnsInv(block)  # MixColumns
+        _shiftRowsInv(block)  # ShiftRows
+        for j in range(16):  # SboxInv
+            block[j] = _SBoxInv[block[j]]
+        _addRoundKey(block, roundKeys[-i-3])  # AddRoundKey
+
+    return block
 
 
 _Rcon = bytes([0x8d, 0x01, 0x02, 0x04, 0x08, 0x10, 0x20, 0x40, 0x80, 0x1b, 0x36, 0x6c, 0xd8, 0xab, 0x4d, 0x9a])
@@ -400,3 +573,337 @@ def _addRoundKey(block, roundKey):
     block[13] ^= roundKey[13]
     block[14] ^= roundKey[14]
     block[15] ^= roundKey[15]
+
+
+"""
+Moteur T-tables : SubBytes, ShiftRows et MixColumns combinés en 4 tables de mots de 32 bits par sens.
+Les colonnes de l'état sont manipulées comme des entiers de 32 bits (gros-boutiste).
+"""
+_Te0 = [(_a2[s] << 24) | (s << 16) | (s << 8) | _a3[s] for s in _SBox]
+_Te1 = [(_a3[s] << 24) | (_a2[s] << 16) | (s << 8) | s for s in _SBox]
+_Te2 = [(s << 24) | (_a3[s] << 16) | (_a2[s] << 8) | s for s in _SBox]
+_Te3 = [(s << 24) | (s << 16) | (_a3[s] << 8) | _a2[s] for s in _SBox]
+_Td0 = [(_ae[s] << 24) | (_a9[s] << 16) | (_ad[s] << 8) | _ab[s] for s in _SBoxInv]
+_Td1 = [(_ab[s] << 24) | (_ae[s] << 16) | (_a9[s] << 8) | _ad[s] for s in _SBoxInv]
+_Td2 = [(_ad[s] << 24) | (_ab[s] << 16) | (_ae[s] << 8) | _a9[s] for s in _SBoxInv]
+_Td3 = [(_a9[s] << 24) | (_ad[s] << 16) | (_ab[s] << 8) | _ae[s] for s in _SBoxInv]
+
+
+def _roundKeysToWords(roundKeys):
+    """!
+    Conversion des clés de tour en mots de 32 bits.
+
+    @param roundKeys: (tuple of bytes) clés de tour.
+    @return: (tuple of int) 4 mots par clé de tour.
+    """
+    words = []
+    for roundKey in roundKeys:
+        words += unpack(">4I", roundKey)
+    return tuple(words)
+
+
+def _decryptionWords(encryptionWords):
+    """!
+    Clés de tour du déchiffrement équivalent (FIPS 197, section 5.3.5) :
+    ordre des tours inversé et InvMixColumns appliqué aux clés de tour intermédiaires.
+
+    @param encryptionWords: (tuple of int) clés de tour du chiffrement en mots de 32 bits.
+    @return: (tuple of int) clés de tour du déchiffrement en mots de 32 bits.
+    """
+    nbRounds = len(encryptionWords) // 4 - 1
+    words = list(encryptionWords[4 * nbRounds:])
+    for r in range(nbRounds - 1, 0, -1):
+        for w in encryptionWords[4 * r:4 * r + 4]:  # InvMixColumns(w) = Td(SBox(w))
+            words.append(_Td0[_SBox[w >> 24]] ^ _Td1[_SBox[(w >> 16) & 0xff]]
+                         ^ _Td2[_SBox[(w >> 8) & 0xff]] ^ _Td3[_SBox[w & 0xff]])
+    words += encryptionWords[:4]
+    return tuple(words)
+
+
+def _encryptBlockTTables(src, srcOffset, dst, dstOffset, rk):
+    """!
+    Chiffrement AES d'un bloc de 128 bits avec les T-tables.
+    Le bloc chiffré est écrit directement dans le tampon de sortie, qui peut être le tampon d'entrée.
+
+    @param src: (bytes, bytearray ou memoryview) tampon contenant le bloc à chiffrer.
+    @param srcOffset: (int) position du bloc dans src.
+    @param dst: (bytearray ou memoryview) tampon de sortie.
+    @param dstOffset: (int) position du bloc chiffré dans dst.
+    @param rk: (tuple of int) clés de tour en mots de 32 bits.
+    """
+    Te0, Te1, Te2, Te3 = _Te0, _Te1, _Te2, _Te3
+    s0, s1, s2, s3 = unpack_from(">4I", src, srcOffset)
+    s0 ^= rk[0]
+    s1 ^= rk[1]
+    s2 ^= rk[2]
+    s3 ^= rk[3]
+    for i in range(4, len(rk) - 4, 4):
+        t0 = Te0[s0 >> 24] ^ Te1[(s1 >> 16) & 0xff] ^ Te2[(s2 >> 8) & 0xff] ^ Te3[s3 & 0xff] ^ rk[i]
+        t1 = Te0[s1 >> 24] ^ Te1[(s2 >> 16) & 0xff] ^ Te2[(s3 >> 8) & 0xff] ^ Te3[s0 & 0xff] ^ rk[i + 1]
+        t2 = Te0[s2 >> 24] ^ Te1[(s3 >> 16) & 0xff] ^ Te2[(s0 >> 8) & 0xff] ^ Te3[s1 & 0xff] ^ rk[i + 2]
+        s3 = Te0[s3 >> 24] ^ Te1[(s0 >> 16) & 0xff] ^ Te2[(s1 >> 8) & 0xff] ^ Te3[s2 & 0xff] ^ rk[i + 3]
+        s0, s1, s2 = t0, t1, t2
+    S = _SBox  # Dernier tour sans MixColumns
+    pack_into(">4I", dst, dstOffset,
+              ((S[s0 >> 24] << 24) | (S[(s1 >> 16) & 0xff] << 16) | (S[(s2 >> 8) & 0xff] << 8) | S[s3 & 0xff]) ^ rk[-4],
+              ((S[s1 >> 24] << 24) | (S[(s2 >> 16) & 0xff] << 16) | (S[(s3 >> 8) & 0xff] << 8) | S[s0 & 0xff]) ^ rk[-3],
+              ((S[s2 >> 24] << 24) | (S[(s3 >> 16) & 0xff] << 16) | (S[(s0 >> 8) & 0xff] << 8) | S[s1 & 0xff]) ^ rk[-2],
+              ((S[s3 >> 24] << 24) | (S[(s0 >> 16) & 0xff] << 16) | (S[(s1 >> 8) & 0xff] << 8) | S[s2 & 0xff]) ^ rk[-1])
+
+
+def _decryptBlockTTables(src, srcOffset, dst, dstOffset, dk):
+    """!
+    Déchiffrement AES d'un bloc de 128 bits avec les T-tables (déchiffrement équivalent).
+    Le bloc déchiffré est écrit directement dans le tampon de sortie, qui peut être le tampon d'entrée.
+
+    @param src: (bytes, bytearray ou memoryview) tampon contenant le bloc à déchiffrer.
+    @param srcOffset: (int) position du bloc dans src.
+    @param dst: (bytearray ou memoryview) tampon de sortie.
+    @param dstOffset: (int) position du bloc déchiffré dans dst.
+    @param dk: (tuple of int) clés de tour du déchiffrement équivalent en mots de 32 bits.
+    """
+    Td0, Td1, Td2, Td3 = _Td0, _Td1, _Td2, _Td3
+    s0, s1, s2, s3 = unpack_from(">4I", src, srcOffset)
+    s0 ^= dk[0]
+    s1 ^= dk[1]
+    s2 ^= dk[2]
+    s3 ^= dk[3]
+    for i in range(4, len(dk) - 4, 4):
+        t0 = Td0[s0 >> 24] ^ Td1[(s3 >> 16) & 0xff] ^ Td2[(s2 >> 8) & 0xff] ^ Td3[s1 & 0xff] ^ dk[i]
+        t1 = Td0[s1 >> 24] ^ Td1[(s0 >> 16) & 0xff] ^ Td2[(s3 >> 8) & 0xff] ^ Td3[s2 & 0xff] ^ dk[i + 1]
+        t2 = Td0[s2 >> 24] ^ Td1[(s1 >> 16) & 0xff] ^ Td2[(s0 >> 8) & 0xff] ^ Td3[s3 & 0xff] ^ dk[i + 2]
+        s3 = Td0[s3 >> 24] ^ Td1[(s2 >> 16) & 0xff] ^ Td2[(s1 >> 8) & 0xff] ^ Td3[s0 & 0xff] ^ dk[i + 3]
+        s0, s1, s2 = t0, t1, t2
+    S = _SBoxInv  # Dernier tour sans InvMixColumns
+    pack_into(">4I", dst, dstOffset,
+              ((S[s0 >> 24] << 24) | (S[(s3 >> 16) & 0xff] << 16) | (S[(s2 >> 8) & 0xff] << 8) | S[s1 & 0xff]) ^ dk[-4],
+              ((S[s1 >> 24] << 24) | (S[(s0 >> 16) & 0xff] << 16) | (S[(s3 >> 8) & 0xff] << 8) | S[s2 & 0xff]) ^ dk[-3],
+              ((S[s2 >> 24] << 24) | (S[(s1 >> 16) & 0xff] << 16) | (S[(s0 >> 8) & 0xff] << 8) | S[s3 & 0xff]) ^ dk[-2],
+              ((S[s3 >> 24] << 24) | (S[(s2 >> 16) & 0xff] << 16) | (S[(s1 >> 8) & 0xff] << 8) | S[s0 & 0xff]) ^ dk[-1])
+
+
+"""
+Moteur bitslice : N blocs sont chiffrés simultanément.
+L'état est représenté par 16 octets de 8 plans de bits, chaque plan étant un entier de N bits dont le bit i est le
+bit correspondant du bloc i. Les plans d'un octet sont rangés du bit de poids fort au bit de poids faible.
+"""
+_bitsliceMinBlocks = 64  # En dessous, le chiffrement bloc par bloc est plus rapide
+
+_bitsliceShiftRows = [(r + 4 * ((c + r) % 4)) for c in range(4) for r in range(4)]  # état[r + 4c] <- état[r + 4(c+r)]
+
+_toBitTables = [bytes((ord('1') if (x >> (7 - k)) & 1 else ord('0')) for x in range(256)) for k in range(8)]
+_fromBitTable = bytes((1 if x == ord('1') else 0) for x in range(256))
+
+
+def _bitslicePack(blocks, nbBlocks):
+    """!
+    Transposition de N blocs de 16 octets en 128 plans de bits.
+
+    @param blocks: (bytes) concaténation des blocs.
+    @param nbBlocks: (int) nombre de blocs N.
+    @return: (list of list of int) 16 octets de 8 plans de bits.
+    """
+    state = []
+    for p in range(16):
+        column = blocks[p::16]  # Octet p de chaque bloc
+        state.append([int(column.translate(_toBitTables[k])[::-1], 2) for k in range(8)])
+    return state
+
+
+def _bitsliceUnpack(state, nbBlocks):
+    """!
+    Transposition inverse de 128 plans de bits en N blocs de 16 octets.
+
+    @param state: (list of list of int) 16 octets de 8 plans de bits.
+    @param nbBlocks: (int) nombre de blocs N.
+    @return: (bytearray) concaténation des blocs.
+    """
+    output = bytearray(16 * nbBlocks)
+    bitsFormat = '0' + str(nbBlocks) + 'b'
+    for p in range(16):
+        column = 0
+        for k in range(8):
+            bits = format(state[p][k], bitsFormat)[::-1].encode().translate(_fromBitTable)  # Un octet 0/1 par bloc
+            column |= int.from_bytes(bits, byteorder="little") << (7 - k)
+        output[p::16] = column.to_bytes(nbBlocks, byteorder="little")
+    return output
+
+
+def _bitsliceAddRoundKey(state, roundKey, mask):
+    for p in range(16):
+        byte = roundKey[p]
+        planes = state[p]
+        for k in range(8):
+            if (byte >> (7 - k)) & 1:
+                planes[k] ^= mask
+
+
+def _bitsliceMixColumns(state):
+    for c in range(0, 16, 4):
+        a0, a1, a2, a3 = state[c], state[c + 1], state[c + 2], state[c + 3]
+        t = [a0[k] ^ a1[k] ^ a2[k] ^ a3[k] for k in range(8)]
+        state[c] = _bitsliceXtimeXor(a0, a1, a0, t)  # 2a0 + 3a1 + a2 + a3 = a0 + t + 2(a0 + a1)
+        state[c + 1] = _bitsliceXtimeXor(a1, a2, a1, t)
+        state[c + 2] = _bitsliceXtimeXor(a2, a3, a2, t)
+        state[c + 3] = _bitsliceXtimeXor(a3, a0, a3, t)
+
+
+def _bitsliceXtimeXor(a, b, c, t):
+    """!
+    Calcul de 2(a + b) + c + t sur des octets en représentation bitslice.
+    """
+    x = [a[k] ^ b[k] for k in range(8)]
+    msb = x[0]
+    return [x[1] ^ c[0] ^ t[0], x[2] ^ c[1] ^ t[1], x[3] ^ c[2] ^ t[2], x[4] ^ msb ^ c[3] ^ t[3],
+            x[5] ^ msb ^ c[4] ^ t[4], x[6] ^ c[5] ^ t[5], x[7] ^ msb ^ c[6] ^ t[6], msb ^ c[7] ^ t[7]]
+
+
+def _bitsliceEncrypt(blocks, nbBlocks, roundKeys):
+    """!
+    Chiffrement AES bitslice de N blocs.
+
+    @param blocks: (bytes) concaténation des blocs.
+    @param nbBlocks: (int) nombre de blocs N.
+    @param roundKeys: (tuple of bytes) clés de tour.
+    @return: (bytearray) concaténation des blocs chiffrés.
+    """
+    mask = (1 << nbBlocks) - 1
+    state = _bitslicePack(blocks, nbBlocks)
+    _bitsliceAddRoundKey(state, roundKeys[0], mask)
+    for r in range(1, len(roundKeys)):
+        state = [list(_bitsliceSBox(*planes, mask)) for planes in state]  # SubBytes
+        state = [state[i] for i in _bitsliceShiftRows]  # ShiftRows
+        if r < len(roundKeys) - 1:
+            _bitsliceMixColumns(state)  # MixColumns, sauf au dernier tour
+        _bitsliceAddRoundKey(state, roundKeys[r], mask)
+    return _bitsliceUnpack(state, nbBlocks)
+
+
+def _bitsliceSBox(x0, x1, x2, x3, x4, x5, x6, x7, mask):
+    """!
+    SBox de l'AES en représentation bitslice, évaluée comme un circuit booléen
+    (circuit de Boyar et Peralta).
+
+    @param x0..x7: (int) plans de bits de l'octet d'entrée, du bit de poids fort x0 au bit de poids faible x7.
+    @param mask: (int) entier dont tous les bits utiles sont à 1 (négation).
+    @return: (tuple of int) plans de bits de l'octet de sortie, du poids fort au poids faible.
+    """
+    # Transformation linéaire d'entrée
+    y14 = x3 ^ x5
+    y13 = x0 ^ x6
+    y9 = x0 ^ x3
+    y8 = x0 ^ x5
+    t0 = x1 ^ x2
+    y1 = t0 ^ x7
+    y4 = y1 ^ x3
+    y12 = y13 ^ y14
+    y2 = y1 ^ x0
+    y5 = y1 ^ x6
+    y3 = y5 ^ y8
+    t1 = x4 ^ y12
+    y15 = t1 ^ x5
+    y20 = t1 ^ x1
+    y6 = y15 ^ x7
+    y10 = y15 ^ t0
+    y11 = y20 ^ y9
+    y7 = x7 ^ y11
+    y17 = y10 ^ y11
+    y19 = y10 ^ y8
+    y16 = t0 ^ y11
+    y21 = y13 ^ y16
+    y18 = x0 ^ y16
+    # Partie non linéaire
+    t2 = y12 & y15
+    t3 = y3 & y6
+    t4 = t3 ^ t2
+    t5 = y4 & x7
+    t6 = t5 ^ t2
+    t7 = y13 & y16
+    t8 = y5 & y1
+    t9 = t8 ^ t7
+    t10 = y2 & y7
+    t11 = t10 ^ t7
+    t12 = y9 & y11
+    t13 = y14 & y17
+    t14 = t13 ^ t12
+    t15 = y8 & y10
+    t16 = t15 ^ t12
+    t17 = t4 ^ t14
+    t18 = t6 ^ t16
+    t19 = t9 ^ t14
+    t20 = t11 ^ t16
+    t21 = t17 ^ y20
+    t22 = t18 ^ y19
+    t23 = t19 ^ y21
+    t24 = t20 ^ y18
+    t25 = t21 ^ t22
+    t26 = t21 & t23
+    t27 = t24 ^ t26
+    t28 = t25 & t27
+    t29 = t28 ^ t22
+    t30 = t23 ^ t24
+    t31 = t22 ^ t26
+    t32 = t31 & t30
+    t33 = t32 ^ t24
+    t34 = t23 ^ t33
+    t35 = t27 ^ t33
+    t36 = t24 & t35
+    t37 = t36 ^ t34
+    t38 = t27 ^ t36
+    t39 = t29 & t38
+    t40 = t25 ^ t39
+    t41 = t40 ^ t37
+    t42 = t29 ^ t33
+    t43 = t29 ^ t40
+    t44 = t33 ^ t37
+    t45 = t42 ^ t41
+    z0 = t44 & y15
+    z1 = t37 & y6
+    z2 = t33 & x7
+    z3 = t43 & y16
+    z4 = t40 & y1
+    z5 = t29 & y7
+    z6 = t42 & y11
+    z7 = t45 & y17
+    z8 = t41 & y10
+    z9 = t44 & y12
+    z10 = t37 & y3
+    z11 = t33 & y4
+    z12 = t43 & y13
+    z13 = t40 & y5
+    z14 = t29 & y2
+    z15 = t42 & y9
+    z16 = t45 & y14
+    z17 = t41 & y8
+    # Transformation linéaire de sortie
+    t46 = z15 ^ z16
+    t47 = z10 ^ z11
+    t48 = z5 ^ z13
+    t49 = z9 ^ z10
+    t50 = z2 ^ z12
+    t51 = z2 ^ z5
+    t52 = z7 ^ z8
+    t53 = z0 ^ z3
+    t54 = z6 ^ z7
+    t55 = z16 ^ z17
+    t56 = z12 ^ t48
+    t57 = t50 ^ t53
+    t58 = z4 ^ t46
+    t59 = z3 ^ t54
+    t60 = t46 ^ t57
+    t61 = z14 ^ t57
+    t62 = t52 ^ t58
+    t63 = t49 ^ t58
+    t64 = z4 ^ t59
+    t65 = t61 ^ t62
+    t66 = z1 ^ t63
+    s0 = t59 ^ t63
+    s6 = t56 ^ t62 ^ mask
+    s7 = t48 ^ t60 ^ mask
+    t67 = t64 ^ t65
+    s3 = t53 ^ t66
+    s4 = t51 ^ t66
+    s5 = t47 ^ t65
+    s1 = t64 ^ s3 ^ mask
+    s2 = t55 ^ t67 ^ mask
+    return s0, s1, s2, s3, s4, s5, s6, s7
@@ -27,6 +27,7 @@
 #  *********************************************************************************************************************
 
 from py_public.BlockCipher.AES import AES128, AES192, AES256
+import py_public.BlockCipher.AES as AES
 
 """
 Partie 1 : Vérification fonctionnement interne
@@ -102,4 +103,119 @@ if ciphertext != expectedCiphertext:
 
 plaintext = blockCipher.decryptOneShot(key, expectedCiphertext)
 if plaintext != expectedPlaintext:
-    raise Exception("Autotest AES256 : erreur vecteur NIST")
\ No newline at end of file
+    raise Exception("Autotest AES256 : erreur vecteur NIST")
+
+"""
+Partie 3 : Vecteurs de tests du NIST, moteur T-tables
+"""
+
+vectors = [
+    (AES128, bytes([0x2b, 0x7e, 0x15, 0x16, 0x28, 0xae, 0xd2, 0xa6, 0xab, 0xf7, 0x15, 0x88, 0x09, 0xcf, 0x4f, 0x3c]),
+     bytes([0x32, 0x43, 0xf6, 0xa8, 0x88, 0x5a, 0x30, 0x8d, 0x31, 0x31, 0x98, 0xa2, 0xe0, 0x37, 0x07, 0x34]),
+     bytes([0x39, 0x25, 0x84, 0x1d, 0x02, 0xdc, 0x09, 0xfb, 0xdc, 0x11, 0x85, 0x97, 0x19, 0x6a, 0x0b, 0x32])),
+    (AES192, bytes(range(24)),
+     bytes([0x00, 0x11, 0x22, 0x33, 0x44, 0x55, 0x66, 0x77, 0x88, 0x99, 0xaa, 0xbb, 0xcc, 0xdd, 0xee, 0xff]),
+     bytes([0xdd, 0xa9, 0x7c, 0xa4, 0x86, 0x4c, 0xdf, 0xe0, 0x6e, 0xaf, 0x70, 0xa0, 0xec, 0x0d, 0x71, 0x91])),
+    (AES256, bytes(range(32)),
+     bytes([0x00, 0x11, 0x22, 0x33, 0x44, 0x55, 0x66, 0x77, 0x88, 0x99, 0xaa, 0xbb, 0xcc, 0xdd, 0xee, 0xff]),
+     bytes([0x8e, 0xa2, 0xb7, 0xca, 0x51, 0x67, 0x45, 0xbf, 0xea, 0xfc, 0x49, 0x90, 0x4b, 0x49, 0x60, 0x89]))]
+
+for (AESClass, key, expectedPlaintext, expectedCiphertext) in vectors:
+    blockCipher = AESClass(tTables=True)
+    ciphertext = blockCipher.encryptOneShot(key, expectedPlaintext)
+    if ciphertext != expectedCiphertext:
+        raise Exception("Autotest " + blockCipher.getName() + " T-tables : erreur vecteur NIST")
+
+    plaintext = blockCipher.decryptOneShot(key, expectedCiphertext)
+    if plaintext != expectedPlaintext:
+        raise Exception("Autotest " + blockCipher.getName() + " T-tables : erreur vecteur NIST")
+
+
+"""
+Partie 4 : Chiffrement de plusieurs blocs (bitslice)
+"""
+
+for (AESClass, key, expectedPlaintext, expectedCiphertext) in vectors:
+    blockCipher = AESClass()
+    blockCipher.setKey(key)
+    for nbBlocks in [1, 100]:
+        blocks = [bytes([i % 256] * 16) for i in range(nbBlocks - 1)] + [expectedPlaintext]
+        ciphertext = blockCipher.encryptBlocks(blocks)
+        if ciphertext[-16:] != expectedCiphertext:
+            raise Exception("Autotest " + blockCipher.getName() + " bitslice : erreur vecteur NIST")
+        if ciphertext != b''.join([blockCipher.encrypt(block) for block in blocks]):
+            raise Exception("Autotest " + blockCipher.getName() + " bitslice : erreur vecteur interne")
+
+
+"""
+Partie 5 : Cache LRU des clés de tour
+Les clés de tour restituées par le cache donnent les mêmes résultats qu'un AES sans cache, et seules les clés absentes du
+cache sont dérivées : les appels à la dérivation de clé sont comptés.
+"""
+
+nbKeyExpansions = [0]
+keyExpansion = AES._keyExpansion
+
+
+def _countKeyExpansion(key, keySizeT8, nbRounds):
+    nbKeyExpansions[0] += 1
+    return keyExpansion(key, keySizeT8, nbRounds)
+
+
+AES._keyExpansion = _countKeyExpansion
+try:
+    for tTables in [False, True]:
+        blockCipher = AES128(tTables=tTables, keyCacheSize=2)
+        referenceCipher = AES128()
+        keys = [bytes([i] * 16) for i in range(3)]
+        # Clé utilisée, puis clés de tour dérivées (True) ou restituées par le cache (False)
+        for i, expanded in [(0, True), (1, True), (0, False), (2, True), (0, False), (1, True), (1, False), (2, True),
+                            (0, True)]:
+            nbExpansions = nbKeyExpansions[0]
+            blockCipher.setKey(keys[i])
+            if (nbKeyExpansions[0] - nbExpansions == 1) != expanded:
+                raise Exception("Autotest AES128 : erreur cache des clés de tour (éviction LRU)")
+            referenceCipher.setKey(keys[i])
+            if blockCipher.encrypt(expectedPlaintext) != referenceCipher.encrypt(expectedPlaintext):
+                raise Exception("Autotest AES128 : erreur cache des clés de tour (chiffrement)")
+            if blockCipher.decrypt(expectedPlaintext) != referenceCipher.decrypt(expectedPlaintext):
+                raise Exception("Autotest AES128 : erreur cache des clés de tour (déchiffrement)")
+finally:
+    AES._keyExpansion = keyExpansion
+
+
+"""
+Partie 6 : Chiffrement en place dans un tampon (encryptInto / decryptInto)
+"""
+
+for (AESClass, key, expectedPlaintext, expectedCiphertext) in vectors:
+    for tTables in [False, True]:
+        blockCipher = AESClass(tTables=tTables)
+        blockCipher.setKey(key)
+        buffer = bytearray(5) + bytearray(expectedPlaintext) + bytearray(3)
+        output = bytearray(40)
+        blockCipher.encryptInto(buffer, memoryview(output), 5, 17)
+        if output[17:33] != expectedCiphertext or output[:17] != bytearray(17) or output[33:] != bytearray(7):
+            raise Exception("Autotest " + blockCipher.getName() + " : erreur encryptInto")
+        blockCipher.encryptInto(buffer, buffer, 5, 5)  # En place
+        if buffer[5:21] != expectedCiphertext:
+            raise Exception("Autotest " + blockCipher.getName() + " : erreur encryptInto en place")
+        blockCipher.decryptInto(buffer, buffer, 5, 5)
+        if buffer[5:21] != expectedPlaintext:
+            raise Exception("Autotest " + blockCipher.getName() + " : erreur decryptInto en place")
+
+
+"""
+Partie 7 : Déchiffrement de plusieurs blocs
+"""
+
+for (AESClass, key, expectedPlaintext, expectedCiphertext) in vectors:
+    for tTables in [False, True]:
+        blockCipher = AESClass(tTables=tTables)
+        blockCipher.setKey(key)
+        blocks = bytes(range(256)) * 5 + expectedPlaintext
+        ciphertext = blockCipher.encryptBlocks(memoryview(blocks))
+        if ciphertext[-16:] != expectedCiphertext:
+            raise Exception("Autotest " + blockCipher.getName() + " : erreur encryptBlocks")
+        if blockCipher.decryptBlocks(memoryview(ciphertext)) != blocks:
+            raise Exception("Autotest " + blockCipher.getName() + " : erreur decryptBlocks")
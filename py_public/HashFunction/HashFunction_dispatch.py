@@ -0,0 +1,244 @@
+#  *********************************************************************************************************************
+#  Copyright (c) 2022-2023 by THALES
+#  All rights reserved.
+#  SIX Background Intellectual Property (69333045)
+#  ---------------------------------------------------------------------------------------------------------------------
+#  Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+#  following conditions are met:
+#  * Redistributions of source code must retain the present copyright notice, this list of conditions and the following
+#  disclaimer.
+#  * Redistributions in binary form must reproduce the present copyright notice, this list of conditions and the
+#  following disclaimer in the documentation and/or other materials provided with the distribution.
+#  * Neither the name of THALES nor the names of its contributors may be used to endorse or promote products derived
+#  from this software without specific prior written permission.
+#  ---------------------------------------------------------------------------------------------------------------------
+#  PART OF THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS ``AS IS'' AND SHALL REMAIN SUBJECT
+#  TO THEIR APPLICABLE TERMS AND CONDITIONS OF LICENCE. ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED
+#  TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+#  SHALL THE REGENTS AND CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF
+#  USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#  ---------------------------------------------------------------------------------------------------------------------
+#  SCR Python Cryptographic Library (SPCL)
+#  File : HashFunction_dispatch.py
+#  Classification : OPEN
+#  *********************************************************************************************************************
+
+from py_abstract.Error import *
+from py_abstract.HashFunction import HashFunction
+
+import py_public.HashFunction.HashFunction_hashlib as HashFunction_hashlib
+import py_public.HashFunction.SHA256 as HashFunction_python
+
+# Registre des implémentations par nom d'algorithme, de la plus rapide à la plus lente :
+# (nom de l'implémentation, constructeur, support des tailles en bits non multiples de 8)
+_backends = {}
+
+
+def registerBackend(name, backendName, constructor, bitOriented):
+    """!
+    Enregistre une implémentation d'une fonction de hachage.
+    Les implémentations d'un même algorithme sont enregistrées de la plus rapide à la plus lente.
+
+    @param name: (string) nom de l'algorithme.
+    @param backendName: (string) nom de l'implémentation.
+    @param constructor: (callable) constructeur sans paramètre d'une instance de HashFunction.
+    @param bitOriented: (Boolean) vrai si l'implémentation gère les tailles en bits non multiples de 8.
+    """
+    _backends.setdefault(name, []).append((backendName, constructor, bitOriented))
+
+
+def getBackends(name):
+    """!
+    Retourne les implémentations enregistrées pour un algorithme, de la plus rapide à la plus lente.
+
+    @param name: (string) nom de l'algorithme.
+    @return: (list) liste de couples (nom de l'implémentation, support des tailles en bits non multiples de 8).
+    """
+    return [(backendName, bitOriented) for backendName, _, bitOriented in _backends.get(name, [])]
+
+
+def _selectBackend(name, bitOriented):
+    """!
+    Retourne l'implémentation la plus rapide répondant au besoin.
+
+    @param name: (string) nom de l'algorithme.
+    @param bitOriented: (Boolean) vrai si les tailles en bits non multiples de 8 doivent être gérées.
+    @return: (tuple) nom de l'implémentation, constructeur et support des tailles en bits non multiples de 8.
+    """
+    for backend in _backends.get(name, []):
+        if backend[2] or not bitOriented:
+            return backend
+    raise ErrNotImplemented
+
+
+registerBackend("SHA256", "hashlib", HashFunction_hashlib.SHA256, False)
+registerBackend("SHA256", "python", HashFunction_python.SHA256, True)
+registerBackend("SHA384", "hashlib", HashFunction_hashlib.SHA384, False)
+registerBackend("SHA512", "hashlib", HashFunction_hashlib.SHA512, False)
+registerBackend("SHAKE256_256", "hashlib", HashFunction_hashlib.SHAKE256_256, False)
+registerBackend("SHAKE256_384", "hashlib", HashFunction_hashlib.SHAKE256_384, False)
+registerBackend("SHAKE256_512", "hashlib", HashFunction_hashlib.SHAKE256_512, False)
+
+
+class HashFunctionDispatch(HashFunction):
+    def __init__(self, name, bitOriented=False):
+        """!
+        Hash function dispatching each computation to the fastest registered implementation meeting the request:
+        the native one (hashlib) for messages whose size is a multiple of 8 bits, the pure Python one as soon as a
+        size in bits is actually used.
+        The first block of byte-aligned data is kept aside until the size in bits of the message is known, then
+        replayed into the chosen implementation (e.g. the padded key absorbed by HMAC before the message). The native
+        implementation cannot be left once it has absorbed more than this block: a streamed message whose size in bits
+        is not a multiple of 8 after more than one block of byte-aligned updates requires bitOriented=True.
+
+        @param name: (string) name of the algorithm (e.g. "SHA256").
+        @param bitOriented: (Boolean) optional, always selects an implementation handling sizes in bits.
+        """
+        backendName, constructor, _ = _selectBackend(name, bitOriented)
+        reference = constructor()
+        super().__init__(name, reference.getBlockSizeT8(), reference.getDigestSizeT8())
+        self._bitOriented = bitOriented
+        self._instances = {backendName: reference}
+        self._backendName = None
+        self._backendBitOriented = False
+        self._backend = None
+        # Données alignées en attente du choix de l'implémentation (au plus un bloc), conservées tant que
+        # l'implémentation choisie n'a absorbé qu'elles
+        self._pending = b''
+
+    def _startBackend(self, bitOriented):
+        """!
+        Choisit l'implémentation la plus rapide répondant au besoin, l'initialise et lui transmet les données en
+        attente, qui sont conservées pour pouvoir changer d'implémentation tant qu'aucune autre donnée n'est absorbée.
+
+        @param bitOriented: (Boolean) vrai si les tailles en bits non multiples de 8 doivent être gérées.
+        """
+        backendName, constructor, backendBitOriented = _selectBackend(self._name, bitOriented or self._bitOriented)
+        if backendName not in self._instances:
+            self._instances[backendName] = constructor()
+        self._backendName = backendName
+        self._backendBitOriented = backendBitOriented
+        self._backend = self._instances[backendName]
+        self._backend.init()
+        if self._pending:
+            self._backend.update(self._pending)
+
+    def init(self):
+        """!
+        Initializes the computation of the digest, the implementation is chosen at the first update.
+        """
+        self._backendName = None
+        self._backendBitOriented = False
+        self._backend = None
+        self._pending = b''
+
+    def update(self, message, messageSizeT1=None):
+        """!
+        Updates the computation of the digest.
+
+        @param message: (bytes or bytearray) message to hash.
+        @param messageSizeT1: (int) optional, size of the message in bits.
+        """
+        bitOriented = (messageSizeT1 is not None) and (messageSizeT1 % 8 != 0)
+        if (messageSizeT1 is not None) and not bitOriented:
+            # Les implémentations natives ignorent la taille en bits
+            message = message[:messageSizeT1 >> 3]
+        if self._backend is None:
+            if not bitOriented and (len(self._pending) + len(message) <= self._blockSizeT8):
+                self._pending += message  # Choix différé, la suite du message peut être en bits
+                return
+            self._startBackend(bitOriented)
+        elif bitOriented and not self._backendBitOriented:
+            if not self._pending:  # L'état de l'implémentation native ne peut être transféré
+                raise ErrSequence
+            self._startBackend(True)  # Seules les données en attente ont été absorbées : elles sont rejouées
+        if len(message) > 0:
+            self._pending = b''
+        self._backend.update(message, messageSizeT1)
+
+    def final(self):
+        """!
+        Ends the computation of the digest and outputs it.
+
+        @return: (bytes or bytearray) digest.
+        """
+        if self._backend is None:
+            self._startBackend(False)
+        digest = self._backend.final()
+        self.init()
+        return digest
+
+    def copy(self):
+        """!
+        Returns an independent copy of the hash function, including the state of the current computation.
+        A full pending block (e.g. the padded key absorbed by HMAC) is absorbed once by the native implementation,
+        whose state is copied: copies of this state do not hash the block again.
+
+        @return: (HashFunctionDispatch) copy, of the same class.
+        """
+        if (self._backend is None) and not self._bitOriented and (len(self._pending) == self._blockSizeT8):
+            self._startBackend(False)  # Le bloc reste en attente pour une suite du message en bits
+        clone = type(self).__new__(type(self))  # Même classe, sans construction d'implémentation
+        clone.__dict__.update(self.__dict__)
+        clone._instances = {}  # Les instances d'implémentation ne sont pas partagées
+        if self._backend is not None:
+            clone._backend = self._backend.copy()
+            clone._instances[self._backendName] = clone._backend
+        return clone
+
+    def oneShot(self, message, messageSizeT1=None):
+        """!
+        Computes the digest of a message in one-shot with the fastest implementation meeting the request.
+
+        @param message: (bytes or bytearray) message.
+        @param messageSizeT1: (int) optional, size of the message in bits.
+        @return: (bytes or bytearray) digest.
+        """
+        self.init()
+        self.update(message, messageSizeT1)
+        return self.final()
+
+    def getBackendName(self, messageSizeT1=None):
+        """!
+        Returns the name of the implementation used by the current computation or, if it is not chosen yet, of the
+        implementation that would be chosen for a message of the given size.
+
+        @param messageSizeT1: (int) optional, size of the next message in bits.
+        @return: (string) name of the implementation (e.g. "hashlib" or "python").
+        """
+        if self._backend is not None:
+            return self._backendName
+        return _selectBackend(self._name, self._bitOriented
+                              or ((messageSizeT1 is not None) and (messageSizeT1 % 8 != 0)))[0]
+
+
+class SHA256(HashFunctionDispatch):
+    def __init__(self, bitOriented=False):
+        """!
+        SHA256 hash function, native for byte-aligned messages and pure Python for sizes in bits.
+        Standard defined in NIST FIPS PUB 180-4.
+
+        @param bitOriented: (Boolean) optional, always selects the pure Python implementation.
+        """
+        super().__init__("SHA256", bitOriented)
+
+
+class SHA384(HashFunctionDispatch):
+    def __init__(self):
+        """!
+        SHA384 hash function, native only (sizes in bits not multiple of 8 are not implemented).
+        Standard defined in NIST FIPS PUB 180-4.
+        """
+        super().__init__("SHA384")
+
+
+class SHA512(HashFunctionDispatch):
+    def __init__(self):
+        """!
+        SHA512 hash function, native only (sizes in bits not multiple of 8 are not implemented).
+        Standard defined in NIST FIPS PUB 180-4.
+        """
+        super().__init__("SHA512")
@@ -0,0 +1,152 @@
+#  *********************************************************************************************************************
+#  Copyright (c) 2022-2023 by THALES
+#  All rights reserved.
+#  SIX Background Intellectual Property (69333045)
+#  ---------------------------------------------------------------------------------------------------------------------
+#  Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+#  following conditions are met:
+#  * Redistributions of source code must retain the present copyright notice, this list of conditions and the following
+#  disclaimer.
+#  * Redistributions in binary form must reproduce the present copyright notice, this list of conditions and the
+#  following disclaimer in the documentation and/or other materials provided with the distribution.
+#  * Neither the name of THALES nor the names of its contributors may be used to endorse or promote products derived
+#  from this software without specific prior written permission.
+#  ---------------------------------------------------------------------------------------------------------------------
+#  PART OF THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS ``AS IS'' AND SHALL REMAIN SUBJECT
+#  TO THEIR APPLICABLE TERMS AND CONDITIONS OF LICENCE. ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED
+#  TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+#  SHALL THE REGENTS AND CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF
+#  USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#  ---------------------------------------------------------------------------------------------------------------------
+#  SCR Python Cryptographic Library (SPCL)
+#  File : HashFunction_dispatch_autotest.py
+#  Classification : OPEN
+#  *********************************************************************************************************************
+
+from py_public.HashFunction.HashFunction_dispatch import SHA256, SHA512, getBackends
+import py_public.HashFunction.HashFunction_hashlib as HashFunction_hashlib
+import py_public.HashFunction.SHA256 as HashFunction_python
+from py_public.ModeI.HMAC import HMAC
+
+from hashlib import sha256
+
+
+"""
+Partie 1 : Choix de l'implémentation.
+L'implémentation native est choisie pour les messages alignés sur l'octet, l'implémentation Python dès qu'une taille en
+bits non multiple de 8 est utilisée.
+"""
+
+if getBackends("SHA256") != [("hashlib", False), ("python", True)] or getBackends("SHA512") != [("hashlib", False)]:
+    raise Exception("Autotest HashFunction_dispatch : erreur registre des implémentations")
+
+hashFunction = SHA256()
+if hashFunction.getBackendName() != "hashlib" or hashFunction.getBackendName(31) != "python" \
+        or SHA256(bitOriented=True).getBackendName() != "python":
+    raise Exception("Autotest HashFunction_dispatch : erreur choix de l'implémentation")
+
+message = bytes(range(256)) * 3
+hashFunction.init()
+hashFunction.update(message[:100])
+if hashFunction.getBackendName() != "hashlib":
+    raise Exception("Autotest HashFunction_dispatch : erreur implémentation d'un message aligné")
+clone = hashFunction.copy()
+hashFunction.update(message[100:])
+clone.update(message[100:200], 800)
+if hashFunction.final() != sha256(message).digest() or clone.final() != sha256(message[:200]).digest() \
+        or SHA512().oneShot(message) != HashFunction_hashlib.SHA512().oneShot(message):
+    raise Exception("Autotest HashFunction_dispatch : erreur empreinte d'un message aligné")
+
+
+"""
+Partie 2 : Vecteur de tests du NIST SHA256 avec une taille en bits non multiple de 8.
+"""
+
+message = bytes([
+                 0x4d, 0xe3, 0xca, 0x0f, 0x86, 0xb9, 0x07, 0x5b, 0xda, 0x56, 0xa5, 0x65, 0x52, 0x72, 0x09, 0x4c,
+                 0x9c, 0xce, 0x83, 0x73, 0xa6, 0x75, 0x81, 0xe0, 0x6c, 0x42, 0x03, 0xe2, 0x0e, 0xa2, 0x4f, 0xf7,
+                 0x25, 0x9b, 0xe6, 0xec, 0x57, 0x0e, 0xb6, 0x46, 0x29, 0x39, 0x91, 0xe1, 0x15, 0x7f, 0xde, 0xd7,
+                 0xdd, 0x6c, 0x8f, 0xa3, 0x1e, 0xf4, 0x53, 0x87, 0x28, 0xfb, 0x0c, 0x2b, 0x0d, 0x1b, 0x83, 0x86])
+
+expectedDigest = bytes([
+                 0xdb, 0x59, 0x1c, 0x08, 0x8d, 0xe9, 0xd7, 0xfe, 0x8c, 0x4a, 0xda, 0xe4, 0x5e, 0xa8, 0x45, 0xb2,
+                 0xc9, 0xdf, 0x1c, 0x5b, 0x38, 0x6a, 0xaf, 0xe7, 0x02, 0xb0, 0xb8, 0x40, 0x67, 0xba, 0x9f, 0x69])
+
+if SHA256().oneShot(message, 8 * 60 + 31) != expectedDigest:
+    raise Exception("Autotest HashFunction_dispatch : erreur vecteur NIST, taille en bits (one-shot)")
+
+# En flux, le premier bloc aligné est rejoué dans l'implémentation Python quand la taille en bits apparaît
+hashFunction = SHA256()
+hashFunction.update(message[:60])
+if hashFunction.getBackendName() != "hashlib":
+    raise Exception("Autotest HashFunction_dispatch : erreur choix différé de l'implémentation")
+hashFunction.update(message[60:], 31)
+if hashFunction.getBackendName() != "python" or hashFunction.final() != expectedDigest:
+    raise Exception("Autotest HashFunction_dispatch : erreur rejeu des données en attente")
+
+# Au-delà d'un bloc aligné, l'implémentation native ne peut plus être quittée
+hashFunction = SHA256()
+hashFunction.update(message + message[:60])
+try:
+    hashFunction.update(message[60:], 31)
+except Exception:
+    pass
+else:
+    raise Exception("Autotest HashFunction_dispatch : erreur changement d'implémentation en cours de calcul")
+
+hashFunction = SHA256(bitOriented=True)
+hashFunction.init()
+hashFunction.update(message[:60])
+hashFunction.update(message[60:], 31)
+if hashFunction.final() != expectedDigest:
+    raise Exception("Autotest HashFunction_dispatch : erreur vecteur NIST, taille en bits (init/update/final)")
+
+
+"""
+Partie 3 : HMAC sur la fonction de hachage à implémentation automatique.
+"""
+
+key = bytes(range(32))
+if HMAC(SHA256()).protectOneShot(message, key) != HMAC(HashFunction_hashlib.SHA256()).protectOneShot(message, key):
+    raise Exception("Autotest HashFunction_dispatch : erreur HMAC")
+
+# Taille en bits non multiple de 8 : la clé complétée absorbée d'abord est rejouée dans l'implémentation Python
+key = b'k' * 20
+if HMAC(SHA256()).protectOneShot(b'\xab\xcd\xef', key, messageSizeT1=20) \
+        != HMAC(HashFunction_python.SHA256()).protectOneShot(b'\xab\xcd\xef', key, messageSizeT1=20):
+    raise Exception("Autotest HashFunction_dispatch : erreur HMAC, taille en bits")
+
+
+"""
+Partie 4 : Copie de l'état.
+La copie est de la même classe et indépendante de l'original. Un bloc en attente copié reste utilisable avec une suite du
+message en bits, dans l'original comme dans la copie.
+"""
+
+block = bytes(range(64))
+function = SHA256()
+function.update(block)
+clone = function.copy()
+if type(clone) is not SHA256:
+    raise Exception("Autotest HashFunction_dispatch : erreur classe de la copie")
+clone.update(b'\xab\xcd\xef')
+if clone.final() != sha256(block + b'\xab\xcd\xef').digest():
+    raise Exception("Autotest HashFunction_dispatch : erreur copie, suite alignée")
+clone = function.copy()
+clone.update(b'\xab\xcd\xef', 20)
+if clone.final() != HashFunction_python.SHA256().oneShot(block + b'\xab\xcd\xef', 532):
+    raise Exception("Autotest HashFunction_dispatch : erreur copie, suite en bits")
+function.update(b'\xab\xcd\xef', 20)
+if function.final() != HashFunction_python.SHA256().oneShot(block + b'\xab\xcd\xef', 532):
+    raise Exception("Autotest HashFunction_dispatch : erreur original après copie, suite en bits")
+
+function = SHA512()
+function.update(b'abc')
+clone = function.copy()
+clone.update(b'def')
+if (type(clone) is not SHA512) or (clone.final() != HashFunction_hashlib.SHA512().oneShot(b'abcdef')) \
+        or (function.final() != HashFunction_hashlib.SHA512().oneShot(b'abc')):
+    raise Exception("Autotest HashFunction_dispatch : erreur copie SHA512")
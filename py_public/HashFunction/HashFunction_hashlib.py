@@ -64,6 +64,17 @@ class SHA256(HashFunction):
         """
         return self._hashlib.digest()
 
+    def copy(self):
+        """!
+        Returns an independent copy of the hash function, including the state of the current computation.
+
+        @return: (SHA256) copy.
+        """
+        clone = type(self).__new__(type(self))  # Même classe, sans construction ni copie générique
+        clone.__dict__.update(self.__dict__)
+        clone._hashlib = self._hashlib.copy()
+        return clone
+
     def oneShot(self, message, messageSizeT1=None):
         """!
         Computes the digest of a message in one-shot.
@@ -109,6 +120,17 @@ class SHA384(HashFunction):
         """
         return self._hashlib.digest()
 
+    def copy(self):
+        """!
+        Returns an independent copy of the hash function, including the state of the current computation.
+
+        @return: (SHA384) copy.
+        """
+        clone = type(self).__new__(type(self))  # Même classe, sans construction ni copie générique
+        clone.__dict__.update(self.__dict__)
+        clone._hashlib = self._hashlib.copy()
+        return clone
+
     def oneShot(self, message, messageSizeT1=None):
         """!
         Computes the digest of a message in one-shot.
@@ -154,6 +176,17 @@ class SHA512(HashFunction):
         """
         return self._hashlib.digest()
 
+    def copy(self):
+        """!
+        Returns an independent copy of the hash function, including the state of the current computation.
+
+        @return: (SHA512) copy.
+        """
+        clone = type(self).__new__(type(self))  # Même classe, sans construction ni copie générique
+        clone.__dict__.update(self.__dict__)
+        clone._hashlib = self._hashlib.copy()
+        return clone
+
     def oneShot(self, message, messageSizeT1=None):
         """!
         Computes the digest of a message in one-shot.
@@ -199,6 +232,17 @@ class SHAKE256_256(HashFunction):
         """
         return self._hashlib.digest(32)
 
+    def copy(self):
+        """!
+        Returns an independent copy of the hash function, including the state of the current computation.
+
+        @return: (SHAKE256_256) copy.
+        """
+        clone = type(self).__new__(type(self))  # Même classe, sans construction ni copie générique
+        clone.__dict__.update(self.__dict__)
+        clone._hashlib = self._hashlib.copy()
+        return clone
+
     def oneShot(self, message, messageSizeT1=None):
         """!
         Computes the digest of a message in one-shot.
@@ -244,6 +288,17 @@ class SHAKE256_384(HashFunction):
         """
         return self._hashlib.digest(self._digestSizeT8)
 
+    def copy(self):
+        """!
+        Returns an independent copy of the hash function, including the state of the current computation.
+
+        @return: (SHAKE256_384) copy.
+        """
+        clone = type(self).__new__(type(self))  # Même classe, sans construction ni copie générique
+        clone.__dict__.update(self.__dict__)
+        clone._hashlib = self._hashlib.copy()
+        return clone
+
     def oneShot(self, message, messageSizeT1=None):
         """!
         Computes the digest of a message in one-shot.
@@ -289,6 +344,17 @@ class SHAKE256_512(HashFunction):
         """
         return self._hashlib.digest(self._digestSizeT8)
 
+    def copy(self):
+        """!
+        Returns an independent copy of the hash function, including the state of the current computation.
+
+        @return: (SHAKE256_512) copy.
+        """
+        clone = type(self).__new__(type(self))  # Même classe, sans construction ni copie générique
+        clone.__dict__.update(self.__dict__)
+        clone._hashlib = self._hashlib.copy()
+        return clone
+
     def oneShot(self, message, messageSizeT1=None):
         """!
         Computes the digest of a message in one-shot.
@@ -165,4 +165,21 @@ hashFunction.update(message[100:])
 digest = hashFunction.final()
 
 if digest != expectedDigest:
-    raise Exception("Autotest SHAKE256_256 (hashlib) : erreur vecteur NIST (init/update/final)")
\ No newline at end of file
+    raise Exception("Autotest SHAKE256_256 (hashlib) : erreur vecteur NIST (init/update/final)")
+"""
+Partie 4 : Copie d'un état intermédiaire.
+La copie et l'original se poursuivent indépendamment.
+"""
+
+for hashClass in [SHA256, SHA512, SHAKE256_256]:
+    hashFunction = hashClass()
+    hashFunction.init()
+    hashFunction.update(b'prefixe commun ')
+    clone = hashFunction.copy()
+    other = hashFunction.clone()
+    hashFunction.update(b'suffixe 1')
+    clone.update(b'suffixe 2')
+    if (hashFunction.final() != hashClass().oneShot(b'prefixe commun suffixe 1')) \
+            or (clone.final() != hashClass().oneShot(b'prefixe commun suffixe 2')) \
+            or (other.final() != hashClass().oneShot(b'prefixe commun ')):
+        raise Exception("Autotest " + hashFunction.getName() + " (hashlib) : erreur copie d'un état intermédiaire")
@@ -29,7 +29,17 @@
 
 from py_abstract.HashFunction import HashFunction
 from py_public.Toolbox.ByteArrayTools import *
-from py_public.Toolbox.WordTools import Word32_RROT, Word32_RSH
+from copy import copy
+from struct import pack, unpack_from
+
+_K = (0x428a2f98, 0x71374491, 0xb5c0fbcf, 0xe9b5dba5, 0x3956c25b, 0x59f111f1, 0x923f82a4, 0xab1c5ed5,
+      0xd807aa98, 0x12835b01, 0x243185be, 0x550c7dc3, 0x72be5d74, 0x80deb1fe, 0x9bdc06a7, 0xc19bf174,
+      0xe49b69c1, 0xefbe4786, 0x0fc19dc6, 0x240ca1cc, 0x2de92c6f, 0x4a7484aa, 0x5cb0a9dc, 0x76f988da,
+      0x983e5152, 0xa831c66d, 0xb00327c8, 0xbf597fc7, 0xc6e00bf3, 0xd5a79147, 0x06ca6351, 0x14292967,
+      0x27b70a85, 0x2e1b2138, 0x4d2c6dfc, 0x53380d13, 0x650a7354, 0x766a0abb, 0x81c2c92e, 0x92722c85,
+      0xa2bfe8a1, 0xa81a664b, 0xc24b8b70, 0xc76c51a3, 0xd192e819, 0xd6990624, 0xf40e3585, 0x106aa070,
+      0x19a4c116, 0x1e376c08, 0x2748774c, 0x34b0bcb5, 0x391c0cb3, 0x4ed8aa4a, 0x5b9cca4f, 0x682e6ff3,
+      0x748f82ee, 0x78a5636f, 0x84c87814, 0x8cc70208, 0x90befffa, 0xa4506ceb, 0xbef9a3f7, 0xc67178f2)
 
 
 class SHA256(HashFunction):
@@ -39,90 +49,170 @@ class SHA256(HashFunction):
         super().__init__("SHA256", self._blockSize, self._digestSize)
         self._cache = bytearray(0)
         self._cacheLenT1 = 0
-        self._k = [0x428a2f98, 0x71374491, 0xb5c0fbcf, 0xe9b5dba5, 0x3956c25b, 0x59f111f1, 0x923f82a4, 0xab1c5ed5,
-                  0xd807aa98, 0x12835b01, 0x243185be, 0x550c7dc3, 0x72be5d74, 0x80deb1fe, 0x9bdc06a7, 0xc19bf174,
-                  0xe49b69c1, 0xefbe4786, 0x0fc19dc6, 0x240ca1cc, 0x2de92c6f, 0x4a7484aa, 0x5cb0a9dc, 0x76f988da,
-                  0x983e5152, 0xa831c66d, 0xb00327c8, 0xbf597fc7, 0xc6e00bf3, 0xd5a79147, 0x06ca6351, 0x14292967,
-                  0x27b70a85, 0x2e1b2138, 0x4d2c6dfc, 0x53380d13, 0x650a7354, 0x766a0abb, 0x81c2c92e, 0x92722c85,
-                  0xa2bfe8a1, 0xa81a664b, 0xc24b8b70, 0xc76c51a3, 0xd192e819, 0xd6990624, 0xf40e3585, 0x106aa070,
-                  0x19a4c116, 0x1e376c08, 0x2748774c, 0x34b0bcb5, 0x391c0cb3, 0x4ed8aa4a, 0x5b9cca4f, 0x682e6ff3,
-                  0x748f82ee, 0x78a5636f, 0x84c87814, 0x8cc70208, 0x90befffa, 0xa4506ceb, 0xbef9a3f7, 0xc67178f2]
+        self._lengthT1 = 0
+        self._k = _K
         self._h = []
 
     def init(self):
         self._h = [0x6a09e667, 0xbb67ae85, 0x3c6ef372, 0xa54ff53a, 0x510e527f, 0x9b05688c, 0x1f83d9ab, 0x5be0cd19]
+        self._cache = bytearray(0)  # Abandon d'un éventuel calcul non finalisé
+        self._cacheLenT1 = 0
+        self._lengthT1 = 0
+
+    def copy(self):
+        """!
+        Returns an independent copy of the hash function, including the state of the current computation.
+
+        @return: (SHA256) copy.
+        """
+        clone = copy(self)
+        clone._h = list(self._h)  # Les constantes self._k sont partagées
+        clone._cache = bytearray(self._cache)
+        return clone
 
     def update(self, message, messageSizeT1=None):
 
         if messageSizeT1 == 0:
-            self._cache += bytearray(0)
-            self._cacheLenT1 += messageSizeT1
             return
         if messageSizeT1 is None:
             messageSizeT1 = 8 * len(message)
+        self._lengthT1 += messageSizeT1
+        if (self._cacheLenT1 % 8) == 0:
+            # Cache aligné sur l'octet : les blocs complets du message sont compressés sans recopie
+            nbBytes = messageSizeT1 >> 3
+            if not isinstance(message, (bytes, bytearray, memoryview)):  # Ex. liste d'entiers
+                message = bytes(message)
+            view = memoryview(message)
+            offset = 0
+            if self._cache:
+                offset = min(self._blockSize - len(self._cache), nbBytes)
+                self._cache += view[:offset]
+                if len(self._cache) == self._blockSize:
+                    _compressBlocks(self._h, self._cache, 0, self._blockSize)
+                    del self._cache[:]
+            if not self._cache:
+                end = offset + (nbBytes - offset) // self._blockSize * self._blockSize
+                _compressBlocks(self._h, view, offset, end)
+                self._cache += view[end:nbBytes]
+            if messageSizeT1 % 8 != 0:
+                self._cache.append(message[nbBytes] & (0xFF << (8 - messageSizeT1 % 8)) & 0xFF)
+            self._cacheLenT1 = 8 * len(self._cache) - (-messageSizeT1 % 8)
+            return
         if messageSizeT1 % 8 != 0:
             message = bytearray(message)
             message[-1] = message[-1] & (0xFF << (8 - messageSizeT1 % 8))
-        if (self._cacheLenT1 % 8) == 0:
-            self._cache += bytes(message)
-        else:
-            shift = self._cacheLenT1 % 8
-            self._cache[-1] ^= message[0] >> shift
-            for i in range(((messageSizeT1 + 7) >> 3) - 1):
-                self._cache += bytes([((message[i] << 8 - shift)
-                                       | (message[i + 1] >> shift)) & 0xFF])
-            if ((messageSizeT1 % 8) + (self._cacheLenT1 % 8)) > 8:
-                self._cache += ByteArray_fromInt((message[-1] << 8 - shift) & 0xFF, 1)
+        shift = self._cacheLenT1 % 8
+        self._cache[-1] ^= message[0] >> shift
+        for i in range(((messageSizeT1 + 7) >> 3) - 1):
+            self._cache += bytes([((message[i] << 8 - shift)
+                                   | (message[i + 1] >> shift)) & 0xFF])
+        if (((messageSizeT1 - 1) % 8) + 1 + shift) > 8:  # Bits restants du dernier octet du message
+            self._cache += ByteArray_fromInt((message[-1] << 8 - shift) & 0xFF, 1)
         self._cacheLenT1 += messageSizeT1
+        # Compression des blocs complets, seule la fin partielle reste en cache
+        nbBlocks = self._cacheLenT1 // (8 * self._blockSize)
+        if nbBlocks > 0:
+            _compressBlocks(self._h, self._cache, 0, nbBlocks * self._blockSize)
+            del self._cache[:nbBlocks * self._blockSize]
+            self._cacheLenT1 -= nbBlocks * 8 * self._blockSize
 
     def final(self):
-        if (self._cacheLenT1 % 8) != 0:
+        # Le padding porte sur la longueur totale, le cache ne contient que la fin partielle
+        msgt1 = self._lengthT1
+        if (msgt1 % 8) != 0:
             # padding si taille mod 8 != 0 (bit-oriented)
-            msgt1 = self._cacheLenT1
             k = (448 - (msgt1 + 1)) % 512
             self.update(bytes([0x80]), 1)
             self.update(bytearray((k + 7 >> 3)), k)
             self.update(bytearray(msgt1.to_bytes(8, byteorder="big")), 64)
         else:
             # padding si taille mod 8 == 0 (byte-oriented)
-            msgt1 = self._cacheLenT1
             k = (448 - (msgt1 + 8)) % 512
             self.update(bytes([0x80]), 8)
             self.update(bytearray((k >> 3)), k)
             self.update(bytearray(msgt1.to_bytes(8, byteorder="big")), 64)
 
-        for offset in range(0, len(self._cache), 64):
-            w = []
-            buffer = self._cache[offset: offset + 64]
-            for i in range(16):
-                w.append(ByteArray_toInt(buffer[i * 4: i * 4 + 4]))
-            for i in range(16, 64):
-                s0 = Word32_RROT(w[i - 15], 7) ^ Word32_RROT(w[i - 15], 18) ^ Word32_RSH(w[i - 15], 3)
-                s1 = Word32_RROT(w[i - 2], 17) ^ Word32_RROT(w[i - 2], 19) ^ Word32_RSH(w[i - 2], 10)
-                w.append((s0 + s1 + w[i - 16] + w[i - 7]) & 0xFFFFFFFF)
-
-            a, b, c, d, e, f, g, h = self._h[0], self._h[1], self._h[2], self._h[3], self._h[4], self._h[5], self._h[6], self._h[7]
-
-            for i in range(64):
-                S1 = Word32_RROT(e, 6) ^ Word32_RROT(e, 11) ^ Word32_RROT(e, 25)
-                Ch = ((e & f) ^ (~e & g)) & 0XFFFFFFFF
-                T1 = (h + S1 + Ch + self._k[i] + w[i]) & 0XFFFFFFFF
-                S0 = Word32_RROT(a, 2) ^ Word32_RROT(a, 13) ^ Word32_RROT(a, 22)
-                Maj = (a & b) ^ (a & c) ^ (b & c)
-                T2 = (S0 + Maj) & 0XFFFFFFFF
-                h, g, f, e, d, c, b, a = g, f, e, ((d+T1) & 0XFFFFFFFF), c, b, a, ((T1+T2) & 0XFFFFFFFF)
-
-            self._h[0] = (a + self._h[0]) & 0XFFFFFFFF
-            self._h[1] = (b + self._h[1]) & 0XFFFFFFFF
-            self._h[2] = (c + self._h[2]) & 0XFFFFFFFF
-            self._h[3] = (d + self._h[3]) & 0XFFFFFFFF
-            self._h[4] = (e + self._h[4]) & 0XFFFFFFFF
-            self._h[5] = (f + self._h[5]) & 0XFFFFFFFF
-            self._h[6] = (g + self._h[6]) & 0XFFFFFFFF
-            self._h[7] = (h + self._h[7]) & 0XFFFFFFFF
-
-        # RAZ
+        # RAZ (tous les blocs ont été compressés au fil des mises à jour)
         self._cache = bytearray(0)
         self._cacheLenT1 = 0
+        self._lengthT1 = 0
+
+        return bytearray(pack('>8I', *self._h))
+
+
+def _compressBlocks(state, data, offset, end):
+    """!
+    Fonction de compression de SHA256 appliquée aux blocs de 64 octets de data compris entre offset et end.
+    Les mots sont extraits en une fois, les rotations sont calculées en ligne sur le mot doublé (x | x << 32) et les
+    tours sont déroulés par 8 (les variables changent de rôle d'un tour à l'autre au lieu d'être permutées).
+    Les rotations ne sont pas réduites à 32 bits : seuls les 32 bits de poids faible d'une somme modulo 2^32 comptent.
+
+    @param state: (liste de 8 entiers) valeurs de hachage intermédiaires, mises à jour en place
+    @param data: (bytes, bytearray ou memoryview) données
+    @param offset: (int) position du premier bloc
+    @param end: (int) fin des blocs, offset + un multiple de 64
+    """
+    K = _K
+    h0, h1, h2, h3, h4, h5, h6, h7 = state
+    for blockOffset in range(offset, end, 64):
+        w = list(unpack_from('>16I', data, blockOffset))
+        for i in range(16, 64):  # Expansion du bloc
+            x = w[i - 15]
+            y = w[i - 2]
+            xx = x | x << 32  # Mot doublé : ses décalages à droite sont des rotations
+            yy = y | y << 32
+            w.append((w[i - 16] + ((xx >> 7) ^ (xx >> 18) ^ (x >> 3)) + w[i - 7]
+                      + ((yy >> 17) ^ (yy >> 19) ^ (y >> 10))) & 0xffffffff)
+
+        a, b, c, d, e, f, g, h = h0, h1, h2, h3, h4, h5, h6, h7
+        for i in range(0, 64, 8):
+            x = e | e << 32
+            t1 = h + ((x >> 6) ^ (x >> 11) ^ (x >> 25)) + (g ^ (e & (f ^ g))) + K[i] + w[i]
+            d = (d + t1) & 0xffffffff
+            x = a | a << 32
+            h = (t1 + ((x >> 2) ^ (x >> 13) ^ (x >> 22)) + ((a & b) | (c & (a | b)))) & 0xffffffff
+            x = d | d << 32
+            t1 = g + ((x >> 6) ^ (x >> 11) ^ (x >> 25)) + (f ^ (d & (e ^ f))) + K[i + 1] + w[i + 1]
+            c = (c + t1) & 0xffffffff
+            x = h | h << 32
+            g = (t1 + ((x >> 2) ^ (x >> 13) ^ (x >> 22)) + ((h & a) | (b & (h | a)))) & 0xffffffff
+            x = c | c << 32
+            t1 = f + ((x >> 6) ^ (x >> 11) ^ (x >> 25)) + (e ^ (c & (d ^ e))) + K[i + 2] + w[i + 2]
+            b = (b + t1) & 0xffffffff
+            x = g | g << 32
+            f = (t1 + ((x >> 2) ^ (x >> 13) ^ (x >> 22)) + ((g & h) | (a & (g | h)))) & 0xffffffff
+            x = b | b << 32
+            t1 = e + ((x >> 6) ^ (x >> 11) ^ (x >> 25)) + (d ^ (b & (c ^ d))) + K[i + 3] + w[i + 3]
+            a = (a + t1) & 0xffffffff
+            x = f | f << 32
+            e = (t1 + ((x >> 2) ^ (x >> 13) ^ (x >> 22)) + ((f & g) | (h & (f | g)))) & 0xffffffff
+            x = a | a << 32
+            t1 = d + ((x >> 6) ^ (x >> 11) ^ (x >> 25)) + (c ^ (a & (b ^ c))) + K[i + 4] + w[i + 4]
+            h = (h + t1) & 0xffffffff
+            x = e | e << 32
+            d = (t1 + ((x >> 2) ^ (x >> 13) ^ (x >> 22)) + ((e & f) | (g & (e | f)))) & 0xffffffff
+            x = h | h << 32
+            t1 = c + ((x >> 6) ^ (x >> 11) ^ (x >> 25)) + (b ^ (h & (a ^ b))) + K[i + 5] + w[i + 5]
+            g = (g + t1) & 0xffffffff
+            x = d | d << 32
+            c = (t1 + ((x >> 2) ^ (x >> 13) ^ (x >> 22)) + ((d & e) | (f & (d | e)))) & 0xffffffff
+            x = g | g << 32
+            t1 = b + ((x >> 6) ^ (x >> 11) ^ (x >> 25)) + (a ^ (g & (h ^ a))) + K[i + 6] + w[i + 6]
+            f = (f + t1) & 0xffffffff
+            x = c | c << 32
+            b = (t1 + ((x >> 2) ^ (x >> 13) ^ (x >> 22)) + ((c & d) | (e & (c | d)))) & 0xffffffff
+            x = f | f << 32
+            t1 = a + ((x >> 6) ^ (x >> 11) ^ (x >> 25)) + (h ^ (f & (g ^ h))) + K[i + 7] + w[i + 7]
+            e = (e + t1) & 0xffffffff
+            x = b | b << 32
+            a = (t1 + ((x >> 2) ^ (x >> 13) ^ (x >> 22)) + ((b & c) | (d & (b | c)))) & 0xffffffff
 
-        return ByteArray_fromInt(self._h[0], 4) + ByteArray_fromInt(self._h[1],4) + ByteArray_fromInt(self._h[2],4) + ByteArray_fromInt(self._h[3],4) + ByteArray_fromInt(self._h[4],4) + ByteArray_fromInt(self._h[5],4) + ByteArray_fromInt(self._h[6],4) + ByteArray_fromInt(self._h[7],4)
\ No newline at end of file
+        h0 = (h0 + a) & 0xffffffff
+        h1 = (h1 + b) & 0xffffffff
+        h2 = (h2 + c) & 0xffffffff
+        h3 = (h3 + d) & 0xffffffff
+        h4 = (h4 + e) & 0xffffffff
+        h5 = (h5 + f) & 0xffffffff
+        h6 = (h6 + g) & 0xffffffff
+        h7 = (h7 + h) & 0xffffffff
+    state[:] = [h0, h1, h2, h3, h4, h5, h6, h7]
@@ -105,3 +105,54 @@ if digest != expectedDigest:
     raise Exception("Autotest SHA256 : erreur vecteur CAVP NIST short messages-> taille en bits du message, modulo 8, differente de "
                     "0 (init/update/final)")
 
+
+"""
+Partie 4 : Copie d'un état intermédiaire.
+La copie et l'original se poursuivent indépendamment, y compris avec une taille en bits non multiple de 8.
+"""
+
+prefix = bytes(range(100))
+hashFunction = SHA256()
+hashFunction.init()
+hashFunction.update(prefix)
+clone = hashFunction.copy()
+hashFunction.update(b'suffixe 1')
+clone.update(b'suffixe 2')
+other = clone.clone()
+other.update(b'\xe0', 3)
+clone.update(b'\xff', 3)
+if hashFunction.final() != SHA256().oneShot(prefix + b'suffixe 1') \
+        or clone.final() != SHA256().oneShot(prefix + b'suffixe 2\xe0', 8 * len(prefix) + 75) \
+        or other.final() != clone.oneShot(prefix + b'suffixe 2\xe0', 8 * len(prefix) + 75):
+    raise Exception("Autotest SHA256 : erreur copie d'un état intermédiaire")
+
+
+"""
+Partie 5 : Compression au fil de l'eau.
+Un message découpé en morceaux irréguliers, alignés ou non sur l'octet, donne la même empreinte qu'en un seul appel.
+"""
+
+message = bytes((7 * i + 3) & 0xFF for i in range(1000))
+for sizesT1 in ([8 * 1000], [8, 504, 512, 6976], [3, 5, 17, 511, 1, 64, 7399], [1] * 100 + [7900]):
+    hashFunction = SHA256()
+    hashFunction.init()
+    offsetT1 = 0
+    for sizeT1 in sizesT1:
+        # Extraction des bits [offsetT1, offsetT1 + sizeT1) du message
+        value = (int.from_bytes(message, 'big') >> (8 * len(message) - offsetT1 - sizeT1)) & ((1 << sizeT1) - 1)
+        hashFunction.update((value << (-sizeT1 % 8)).to_bytes((sizeT1 + 7) // 8, 'big'), sizeT1)
+        offsetT1 += sizeT1
+    if hashFunction.final() != SHA256().oneShot(message):
+        raise Exception("Autotest SHA256 : erreur compression au fil de l'eau")
+
+
+"""
+Partie 6 : Message donné sous forme de liste d'entiers.
+"""
+
+hashFunction = SHA256()
+hashFunction.init()
+hashFunction.update(list(message[:100]))
+hashFunction.update(list(message[100:]))
+if (SHA256().oneShot(list(message)) != SHA256().oneShot(message)) or (hashFunction.final() != SHA256().oneShot(message)):
+    raise Exception("Autotest SHA256 : erreur message sous forme de liste d'entiers")
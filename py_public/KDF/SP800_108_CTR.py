@@ -27,6 +27,7 @@
 #  *********************************************************************************************************************
 
 from py_public.KDF.SP800_108 import SP800_108, defaultFixedInfo
+from py_public.ModeI.HMAC import HMAC
 from py_abstract.Error import *
 
 
@@ -44,12 +45,21 @@ class SP800_108_CTR(SP800_108):
         else:
             self._outputSizeLeftT1 -= outputSizeT1
 
-        while len(self._randomStream) < outputSizeT1//8:
-            self._prf.protectInit()
-            info = self._fixedInfo(self._i, self._counterSizeT1, self._label, self._context, self._totalOutputSizeT1)
-            self._prf.protectUpdate(info)
-            self._randomStream += self._prf.protectFinal()
-            self._i += 1
+        if isinstance(self._prf, HMAC) and (len(self._randomStream) < outputSizeT1//8):
+            # Tous les blocs manquants en un seul appel, à partir des états internes de la clé
+            nbBlocks = -((len(self._randomStream) - outputSizeT1//8) // self._prf.getTagSizeT8())
+            infos = [self._fixedInfo(i, self._counterSizeT1, self._label, self._context, self._totalOutputSizeT1)
+                     for i in range(self._i, self._i + nbBlocks)]
+            self._randomStream += self._prf.protectMany(infos, concatenate=True)
+            self._i += nbBlocks
+        else:
+            while len(self._randomStream) < outputSizeT1//8:
+                self._prf.protectInit()
+                info = self._fixedInfo(self._i, self._counterSizeT1, self._label, self._context,
+                                       self._totalOutputSizeT1)
+                self._prf.protectUpdate(info)
+                self._randomStream += self._prf.protectFinal()
+                self._i += 1
 
         # Extraction de result
         result = self._randomStream[:(outputSizeT1 // 8)]
@@ -29,20 +29,27 @@
 from py_abstract.ModeC import ModeC
 from py_abstract.BlockCipher import BlockCipher
 from py_abstract.Error import *
-from py_public.Toolbox.ByteArrayTools import ByteArray_XOR
+from py_public.Toolbox.ParallelTools import ParallelBlocks
 
 
-class CBC(ModeC):
-    def __init__(self, blockCipher: BlockCipher):
+class CBC(ParallelBlocks, ModeC):
+    def __init__(self, blockCipher: BlockCipher, nbWorkers=0, parallelMinSizeT8=1 << 20):
         """!
         CBC confidentiality mode.
         Standard defined in NIST SP 800-38A.
+        The block decryptions being independent, large ciphertexts may be decrypted by a pool of processes
+        (disabled by default), kept under the same key until close; the result is identical to the sequential
+        decryption.
 
         @param blockCipher: (BlockCipher) instantiated underlying block cipher.
+        @param nbWorkers: (int) optional, number of processes of the parallel decryption (0: sequential decryption).
+        @param parallelMinSizeT8: (int) optional, minimal size in bytes of an update decrypted in parallel.
         """
         super().__init__("CBC", blockCipher)
         self._incompleteBlock = bytearray(0)  # Bloc incomplet
         self._lastBlock = bytearray(0)  # Bloc précédent pour le chainage
+        self._nbWorkers = nbWorkers
+        self._parallelMinSizeT8 = parallelMinSizeT8
 
     def encryptInit(self, IV):
         """!
@@ -50,6 +57,7 @@ class CBC(ModeC):
 
         @param IV: (bytes or bytearray) initialization vector.
         """
+        self._checkPool()  # Pool de processus sous la clé courante
         self._incompleteBlock = bytearray(0)  # Bloc incomplet
         self._lastBlock = bytearray(IV)
 
@@ -67,28 +75,41 @@ class CBC(ModeC):
         if (plaintextSizeT1 % 8) != 0:
             raise ErrNotImplemented
 
-        ciphertext = bytearray(0)
         nbFullBytes = plaintextSizeT1 // 8
+        plaintext = memoryview(plaintext)  # Pas de copie lors des découpages
+        # Allocation unique de la sortie
+        ciphertext = bytearray(((len(self._incompleteBlock) + nbFullBytes) // self._blockSizeT8) * self._blockSizeT8)
+        output = memoryview(ciphertext)
+        blockSizeT8 = self._blockSizeT8
+        chaining = int.from_bytes(self._lastBlock, 'big')  # Bloc de chainage sous forme d'entier
         bytesOffset = 0
+        outputOffset = 0
 
         if len(self._incompleteBlock) > 0:  # Complétion d'un précédent bloc incomplet
-            tailleMin = min(self._blockSizeT8 - len(self._incompleteBlock), nbFullBytes)
+            tailleMin = min(blockSizeT8 - len(self._incompleteBlock), nbFullBytes)
             self._incompleteBlock += plaintext[:tailleMin]
             bytesOffset += tailleMin
 
-            if len(self._incompleteBlock) == self._blockSizeT8:  # Chiffrement du bloc
-                self._lastBlock = self._blockCipher.encrypt(ByteArray_XOR(self._incompleteBlock, self._lastBlock))
-                ciphertext += self._lastBlock
+            if len(self._incompleteBlock) == blockSizeT8:  # Chiffrement du bloc
+                output[0:blockSizeT8] = (int.from_bytes(self._incompleteBlock, 'big') ^ chaining).to_bytes(blockSizeT8, 'big')
+                self._blockCipher.encryptInto(ciphertext, ciphertext, 0, 0)  # Chiffrement en place
+                chaining = int.from_bytes(output[0:blockSizeT8], 'big')
+                outputOffset += blockSizeT8
                 self._incompleteBlock = bytearray(0)
 
-        while nbFullBytes - bytesOffset >= self._blockSizeT8:  # Traitement des blocs complets
-            self._lastBlock = self._blockCipher.encrypt(
-                ByteArray_XOR(plaintext[bytesOffset:bytesOffset + self._blockSizeT8], self._lastBlock))
-            ciphertext += self._lastBlock
-            bytesOffset += self._blockSizeT8
+        while nbFullBytes - bytesOffset >= blockSizeT8:  # Traitement des blocs complets
+            output[outputOffset:outputOffset + blockSizeT8] = \
+                (int.from_bytes(plaintext[bytesOffset:bytesOffset + blockSizeT8], 'big') ^ chaining).to_bytes(blockSizeT8, 'big')
+            self._blockCipher.encryptInto(ciphertext, ciphertext, outputOffset, outputOffset)  # Chiffrement en place
+            chaining = int.from_bytes(output[outputOffset:outputOffset + blockSizeT8], 'big')
+            bytesOffset += blockSizeT8
+            outputOffset += blockSizeT8
 
+        if outputOffset > 0:
+            self._lastBlock = bytearray(output[outputOffset - blockSizeT8:outputOffset])
         if bytesOffset < nbFullBytes:
-            self._incompleteBlock += plaintext[bytesOffset:]
+            self._incompleteBlock += plaintext[bytesOffset:nbFullBytes]
+        output.release()
 
         return ciphertext
 
@@ -116,29 +137,47 @@ class CBC(ModeC):
         if (ciphertextSizeT1 % 8) != 0:
             raise ErrNotImplemented
 
-        plaintext = bytearray(0)
         nbFullBytes = ciphertextSizeT1 // 8
+        ciphertext = memoryview(ciphertext)  # Pas de copie lors des découpages
+        # Allocation unique de la sortie
+        plaintext = bytearray(((len(self._incompleteBlock) + nbFullBytes) // self._blockSizeT8) * self._blockSizeT8)
+        output = memoryview(plaintext)
+        blockSizeT8 = self._blockSizeT8
+        chaining = int.from_bytes(self._lastBlock, 'big')  # Bloc de chainage sous forme d'entier
         bytesOffset = 0
+        outputOffset = 0
 
         if len(self._incompleteBlock) > 0:  # Complétion d'un précédent bloc incomplet
-            tailleMin = min(self._blockSizeT8 - len(self._incompleteBlock), nbFullBytes)
+            tailleMin = min(blockSizeT8 - len(self._incompleteBlock), nbFullBytes)
             self._incompleteBlock += ciphertext[:tailleMin]
             bytesOffset += tailleMin
 
-            if len(self._incompleteBlock) == self._blockSizeT8:  # Déchiffrement du bloc
-                plaintext += ByteArray_XOR(self._blockCipher.decrypt(self._incompleteBlock), self._lastBlock)
+            if len(self._incompleteBlock) == blockSizeT8:  # Déchiffrement du bloc
+                self._blockCipher.decryptInto(self._incompleteBlock, plaintext, 0, 0)
+                output[0:blockSizeT8] = (int.from_bytes(output[0:blockSizeT8], 'big') ^ chaining).to_bytes(blockSizeT8, 'big')
+                chaining = int.from_bytes(self._incompleteBlock, 'big')
                 self._lastBlock = self._incompleteBlock
+                outputOffset += blockSizeT8
                 self._incompleteBlock = bytearray(0)
 
-        while nbFullBytes - bytesOffset >= self._blockSizeT8:  # Traitement des blocs complets
-            plaintext += ByteArray_XOR(self._lastBlock,
-                                       self._blockCipher.decrypt(
-                                           ciphertext[bytesOffset:bytesOffset + self._blockSizeT8]))
-            self._lastBlock = ciphertext[bytesOffset:bytesOffset + self._blockSizeT8]
-            bytesOffset += self._blockSizeT8
-
+        blocksSizeT8 = ((nbFullBytes - bytesOffset) // blockSizeT8) * blockSizeT8
+        if blocksSizeT8 > 0:  # Traitement des blocs complets : les déchiffrements sont indépendants
+            if self._isParallel(blocksSizeT8):
+                decryptedBlocks = self._getPool().decryptBlocks(ciphertext[bytesOffset:bytesOffset + blocksSizeT8])
+            else:
+                decryptedBlocks = self._blockCipher.decryptBlocks(ciphertext[bytesOffset:bytesOffset + blocksSizeT8])
+            # Blocs de chainage : bloc précédent suivi des chiffrés sauf le dernier
+            chainingBlocks = (chaining << (8 * (blocksSizeT8 - blockSizeT8))) \
+                | int.from_bytes(ciphertext[bytesOffset:bytesOffset + blocksSizeT8 - blockSizeT8], 'big')
+            output[outputOffset:outputOffset + blocksSizeT8] = \
+                (int.from_bytes(decryptedBlocks, 'big') ^ chainingBlocks).to_bytes(blocksSizeT8, 'big')
+            bytesOffset += blocksSizeT8
+
+        if bytesOffset >= blockSizeT8:
+            self._lastBlock = bytearray(ciphertext[bytesOffset - blockSizeT8:bytesOffset])
         if bytesOffset < nbFullBytes:
-            self._incompleteBlock += ciphertext[bytesOffset:]
+            self._incompleteBlock += ciphertext[bytesOffset:nbFullBytes]
+        output.release()
 
         return plaintext
 
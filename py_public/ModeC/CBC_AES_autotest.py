@@ -28,6 +28,7 @@
 
 from py_public.BlockCipher.AES import AES128, AES192, AES256
 from py_public.ModeC.CBC import CBC
+from multiprocessing import get_start_method
 
 """
 Partie 1 : Vecteurs de tests du NIST
@@ -85,4 +86,21 @@ plaintext += modeC.decryptUpdate(expectedCiphertext[49:])
 plaintext += modeC.decryptFinal()
 
 if plaintext != expectedPlaintext:
-    raise Exception("Autotest CBC AES 128 : erreur vecteur NIST (déchiffrement mode flux)")
\ No newline at end of file
+    raise Exception("Autotest CBC AES 128 : erreur vecteur NIST (déchiffrement mode flux)")
+
+"""
+Partie 2 : Déchiffrement parallèle (pool de processus)
+Le test n'est exécuté qu'avec la méthode de démarrage fork : les autotests sont importés sans garde __main__.
+"""
+
+if get_start_method() == "fork":
+    message = bytes(range(256)) * 40 + expectedPlaintext
+    ciphertext = CBC(AES128()).encryptOneShot(IV, message, key=key)
+    parallelModeC = CBC(AES128(), nbWorkers=2, parallelMinSizeT8=256)
+    if parallelModeC.decryptOneShot(IV, ciphertext, key=key) != message:
+        raise Exception("Autotest CBC AES 128 : erreur déchiffrement parallèle")
+    parallelModeC.decryptInit(IV)
+    plaintext = parallelModeC.decryptUpdate(ciphertext[:7]) + parallelModeC.decryptUpdate(ciphertext[7:])
+    if plaintext != message:
+        raise Exception("Autotest CBC AES 128 : erreur déchiffrement parallèle (mode flux)")
+    parallelModeC.close()
@@ -29,7 +29,8 @@
 from py_abstract.ModeC import ModeC
 from py_abstract.BlockCipher import BlockCipher
 from py_abstract.Error import *
-from py_public.Toolbox.ByteArrayTools import ByteArray_print
+from py_public.Toolbox.ByteArrayTools import ByteArray_print, ByteArray_XORInPlace
+from py_public.Toolbox.ParallelTools import ParallelBlocks
 
 
 def defaultIncrementFunction(IV):
@@ -46,17 +47,45 @@ def defaultIncrementFunction(IV):
         IV[i] = (IV[i] + 1) % 256
 
 
-class CTR(ModeC):
-    def __init__(self, blockCipher: BlockCipher, incrementFunction=defaultIncrementFunction):
+class CTR(ParallelBlocks, ModeC):
+    def __init__(self, blockCipher: BlockCipher, incrementFunction=defaultIncrementFunction, counterSizeT1=None,
+                 nbWorkers=0, parallelMinSizeT8=4 << 20, chunkSizeT8=4096):
         """!
         CTR confidentiality mode.
         Standard defined in NIST SP 800-38A.
+        When the counter is the counterSizeT1 least significant bits of the IV, incremented modulo 2^counterSizeT1,
+        the counter block of any block index is computed directly from the IV: the keystream is seekable and
+        large keystreams may be computed by a pool of processes, kept under the same key until close.
 
         @param blockCipher: (BlockCipher) instantiated underlying block cipher.
+        @param incrementFunction: (function) optional, in place incrementation of the counter block.
+        @param counterSizeT1: (int) optional, size in bits of the counter incremented by incrementFunction (whole
+        block for the default incrementation function). If unknown, counter blocks are computed by calling
+        incrementFunction.
+        @param nbWorkers: (int) optional, number of processes computing the keystream (0: sequential computation).
+        @param parallelMinSizeT8: (int) optional, minimal keystream size in bytes computed in parallel (4 MB by
+        default: smaller updates do not pay for the transfers to the processes).
+        @param chunkSizeT8: (int) optional, size in bytes of the keystream chunks computed in advance, multiple of
+        the block size.
         """
         super().__init__("CTR", blockCipher)
         self._incrementFunction = incrementFunction
-        self._randomStream = bytearray(0)  # Flux chiffrant (chiffrement de l'IV)
+        if (counterSizeT1 is None) and (incrementFunction is defaultIncrementFunction):
+            counterSizeT1 = 8 * self._blockSizeT8
+        if (counterSizeT1 is not None) and not (0 < counterSizeT1 <= 8 * self._blockSizeT8):
+            raise ErrParameters
+        self._counterSizeT1 = counterSizeT1
+        if (chunkSizeT8 <= 0) or ((chunkSizeT8 % self._blockSizeT8) != 0):
+            raise ErrParameters
+        self._chunkSizeT8 = chunkSizeT8
+        self._nbWorkers = nbWorkers
+        self._parallelMinSizeT8 = parallelMinSizeT8
+        self._randomStream = bytearray(0)  # Flux chiffrant calculé d'avance
+        self._randomStreamOffset = 0  # Nombre d'octets du flux chiffrant déjà consommés
+        self._nextStreamSizeT8 = self._blockSizeT8  # Taille du prochain flux chiffrant calculé d'avance
+        self._blockIndex = 0  # Indice du prochain bloc compteur
+        self._counter = bytearray(0)  # Compteur courant (fonction d'incrémentation quelconque)
+        self._counterIndex = 0  # Indice du compteur courant
 
     def encryptInit(self, IV):
         """!
@@ -64,8 +93,30 @@ class CTR(ModeC):
 
         @param IV: (bytes or bytearray) initialization vector.
         """
-        self._randomStream = bytearray(0)  # Flux chiffrant (chiffrement de l'IV)
+        self._checkPool()  # Pool de processus sous la clé courante
+        self._randomStream = bytearray(0)  # Flux chiffrant épuisé
+        self._randomStreamOffset = 0
+        self._nextStreamSizeT8 = self._blockSizeT8
         self._IV = bytearray(IV)
+        self._blockIndex = 0
+        self._counter = bytearray(IV)
+        self._counterIndex = 0
+
+    def seek(self, byteOffset):
+        """!
+        Moves the encryption (or decryption) to a given position of the message.
+        The next update processes the message from byteOffset on, e.g. for random access decryption.
+
+        @param byteOffset: (int) position in bytes from the beginning of the message.
+        """
+        if byteOffset < 0:
+            raise ErrParameters
+        self._blockIndex = byteOffset // self._blockSizeT8
+        self._randomStream = bytearray(0)  # Flux chiffrant épuisé
+        self._randomStreamOffset = 0
+        if (byteOffset % self._blockSizeT8) != 0:  # Position au milieu d'un bloc
+            self._randomStream = self._keystream(1)
+            self._randomStreamOffset = byteOffset % self._blockSizeT8
 
     def encryptUpdate(self, plaintext, plaintextSizeT1=None):
         """!
@@ -83,19 +134,27 @@ class CTR(ModeC):
 
         ciphertext = bytearray(plaintext)  # copie du plaintext
         NbFullBytes = plaintextSizeT1 // 8
-        bytesOffset = 0
-        while bytesOffset < NbFullBytes:
-            xorSizeT8 = min(len(self._randomStream),
-                            NbFullBytes - bytesOffset)  # longueur max du XOR (taille du flux chiffrant et taille du reste à chiffre)
-            for i in range(xorSizeT8):  # Chiffrement
-                ciphertext[bytesOffset + i] ^= self._randomStream[i]
-            bytesOffset += xorSizeT8
-
-            if xorSizeT8 >= len(self._randomStream):  # Renouvellement du flux chiffrant
-                self._randomStream = self._blockCipher.encrypt(self._IV)  # Chiffrement de l'IV
-                self._incrementFunction(self._IV)  # Incrémentation de l'IV
-            else:  # Sauvegarde du flux chiffrant restant pour le prochain update
-                self._randomStream = self._randomStream[xorSizeT8:]
+
+        # Flux chiffrant restant du précédent update, consommé à partir de son décalage sans copie
+        bytesOffset = min(len(self._randomStream) - self._randomStreamOffset, NbFullBytes)
+        ByteArray_XORInPlace(ciphertext, self._randomStream, 0, self._randomStreamOffset, bytesOffset)
+        self._randomStreamOffset += bytesOffset
+
+        directSizeT8 = ((NbFullBytes - bytesOffset) // self._chunkSizeT8) * self._chunkSizeT8
+        if directSizeT8 > 0:  # Tranches complètes : flux chiffrant calculé en un seul appel et utilisé directement
+            ByteArray_XORInPlace(ciphertext, self._keystream(directSizeT8 // self._blockSizeT8), bytesOffset, 0,
+                                 directSizeT8)
+            bytesOffset += directSizeT8
+
+        xorSizeT8 = NbFullBytes - bytesOffset
+        if xorSizeT8 > 0:  # Fin du message : flux chiffrant calculé d'avance, le reste est conservé
+            # La taille calculée d'avance double à chaque renouvellement jusqu'à la taille de tranche : les messages
+            # courts ne calculent que le flux chiffrant nécessaire
+            streamSizeT8 = min(self._chunkSizeT8, max(self._nextStreamSizeT8, xorSizeT8))
+            self._nextStreamSizeT8 = min(self._chunkSizeT8, 2 * streamSizeT8)
+            self._randomStream = self._keystream((streamSizeT8 + self._blockSizeT8 - 1) // self._blockSizeT8)
+            ByteArray_XORInPlace(ciphertext, self._randomStream, bytesOffset, 0, xorSizeT8)
+            self._randomStreamOffset = xorSizeT8
 
         return ciphertext
 
@@ -127,3 +186,81 @@ class CTR(ModeC):
         @return: (byterray) empty string.
         """
         return bytearray(0)
+
+    def encryptOneShotManyKeys(self, IV, plaintext, keys, plaintextSizeT1=None):
+        """!
+        Encrypts in one-shot the same message under each key of a list.
+        The counter blocks do not depend on the key: they are computed once and encrypted under all keys with a
+        single call to the underlying block cipher.
+        The key loaded after the call is unspecified.
+
+        @param IV: (bytes or bytearray) initialization vector, common to all keys.
+        @param plaintext: (bytes or bytearray) message to encrypt.
+        @param keys: (list of bytes or bytearray) keys.
+        @param plaintextSizeT1: (int) optional, plaintext size in bits.
+        @return: (bytearray) concatenation, for each key, of the ciphertexts.
+        """
+        if plaintextSizeT1 is None:
+            plaintextSizeT1 = 8 * len(plaintext)
+        if (plaintextSizeT1 % 8) != 0:
+            raise ErrNotImplemented
+
+        plaintextSizeT8 = plaintextSizeT1 // 8
+        if plaintextSizeT8 == 0:
+            return bytearray(0)
+        nbBlocks = (plaintextSizeT8 + self._blockSizeT8 - 1) // self._blockSizeT8
+        self.encryptInit(IV)
+        counterBlocks = self._counterBlocks(nbBlocks)  # Blocs compteurs, communs à toutes les clés
+
+        randomStreams = self._blockCipher.encryptUnderKeys(keys, counterBlocks)  # Flux chiffrants de toutes les clés
+        message = int.from_bytes(plaintext[:plaintextSizeT8], byteorder="big")
+        output = bytearray(plaintextSizeT8 * len(keys))  # Allocation unique de la sortie
+        streamOffset = 0
+        for offset in range(0, len(output), plaintextSizeT8):
+            randomStream = int.from_bytes(randomStreams[streamOffset:streamOffset + plaintextSizeT8], byteorder="big")
+            output[offset:offset + plaintextSizeT8] = (message ^ randomStream).to_bytes(plaintextSizeT8, byteorder="big")
+            streamOffset += len(counterBlocks)
+        return output
+
+    def _keystream(self, nbBlocks):
+        """!
+        Calcule les nbBlocks blocs de flux chiffrant suivants en un seul appel à l'algorithme de chiffrement par bloc,
+        ou par un pool de processus pour les grandes tailles.
+
+        @param nbBlocks: (int) nombre de blocs de flux chiffrant.
+        @return: (bytearray) flux chiffrant.
+        """
+        counterBlocks = self._counterBlocks(nbBlocks)
+        if self._isParallel(len(counterBlocks)):
+            return self._getPool().encryptBlocks(counterBlocks)
+        return self._blockCipher.encryptBlocks(counterBlocks)
+
+    def _counterBlocks(self, nbBlocks):
+        """!
+        Concatène les nbBlocks blocs compteurs à partir de l'indice courant, qui est avancé de nbBlocks.
+
+        @param nbBlocks: (int) nombre de blocs compteurs.
+        @return: (bytes ou bytearray) blocs compteurs.
+        """
+        blockSizeT8 = self._blockSizeT8
+        if self._counterSizeT1 is not None:  # Calcul direct : IV + indice modulo 2^counterSizeT1
+            mask = (1 << self._counterSizeT1) - 1
+            IV = int.from_bytes(self._IV, 'big')
+            prefix = IV & ~mask
+            counter = (IV & mask) + self._blockIndex
+            counterBlocks = b''.join([(prefix | ((counter + i) & mask)).to_bytes(blockSizeT8, 'big')
+                                      for i in range(nbBlocks)])
+        else:  # Fonction d'incrémentation quelconque : avance du compteur courant
+            if self._counterIndex > self._blockIndex:  # Retour en arrière, reprise depuis l'IV
+                self._counter = bytearray(self._IV)
+                self._counterIndex = 0
+            while self._counterIndex < self._blockIndex:
+                self._incrementFunction(self._counter)
+                self._counterIndex += 1
+            counterBlocks = bytearray(nbBlocks * blockSizeT8)
+            for offset in range(0, len(counterBlocks), blockSizeT8):
+                counterBlocks[offset:offset + blockSizeT8] = self._counter
+                self._incrementFunction(self._counter)
+            self._counterIndex += nbBlocks
+        self._blockIndex += nbBlocks
+        return counterBlocks
@@ -27,7 +27,8 @@
 #  *********************************************************************************************************************
 
 from py_public.BlockCipher.AES import AES128, AES192, AES256
-from py_public.ModeC.CTR import CTR
+from py_public.ModeC.CTR import CTR, defaultIncrementFunction
+from multiprocessing import get_start_method
 
 """
 Partie 1 : Vecteurs de tests du NIST
@@ -51,3 +52,87 @@ ciphertext = modeC.encryptOneShot(IV, expectedPlaintext, key=key)
 
 if ciphertext != expectedCiphertext:
     raise Exception("Autotest CTR AES 128 : erreur vecteur NIST")
+
+
+"""
+Partie 2 : Chiffrement d'un même message sous plusieurs clés
+"""
+
+keys = [key, bytes(range(16)), bytes(range(16, 32))]
+for message in [expectedPlaintext, expectedPlaintext[:16], expectedPlaintext[:5], b'']:
+    expected = bytearray(0)
+    for k in keys:
+        expected += modeC.encryptOneShot(IV, message, key=k)
+    if modeC.encryptOneShotManyKeys(IV, message, keys) != expected:
+        raise Exception("Autotest CTR AES 128 : erreur chiffrement sous plusieurs clés")
+
+
+"""
+Partie 3 : Accès aléatoire au flux chiffrant (seek) et calcul parallèle
+"""
+
+
+def lastByteIncrementFunction(counter):
+    counter[-1] = (counter[-1] + 1) % 256
+
+
+message = bytes(range(256)) * 4
+for incrementFunction, counterSizeT1 in [(defaultIncrementFunction, None), (lastByteIncrementFunction, None),
+                                         (lastByteIncrementFunction, 8)]:
+    modeC = CTR(AES128(), incrementFunction, counterSizeT1)
+    modeC.setKey(key)
+    ciphertext = modeC.encryptOneShot(IV, message)
+    # Référence : blocs compteurs obtenus par appels successifs à la fonction d'incrémentation
+    counter = bytearray(IV)
+    counterBlocks = bytearray(0)
+    for _ in range(len(message) // 16):
+        counterBlocks += counter
+        incrementFunction(counter)
+    keystream = bytearray(0)
+    blockCipher = AES128()
+    blockCipher.setKey(key)
+    for offset in range(0, len(counterBlocks), 16):
+        keystream += blockCipher.encrypt(counterBlocks[offset:offset + 16])
+    if ciphertext != bytes(m ^ k for m, k in zip(message, keystream)):
+        raise Exception("Autotest CTR AES 128 : erreur calcul des blocs compteurs")
+    modeC.decryptInit(IV)
+    for (start, end) in [(700, 1024), (3, 40), (16, 17), (0, 1024), (1000, 1001), (511, 700)]:
+        modeC.seek(start)
+        if modeC.decryptUpdate(ciphertext[start:end]) != message[start:end]:
+            raise Exception("Autotest CTR AES 128 : erreur accès aléatoire (seek)")
+
+if get_start_method() == "fork":
+    modeC = CTR(AES128(), nbWorkers=2, parallelMinSizeT8=256)
+    if modeC.encryptOneShot(IV, message, key=key) != CTR(AES128()).encryptOneShot(IV, message, key=key):
+        raise Exception("Autotest CTR AES 128 : erreur calcul parallèle du flux chiffrant")
+    # Mode flux : updates parallèles et séquentiels alternés, puis changement de clé
+    reference = CTR(AES128()).encryptOneShot(IV, message, key=key)
+    modeC.encryptInit(IV)
+    ciphertext = bytearray(0)
+    for (start, end) in [(0, 300), (300, 310), (310, 700), (700, 1024)]:
+        ciphertext += modeC.encryptUpdate(message[start:end])
+    if ciphertext != reference:
+        raise Exception("Autotest CTR AES 128 : erreur calcul parallèle du flux chiffrant (mode flux)")
+    otherKey = bytes(16)
+    if modeC.encryptOneShot(IV, message, key=otherKey) != CTR(AES128()).encryptOneShot(IV, message, key=otherKey):
+        raise Exception("Autotest CTR AES 128 : erreur calcul parallèle du flux chiffrant après changement de clé")
+    modeC.close()
+
+
+"""
+Partie 4 : Flux chiffrant calculé d'avance par tranches
+"""
+
+reference = CTR(AES128()).encryptOneShot(IV, message, key=key)
+for chunkSizeT8 in [16, 64, 4096]:
+    modeC = CTR(AES128(), chunkSizeT8=chunkSizeT8)
+    modeC.setKey(key)
+    modeC.encryptInit(IV)
+    ciphertext = bytearray(0)
+    offset = 0
+    for size in [1, 15, 33, 0, 100, 160, 3, 500, 16, 200]:
+        ciphertext += modeC.encryptUpdate(message[offset:offset + size])
+        offset += size
+    ciphertext += modeC.encryptFinal()
+    if ciphertext != reference:
+        raise Exception("Autotest CTR AES 128 : erreur flux chiffrant par tranches")
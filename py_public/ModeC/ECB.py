@@ -29,21 +29,29 @@
 from py_abstract.ModeC import ModeC
 from py_abstract.BlockCipher import BlockCipher
 from py_abstract.Error import *
+from py_public.Toolbox.ParallelTools import ParallelBlocks
 
 
-class ECB(ModeC):
-    def __init__(self, blockCipher: BlockCipher):
+class ECB(ParallelBlocks, ModeC):
+    def __init__(self, blockCipher: BlockCipher, nbWorkers=0, parallelMinSizeT8=1 << 20):
         """!
         Primitive de protection en confidentialité ECB.
         Standard défini par NIST SP 800-38A.
+        Les blocs étant indépendants, les grands messages peuvent être traités par un pool de processus (désactivé
+        par défaut), conservé sous la même clé jusqu'à close ; le résultat est identique au traitement séquentiel.
 
         @param blockCipher: (BlockCipher) algorithme de chiffrement par bloc instancié
+        @param nbWorkers: (int) optionnel, nombre de processus du traitement parallèle (0 : traitement séquentiel)
+        @param parallelMinSizeT8: (int) optionnel, taille minimale en octets d'un update traité en parallèle
         """
         super().__init__("ECB", blockCipher)
         self._incompleteBlock = bytearray(0)  # Bloc incomplet
+        self._nbWorkers = nbWorkers
+        self._parallelMinSizeT8 = parallelMinSizeT8
 
     def encryptInit(self):
         self._incompleteBlock = bytearray(0)  # Bloc incomplet
+        self._checkPool()  # Pool de processus sous la clé courante
 
     def encryptUpdate(self, plaintext, plaintextSizeT1=None):
         if plaintextSizeT1 is None:
@@ -51,9 +59,12 @@ class ECB(ModeC):
         if (plaintextSizeT1 % 8) != 0:
             raise ErrNotImplemented
 
-        ciphertext = bytearray(0)
         nbFullBytes = plaintextSizeT1 // 8
+        plaintext = memoryview(plaintext)  # Pas de copie lors des découpages
+        # Allocation unique de la sortie
+        ciphertext = bytearray(((len(self._incompleteBlock) + nbFullBytes) // self._blockSizeT8) * self._blockSizeT8)
         bytesOffset = 0
+        outputOffset = 0
 
         if len(self._incompleteBlock) > 0:  # Complétion d'un précédent bloc incomplet
             tailleMin = min(self._blockSizeT8 - len(self._incompleteBlock), nbFullBytes)
@@ -61,15 +72,19 @@ class ECB(ModeC):
             bytesOffset += tailleMin
 
             if len(self._incompleteBlock) == self._blockSizeT8:  # Chiffrement du bloc
-                ciphertext += self._blockCipher.encrypt(self._incompleteBlock)
+                self._blockCipher.encryptInto(self._incompleteBlock, ciphertext, 0, 0)
+                outputOffset += self._blockSizeT8
                 self._incompleteBlock = bytearray(0)
 
-        while nbFullBytes - bytesOffset >= self._blockSizeT8:  # Traitement des blocs complets
-            ciphertext += self._blockCipher.encrypt(plaintext[bytesOffset:bytesOffset + self._blockSizeT8])
-            bytesOffset += self._blockSizeT8
+        blocksSizeT8 = ((nbFullBytes - bytesOffset) // self._blockSizeT8) * self._blockSizeT8
+        if self._isParallel(blocksSizeT8):  # Traitement parallèle
+            ciphertext[outputOffset:] = self._getPool().encryptBlocks(plaintext[bytesOffset:bytesOffset + blocksSizeT8])
+        elif blocksSizeT8 > 0:  # Traitement des blocs complets en un seul appel
+            ciphertext[outputOffset:] = self._blockCipher.encryptBlocks(plaintext[bytesOffset:bytesOffset + blocksSizeT8])
+        bytesOffset += blocksSizeT8
 
         if bytesOffset < nbFullBytes:
-            self._incompleteBlock += plaintext[bytesOffset:]
+            self._incompleteBlock += plaintext[bytesOffset:nbFullBytes]
 
         return ciphertext
 
@@ -80,6 +95,7 @@ class ECB(ModeC):
 
     def decryptInit(self):
         self._incompleteBlock = bytearray(0)  # Bloc incomplet
+        self._checkPool()  # Pool de processus sous la clé courante
 
     def decryptUpdate(self, ciphertext, ciphertextSizeT1=None):
         if ciphertextSizeT1 is None:
@@ -87,9 +103,12 @@ class ECB(ModeC):
         if (ciphertextSizeT1 % 8) != 0:
             raise ErrNotImplemented
 
-        plaintext = bytearray(0)
         nbFullBytes = ciphertextSizeT1 // 8
+        ciphertext = memoryview(ciphertext)  # Pas de copie lors des découpages
+        # Allocation unique de la sortie
+        plaintext = bytearray(((len(self._incompleteBlock) + nbFullBytes) // self._blockSizeT8) * self._blockSizeT8)
         bytesOffset = 0
+        outputOffset = 0
 
         if len(self._incompleteBlock) > 0:  # Complétion d'un précédent bloc incomplet
             tailleMin = min(self._blockSizeT8 - len(self._incompleteBlock), nbFullBytes)
@@ -97,15 +116,19 @@ class ECB(ModeC):
             bytesOffset += tailleMin
 
             if len(self._incompleteBlock) == self._blockSizeT8:  # Déchiffrement du bloc
-                plaintext += self._blockCipher.decrypt(self._incompleteBlock)
+                self._blockCipher.decryptInto(self._incompleteBlock, plaintext, 0, 0)
+                outputOffset += self._blockSizeT8
                 self._incompleteBlock = bytearray(0)
 
-        while nbFullBytes - bytesOffset >= self._blockSizeT8:  # Traitement des blocs complets
-            plaintext += self._blockCipher.decrypt(ciphertext[bytesOffset:bytesOffset + self._blockSizeT8])
-            bytesOffset += self._blockSizeT8
+        blocksSizeT8 = ((nbFullBytes - bytesOffset) // self._blockSizeT8) * self._blockSizeT8
+        if self._isParallel(blocksSizeT8):  # Traitement parallèle
+            plaintext[outputOffset:] = self._getPool().decryptBlocks(ciphertext[bytesOffset:bytesOffset + blocksSizeT8])
+        elif blocksSizeT8 > 0:  # Traitement des blocs complets en un seul appel
+            plaintext[outputOffset:] = self._blockCipher.decryptBlocks(ciphertext[bytesOffset:bytesOffset + blocksSizeT8])
+        bytesOffset += blocksSizeT8
 
         if bytesOffset < nbFullBytes:
-            self._incompleteBlock += ciphertext[bytesOffset:]
+            self._incompleteBlock += ciphertext[bytesOffset:nbFullBytes]
 
         return plaintext
 
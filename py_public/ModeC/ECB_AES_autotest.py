@@ -28,6 +28,7 @@
 
 from py_public.BlockCipher.AES import AES128
 from py_public.ModeC.ECB import ECB
+from multiprocessing import get_start_method
 
 """
 Partie 1 : Vecteurs de tests du NIST
@@ -84,4 +85,38 @@ plaintext += modeC.decryptUpdate(expectedCiphertext[49:])
 plaintext += modeC.decryptFinal()
 
 if plaintext != expectedPlaintext:
-    raise Exception("Autotest ECB AES 128 : erreur vecteur NIST (déchiffrement mode flux)")
\ No newline at end of file
+    raise Exception("Autotest ECB AES 128 : erreur vecteur NIST (déchiffrement mode flux)")
+
+"""
+Partie 2 : Traitement parallèle (pool de processus)
+Le test n'est exécuté qu'avec la méthode de démarrage fork : les autotests sont importés sans garde __main__.
+"""
+
+if get_start_method() == "fork":
+    message = bytes(range(256)) * 40 + expectedPlaintext
+    modeC = ECB(AES128())
+    parallelModeC = ECB(AES128(), nbWorkers=2, parallelMinSizeT8=256)
+    ciphertext = modeC.encryptOneShot(message, key=key)
+    if parallelModeC.encryptOneShot(message, key=key) != ciphertext:
+        raise Exception("Autotest ECB AES 128 : erreur chiffrement parallèle")
+    if parallelModeC.decryptOneShot(ciphertext, key=key) != message:
+        raise Exception("Autotest ECB AES 128 : erreur déchiffrement parallèle")
+    # Le pool de processus suit la clé de l'algorithme partagé, quel que soit l'appelant de setKey
+    otherKey = bytes(16)
+    if (parallelModeC.encryptOneShot(message, key=key) != ciphertext) \
+            or (parallelModeC.encryptOneShot(message, key=otherKey) != modeC.encryptOneShot(message, key=otherKey)):
+        raise Exception("Autotest ECB AES 128 : erreur pool de processus après changement de clé")
+    sharedCipher = AES128()
+    parallelModeC = ECB(sharedCipher, nbWorkers=2, parallelMinSizeT8=1024)
+    parallelModeC.setKey(key)
+    parallelModeC.encryptInit()
+    parallelModeC.encryptUpdate(message)
+    sharedCipher.setKey(otherKey)  # Changement de clé hors du mode
+    parallelModeC.encryptInit()
+    if (parallelModeC.encryptUpdate(message[:4096]) != modeC.encryptOneShot(message[:4096], key=otherKey)) \
+            or (parallelModeC.encryptUpdate(message[4096:4112]) != modeC.encryptOneShot(message[4096:4112])):
+        raise Exception("Autotest ECB AES 128 : erreur pool de processus après changement de clé de l'algorithme")
+    parallelModeC.close()
+    if parallelModeC.encryptOneShot(message, key=key) != ciphertext:
+        raise Exception("Autotest ECB AES 128 : erreur chiffrement après arrêt du pool de processus")
+    parallelModeC.close()
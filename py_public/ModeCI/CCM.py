@@ -69,7 +69,7 @@ class CCM(ModeCI):
 
         self._formatFunction = formatFunction
 
-        # Instantiation des modes CTR et CBC avec la même instance du blockcipher
+        # Instantiation des modes CTR et CBCMAC avec la même instance du blockcipher
         self._CTR = CTR(self._blockCipher)
         self._CBCMAC = CBCMAC(self._blockCipher)
 
@@ -90,7 +90,7 @@ class CCM(ModeCI):
         if header is None:
             header = bytearray(0)
 
-        # Initialisation de CTR et CBC
+        # Initialisation de CTR et CBCMAC
         self._ptbytelenSizeT8 = 15 - len(IV)
         ctr0 = bytes([self._ptbytelenSizeT8 - 1]) + IV + bytes(self._ptbytelenSizeT8)
         self._CTR.encryptInit(ctr0)
@@ -108,7 +108,7 @@ class CCM(ModeCI):
         if (plaintextSizeT1 % 8) != 0:
             raise ErrNotImplemented
 
-        # Update des modes CTR et CBC
+        # Update de CTR (flux de clé calculé par lots de blocs) et du CBC-MAC
         ciphertext = self._CTR.encryptUpdate(plaintext, plaintextSizeT1)  # P xor S
         self._CBCMAC.protectUpdate(plaintext, plaintextSizeT1)
 
@@ -127,10 +127,9 @@ class CCM(ModeCI):
 
         # Padding et calcul du tag
         padding = (-((self._plaintextSizeT1 + 7) // 8) % self._blockSizeT8)  # Taille du padding
-        padding = bytearray(padding)  # padding
-        self._CBCMAC.protectUpdate(padding)
+        self._CBCMAC.protectUpdate(bytearray(padding))
         tag = self._CBCMAC.protectFinal()
-        ByteArray_XOR(tag, self._S0, tag) # T xor S0
+        ByteArray_XOR(tag, self._S0, tag)  # T xor S0
 
         return bytearray(0), tag[:self._tagSizeT8]
 
@@ -162,7 +161,7 @@ class CCM(ModeCI):
         if (ciphertextSizeT1 % 8) != 0:
             raise ErrNotImplemented
 
-        # Update des modes CTR et CBC
+        # Update de CTR (flux de clé calculé par lots de blocs) et du CBC-MAC
         plaintext = self._CTR.encryptUpdate(ciphertext, ciphertextSizeT1)  # P xor S
         self._CBCMAC.protectUpdate(plaintext, ciphertextSizeT1)
 
@@ -191,6 +190,3 @@ class CCM(ModeCI):
         if not flagVerif:
             return None, False
         return plaintext, flagVerif
-
-
-
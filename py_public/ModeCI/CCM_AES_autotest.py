@@ -157,3 +157,40 @@ dummy, flagVerif = modeCI.decryptFinal(expectedTag)
 if (ciphertext != expectedCiphertext) or (plaintext != expectedPlaintext) or (flagVerif is False):
     raise Exception("Autotest CCM AES 128 : erreur vecteur NIST (mode flux, IV 12 octets, entete 65536 octets, message 32 octets)")
 
+
+"""
+Partie 2 : Chiffrement et déchiffrement par morceaux de tailles irrégulières, donnés en memoryview.
+"""
+
+key = bytes(range(16))
+IV = bytes(range(13))
+header = bytes(range(37))
+message = bytes([(5 * i) & 0xff for i in range(500)])
+expectedCiphertext, expectedTag = CCM(AES128(), 16).encryptOneShot(IV, message, header, key=key)
+
+modeCI = CCM(AES128(), 16)
+modeCI.setKey(key)
+for chunkSizes in [[1], [15, 1, 17], [16], [3, 64, 5, 100], [500]]:
+    modeCI.encryptInit(IV, 8 * len(message), header)
+    ciphertext = bytearray(0)
+    offset = 0
+    n = 0
+    while offset < len(message):
+        chunkSize = chunkSizes[n % len(chunkSizes)]
+        ciphertext += modeCI.encryptUpdate(memoryview(message)[offset:offset + chunkSize])
+        offset += chunkSize
+        n += 1
+    dummy, tag = modeCI.encryptFinal()
+
+    modeCI.decryptInit(IV, 8 * len(message), header)
+    plaintext = bytearray(0)
+    offset = 0
+    while offset < len(ciphertext):
+        chunkSize = chunkSizes[n % len(chunkSizes)]
+        plaintext += modeCI.decryptUpdate(memoryview(ciphertext)[offset:offset + chunkSize])
+        offset += chunkSize
+        n += 1
+    dummy, flagVerif = modeCI.decryptFinal(tag)
+
+    if (ciphertext != expectedCiphertext) or (tag != expectedTag) or (plaintext != message) or (flagVerif != True):
+        raise Exception("Autotest CCM AES : erreur chiffrement par morceaux " + str(chunkSizes))
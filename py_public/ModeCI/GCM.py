@@ -30,28 +30,33 @@ from py_abstract.ModeCI import ModeCI
 from py_abstract.BlockCipher import BlockCipher
 from py_abstract.Error import *
 from py_public.ModeC.CTR import CTR
-from py_public.Toolbox.ByteArrayTools import ByteArray_XOR, ByteArray_toInt, ByteArray_fromInt
+from py_public.Toolbox.ByteArrayTools import ByteArray_XOR, ByteArray_fromInt
+from collections import OrderedDict
 
 
 class GCM(ModeCI):
-    def __init__(self, blockCipher: BlockCipher, requestedTagSizeT8=16):
+    def __init__(self, blockCipher: BlockCipher, requestedTagSizeT8=16, tableCacheSize=1):
         """!
         GCM mode for authenticated encryption with associated data.
         Standard defined in NIST SP 800-38D.
+        GHASH uses 8-bit tables of multiples of H, H^2, H^3 and H^4, computed by setKey, and folds 4 blocks at a time.
 
         @param blockCipher: (BlockCipher) instantiated underlying 128-bit-block cipher.
         @param requestedTagSizeT8: (int) optional, requested tag size in bytes (16 by default).
+        @param tableCacheSize: (int) optional, number of keys whose GHASH tables are kept in a LRU cache (1 by default:
+        setting again the current key costs no precomputation).
         """
         super().__init__("GCM", blockCipher)
         if self._blockSizeT8 != 16:
             raise ErrParameters
 
         # Instantiation du mode CTR avec la même instance du blockcipher
-        self._CTR = CTR(self._blockCipher, incrementFunction=_GCMincrementFunction)
+        self._CTR = CTR(self._blockCipher, incrementFunction=_GCMincrementFunction, counterSizeT1=32)
 
         # Initialisation des attributs internes
         self._encryptedBlock = bytearray(0)  # Block incomplet intermédiaire
         self._H = 0  # Sous-clé H
+        self._tables = ()  # Tables des multiples de H^4, H^3, H^2 et H, une table de 256 entrées par octet du bloc
         self._maskTag = bytearray(0)  # Xor final du tag
         self._currentTag = bytearray(0)  # Calcul du tag intermédiaire
         self._headerSizeT1 = 0
@@ -63,6 +68,11 @@ class GCM(ModeCI):
         else:
             self._tagSizeT8 = requestedTagSizeT8
 
+        if tableCacheSize < 0:
+            raise ErrParameters
+        self._tableCacheSize = tableCacheSize
+        self._tableCache = OrderedDict()  # Cache LRU clé -> (H, tables)
+
     def setKey(self, key):
         """!
         Sets the key.
@@ -70,8 +80,26 @@ class GCM(ModeCI):
         @param key: (bytes or bytearray) key.
         """
         super().setKey(key)
+        if self._tableCacheSize > 0:
+            cacheKey = bytes(key)
+            cached = self._tableCache.get(cacheKey)
+            if cached is not None:
+                self._tableCache.move_to_end(cacheKey)  # Clé la plus récemment utilisée
+                self._H, self._tables = cached
+                return
+
         H = self._blockCipher.encrypt(bytearray(16))  # H = encrypt(0)
         self._H = int.from_bytes(H, byteorder="big")
+        self._tables = ()
+        powerH = self._H
+        for k in range(4):  # Tables de H, H^2, H^3 et H^4 (agrégation de 4 blocs)
+            self._tables = _GCMmultiplicationTables(powerH) + self._tables
+            powerH = _GCMcarrylessMultiplication(powerH, self._H)
+
+        if self._tableCacheSize > 0:
+            self._tableCache[cacheKey] = (self._H, self._tables)
+            if len(self._tableCache) > self._tableCacheSize:
+                self._tableCache.popitem(last=False)  # Éviction de la clé la moins récemment utilisée
 
     def encryptInit(self, IV, header=None, headerSizeT1=None):
         """!
@@ -100,9 +128,14 @@ class GCM(ModeCI):
         self._CTR.encryptInit(self._IV)  # Initialisation du mode CTR
 
         self._currentTag = 0
-        if headerSizeT1 > 0:
-            padding = bytearray((-len(header)) % 16)  # padding à zéro du header
-            self._currentTag = self._updateGHASH(header + padding, self._currentTag)  # Intégrité pour les données additionnelles
+        if headerSizeT1 > 0:  # Intégrité pour les données additionnelles
+            headerSizeT8 = headerSizeT1 // 8
+            fullBlocksSizeT8 = headerSizeT8 - headerSizeT8 % 16
+            with memoryview(header) as view:
+                self._currentTag = self._updateGHASH(view[:fullBlocksSizeT8], self._currentTag)
+                if fullBlocksSizeT8 < headerSizeT8:  # padding à zéro du dernier bloc incomplet
+                    lastBlock = bytearray(view[fullBlocksSizeT8:headerSizeT8]) + bytearray(16 - headerSizeT8 % 16)
+                    self._currentTag = self._updateGHASH(lastBlock, self._currentTag)
 
         self._headerSizeT1 = headerSizeT1
         self._ciphertextSizeT1 = 0
@@ -125,16 +158,7 @@ class GCM(ModeCI):
         ciphertext = self._CTR.encryptUpdate(plaintext, plaintextSizeT1)
 
         # Intégrité
-        if len(self._encryptedBlock) + len(ciphertext) < 16:
-            self._encryptedBlock += ciphertext  # nouveau bloc incomplet
-        else:
-            tmp = self._encryptedBlock + ciphertext
-            incompleteBlockSizeT8 = (len(self._encryptedBlock) + len(ciphertext)) % 16
-            self._currentTag = self._updateGHASH(tmp[:len(tmp)-incompleteBlockSizeT8], self._currentTag)
-            if incompleteBlockSizeT8 == 0:
-                self._encryptedBlock = bytearray(0)
-            else:
-                self._encryptedBlock = ciphertext[-incompleteBlockSizeT8:]  # nouveau bloc incomplet
+        self._updateCiphertextGHASH(ciphertext, plaintextSizeT1 // 8)
 
         self._ciphertextSizeT1 += plaintextSizeT1
         return ciphertext
@@ -175,16 +199,7 @@ class GCM(ModeCI):
         plaintext = self._CTR.encryptUpdate(ciphertext, ciphertextSizeT1)
 
         # Intégrité
-        if len(self._encryptedBlock) + len(ciphertext) < 16:
-            self._encryptedBlock += ciphertext  # nouveau bloc incomplet
-        else:
-            tmp = self._encryptedBlock + ciphertext
-            incompleteBlockSizeT8 = (len(self._encryptedBlock) + len(ciphertext)) % 16
-            self._currentTag = self._updateGHASH(tmp[:len(tmp)-incompleteBlockSizeT8], self._currentTag)
-            if incompleteBlockSizeT8 == 0:
-                self._encryptedBlock = bytearray(0)
-            else:
-                self._encryptedBlock = ciphertext[-incompleteBlockSizeT8:]  # nouveau bloc incomplet
+        self._updateCiphertextGHASH(ciphertext, ciphertextSizeT1 // 8)
 
         self._ciphertextSizeT1 += ciphertextSizeT1
         return plaintext
@@ -210,20 +225,64 @@ class GCM(ModeCI):
             return None, False
         return dummy, tag == expectedTag
 
+    def _updateCiphertextGHASH(self, ciphertext, ciphertextSizeT8):
+        '''
+        Intégrité d'un morceau du chiffré : les blocs complets sont traités directement depuis une vue mémoire du
+        morceau, seul un bloc incomplet d'au plus 16 octets est conservé d'un appel à l'autre.
+
+        @param ciphertext: (bytes, bytearray ou memoryview) morceau du chiffré
+        @param ciphertextSizeT8: (entier) taille du morceau en octets
+        '''
+        with memoryview(ciphertext) as view:
+            offset = 0
+            if len(self._encryptedBlock) > 0:  # Complétion du bloc incomplet précédent
+                offset = min(16 - len(self._encryptedBlock), ciphertextSizeT8)
+                self._encryptedBlock += view[:offset]
+                if len(self._encryptedBlock) < 16:
+                    return
+                self._currentTag = self._updateGHASH(self._encryptedBlock, self._currentTag)
+                del self._encryptedBlock[:]
+
+            end = offset + ((ciphertextSizeT8 - offset) // 16) * 16
+            self._currentTag = self._updateGHASH(view[offset:end], self._currentTag)  # Blocs complets, sans copie
+            self._encryptedBlock += view[end:ciphertextSizeT8]  # nouveau bloc incomplet
+
     def _updateGHASH(self, x, y):
         '''
         Suite du calcul de la fonction GHASH de GCM sur une chaîne d'octets x étant donné une sous-clé H.
         La longueur de x doit être multiple de 16 octets, aucune vérification n'est effectuée.
         Dans le cas contraire, seul les blocs complets sont traités.
+        Les blocs sont agrégés par groupes de 4 : y = (y + x1).H^4 + x2.H^3 + x3.H^2 + x4.H, chaque produit étant la
+        somme de 16 entrées des tables précalculées (une par octet). Les blocs restants sont traités un par un.
 
-        @param x: (bytearray ou liste d'entiers) chaîne d'octets d'une longueur multiple de 16 octets
+        @param x: (bytes, bytearray ou memoryview) chaîne d'octets d'une longueur multiple de 16 octets
         @param y: (entier) résultat du calcul précédent de _updateGHASH ou 0
         :return:
         '''
-        for i in range(len(x) // 16):
-            xi = ByteArray_toInt(x[16 * i: 16 * (i + 1)])  # Conversion d'un block en un entier de 128 bits
-            y ^= xi
-            y = _GCMcarrylessMultiplication(y, self._H)
+        S = self._tables
+        offset = 0
+        groupsSizeT8 = (len(x) // 64) * 64
+        while offset < groupsSizeT8:  # Groupes de 4 blocs : une seule conversion par groupe
+            b = (int.from_bytes(x[offset:offset + 64], 'big') ^ (y << 384)).to_bytes(64, 'big')
+            y = S[0][b[0]] ^ S[1][b[1]] ^ S[2][b[2]] ^ S[3][b[3]] ^ S[4][b[4]] ^ S[5][b[5]] ^ S[6][b[6]] \
+                ^ S[7][b[7]] ^ S[8][b[8]] ^ S[9][b[9]] ^ S[10][b[10]] ^ S[11][b[11]] ^ S[12][b[12]] ^ S[13][b[13]] \
+                ^ S[14][b[14]] ^ S[15][b[15]] ^ S[16][b[16]] ^ S[17][b[17]] ^ S[18][b[18]] ^ S[19][b[19]] \
+                ^ S[20][b[20]] ^ S[21][b[21]] ^ S[22][b[22]] ^ S[23][b[23]] ^ S[24][b[24]] ^ S[25][b[25]] \
+                ^ S[26][b[26]] ^ S[27][b[27]] ^ S[28][b[28]] ^ S[29][b[29]] ^ S[30][b[30]] ^ S[31][b[31]] \
+                ^ S[32][b[32]] ^ S[33][b[33]] ^ S[34][b[34]] ^ S[35][b[35]] ^ S[36][b[36]] ^ S[37][b[37]] \
+                ^ S[38][b[38]] ^ S[39][b[39]] ^ S[40][b[40]] ^ S[41][b[41]] ^ S[42][b[42]] ^ S[43][b[43]] \
+                ^ S[44][b[44]] ^ S[45][b[45]] ^ S[46][b[46]] ^ S[47][b[47]] ^ S[48][b[48]] ^ S[49][b[49]] \
+                ^ S[50][b[50]] ^ S[51][b[51]] ^ S[52][b[52]] ^ S[53][b[53]] ^ S[54][b[54]] ^ S[55][b[55]] \
+                ^ S[56][b[56]] ^ S[57][b[57]] ^ S[58][b[58]] ^ S[59][b[59]] ^ S[60][b[60]] ^ S[61][b[61]] \
+                ^ S[62][b[62]] ^ S[63][b[63]]
+            offset += 64
+
+        T0, T1, T2, T3, T4, T5, T6, T7, T8, T9, T10, T11, T12, T13, T14, T15 = S[-16:]  # Tables de H
+        while offset + 16 <= len(x):
+            b = (y ^ int.from_bytes(x[offset:offset + 16], 'big')).to_bytes(16, 'big')
+            y = T0[b[0]] ^ T1[b[1]] ^ T2[b[2]] ^ T3[b[3]] ^ T4[b[4]] ^ T5[b[5]] ^ T6[b[6]] ^ T7[b[7]] \
+                ^ T8[b[8]] ^ T9[b[9]] ^ T10[b[10]] ^ T11[b[11]] ^ T12[b[12]] ^ T13[b[13]] ^ T14[b[14]] ^ T15[b[15]]
+            offset += 16
         return y
 
 
@@ -260,3 +319,30 @@ def _GCMcarrylessMultiplication(a: int, b: int):
         else:
             b >>= 1
     return c
+
+
+def _GCMmultiplicationTables(H: int):
+    '''
+    Précalcul des tables de multiplication par H : pour chaque position i d'octet du bloc et chaque valeur v de cet
+    octet, la table i contient le produit par H du bloc dont seul l'octet i vaut v.
+    La multiplication étant linéaire, chaque table se déduit des 8 produits des bits de l'octet.
+
+    @param H: (entier) sous-clé H sur 128 bits
+    @return:(tuple de 16 tuples de 256 entiers) tables des multiples de H
+    '''
+    tables = []
+    V = H  # V = H * X^k, k étant le rang du bit courant (bit de poids fort du bloc = X^0)
+    for i in range(16):
+        bitProducts = [0] * 8  # bitProducts[j] = produit par H du bit de valeur 2^j de l'octet i
+        for j in range(7, -1, -1):
+            bitProducts[j] = V
+            if V & 1:
+                V = (V >> 1) ^ 0xe1000000000000000000000000000000  # Réduction polynomiale X^128 + X^7 + X^2 + X + 1
+            else:
+                V >>= 1
+        table = [0] * 256
+        for v in range(1, 256):
+            lowBit = (v & -v).bit_length() - 1
+            table[v] = table[v & (v - 1)] ^ bitProducts[lowBit]
+        tables.append(tuple(table))
+    return tuple(tables)
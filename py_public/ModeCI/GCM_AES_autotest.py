@@ -355,4 +355,89 @@ plaintext += modeCI.decryptUpdate(expectedCiphertext[4:])
 dummy, flagVerif = modeCI.decryptFinal(expectedTag)
 
 if (ciphertext != expectedCiphertext) or (tag != expectedTag) or (plaintext != expectedPlaintext) or (flagVerif != True):
-    raise Exception("Autotest GCM AES 128 : erreur vecteur NIST (IV 1 octets, entete 16 octets, message 51 octets, flux)")
\ No newline at end of file
+    raise Exception("Autotest GCM AES 128 : erreur vecteur NIST (IV 1 octets, entete 16 octets, message 51 octets, flux)")
+"""
+Partie 2 : Tables de multiplication de GHASH.
+Les tables donnent le même produit que la multiplication bit à bit, et le cache des tables est transparent.
+"""
+
+from py_public.ModeCI.GCM import _GCMcarrylessMultiplication, _GCMmultiplicationTables
+from random import getrandbits
+
+for n in range(20):
+    H = getrandbits(128)
+    tables = _GCMmultiplicationTables(H)
+    y = getrandbits(128)
+    product = 0
+    for i in range(16):
+        product ^= tables[i][(y >> (8 * (15 - i))) & 0xff]
+    if product != _GCMcarrylessMultiplication(y, H):
+        raise Exception("Autotest GCM AES : erreur tables de multiplication de GHASH")
+
+keys = [bytes([k]) * 16 for k in range(3)]
+IV = b'ThisIsAnIV..'
+message = bytes(range(100))
+expectedTags = [GCM(AES128(), tableCacheSize=0).encryptOneShot(IV, message, b'header', key=key)[1] for key in keys]
+modeCI = GCM(AES128(), tableCacheSize=2)
+for k in [0, 1, 0, 2, 1, 1, 0]:  # succès et échecs de cache
+    ciphertext, tag = modeCI.encryptOneShot(IV, message, b'header', key=keys[k])
+    if tag != expectedTags[k]:
+        raise Exception("Autotest GCM AES : erreur cache des tables de GHASH")
+
+"""
+Partie 3 : GHASH agrégé par groupes de 4 blocs.
+Le résultat est identique au calcul bloc par bloc avec la multiplication bit à bit, quel que soit le nombre de blocs.
+"""
+
+modeCI = GCM(AES128())
+modeCI.setKey(bytes(range(16)))
+H = int.from_bytes(AES128().encryptOneShot(bytes(range(16)), bytes(16)), 'big')
+for nbBlocks in [0, 1, 3, 4, 5, 8, 13]:
+    x = bytes([(7 * i + nbBlocks) & 0xff for i in range(16 * nbBlocks)])
+    y = getrandbits(128)
+    expectedY = y
+    for i in range(nbBlocks):
+        expectedY = _GCMcarrylessMultiplication(expectedY ^ int.from_bytes(x[16 * i:16 * (i + 1)], 'big'), H)
+    if modeCI._updateGHASH(x, y) != expectedY or modeCI._updateGHASH(memoryview(x), y) != expectedY:
+        raise Exception("Autotest GCM AES : erreur GHASH agrégé (" + str(nbBlocks) + " blocs)")
+
+"""
+Partie 4 : Chiffrement et déchiffrement par morceaux de tailles irrégulières, donnés en memoryview.
+"""
+
+key = bytes(range(16))
+IV = b'ThisIsAnIV..'
+header = bytes(range(37))
+message = bytes([(5 * i) & 0xff for i in range(1000)])
+expectedCiphertext, expectedTag = GCM(AES128()).encryptOneShot(IV, message, header, key=key)
+expectedPlaintext, flagVerif = GCM(AES128()).decryptOneShot(IV, memoryview(expectedCiphertext), expectedTag,
+                                                            memoryview(header), key=key)
+if (expectedPlaintext != message) or (flagVerif != True):
+    raise Exception("Autotest GCM AES : erreur déchiffrement depuis un memoryview")
+
+modeCI = GCM(AES128())
+modeCI.setKey(key)
+for chunkSizes in [[1], [15, 1, 17], [16], [3, 64, 5, 100], [1000]]:
+    modeCI.encryptInit(IV, memoryview(header))
+    ciphertext = bytearray(0)
+    offset = 0
+    n = 0
+    while offset < len(message):
+        chunkSize = chunkSizes[n % len(chunkSizes)]
+        ciphertext += modeCI.encryptUpdate(memoryview(message)[offset:offset + chunkSize])
+        offset += chunkSize
+        n += 1
+    dummy, tag = modeCI.encryptFinal()
+
+    modeCI.decryptInit(IV, header)
+    plaintext = bytearray(0)
+    offset = 0
+    while offset < len(ciphertext):
+        chunkSize = chunkSizes[n % len(chunkSizes)]
+        plaintext += modeCI.decryptUpdate(memoryview(ciphertext)[offset:offset + chunkSize])
+        offset += chunkSize
+        n += 1
+    dummy, flagVerif = modeCI.decryptFinal(tag)
+
+    if (ciphertext != expectedCiphertext) or (tag != expectedTag) or (plaintext != message) or (flagVerif != True):
+        raise Exception("Autotest GCM AES : erreur chiffrement par morceaux " + str(chunkSizes))
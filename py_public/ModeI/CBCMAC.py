@@ -28,7 +28,7 @@
 
 from py_abstract.ModeI import ModeI
 from py_abstract.BlockCipher import BlockCipher
-from py_public.ModeC.CBC import CBC
+from py_abstract.Error import *
 
 
 class CBCMAC(ModeI):
@@ -37,27 +37,62 @@ class CBCMAC(ModeI):
         Mode de protection en intégrité CBCMAC tel que défini dans FIPS 113.
         La version FIPS 113 est connue pour avoir de nombreuses vulnérabilités.
         Cette classe ne devrait pas être utilisée autrement que pour le mode CCM.
+        Seuls la valeur de chainage et un bloc incomplet sont conservés : la mémoire utilisée ne dépend pas du message.
 
         @param blockCipher: instantiation du block cipher à utiliser avec le mode CBCMAC.
         """
         super().__init__("CBCMAC", blockCipher)
-        self._CBC = CBC(self._blockCipher)  # Instantiation du mode CBC
-        self._tag = bytearray(0)
+        self._tag = bytearray(self._blockSizeT8)  # Valeur de chainage, chiffrée en place
+        self._incompleteBlock = bytearray(0)  # Bloc incomplet en attente
+        self._emptyMessage = True  # Aucun bloc traité : le tag est vide
 
     def setKey(self, key):
-        self._CBC.setKey(key)
+        self._blockCipher.setKey(key)
 
     def protectInit(self):
-        self._CBC.encryptInit(bytearray(self._blockSizeT8))  # Initialisation de CBC avec un IV nul
+        self._tag = bytearray(self._blockSizeT8)  # IV nul
+        self._incompleteBlock = bytearray(0)
+        self._emptyMessage = True
 
     def protectUpdate(self, message, messageSizeT1 = None):
-        self._tag += self._CBC.encryptUpdate(message, messageSizeT1)  # Calcul du chiffré CBC
-        if len(self._tag) > self._blockSizeT8:  # Seul le dernier bloc est conservé
-            self._tag = self._tag[-self._blockSizeT8:]
+        if messageSizeT1 is None:
+            messageSizeT1 = 8 * len(message)
+        if (messageSizeT1 % 8) != 0:
+            raise ErrNotImplemented
+        messageSizeT8 = messageSizeT1 // 8
+
+        blockSizeT8 = self._blockSizeT8
+        tag = self._tag
+        chaining = int.from_bytes(tag, 'big')
+        with memoryview(message) as view:  # Blocs lus sans copie
+            offset = 0
+            if len(self._incompleteBlock) > 0:  # Complétion du bloc incomplet précédent
+                offset = min(blockSizeT8 - len(self._incompleteBlock), messageSizeT8)
+                self._incompleteBlock += view[:offset]
+                if len(self._incompleteBlock) < blockSizeT8:
+                    return
+                self._emptyMessage = False
+                tag[:] = (chaining ^ int.from_bytes(self._incompleteBlock, 'big')).to_bytes(blockSizeT8, 'big')
+                self._blockCipher.encryptInto(tag, tag)  # Chiffrement en place
+                chaining = int.from_bytes(tag, 'big')
+                del self._incompleteBlock[:]
+
+            end = offset + ((messageSizeT8 - offset) // blockSizeT8) * blockSizeT8
+            if offset < end:
+                self._emptyMessage = False
+            while offset < end:  # Blocs complets
+                tag[:] = (chaining ^ int.from_bytes(view[offset:offset + blockSizeT8], 'big')).to_bytes(blockSizeT8, 'big')
+                self._blockCipher.encryptInto(tag, tag)  # Chiffrement en place
+                chaining = int.from_bytes(tag, 'big')
+                offset += blockSizeT8
+            self._incompleteBlock += view[end:messageSizeT8]
 
     def protectFinal(self):
-        self._CBC.encryptFinal()
-        return self._tag
+        if len(self._incompleteBlock) != 0:  # Blocs incomplets interdits pour CBCMAC
+            raise ErrParameters
+        if self._emptyMessage:  # Pas de bloc chiffré : tag vide, comme le dernier bloc d'un chiffré CBC vide
+            return bytearray(0)
+        return bytearray(self._tag)
 
     def unprotectInit(self):
         return self.protectInit()
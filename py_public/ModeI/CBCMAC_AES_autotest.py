@@ -0,0 +1,66 @@
+#  *********************************************************************************************************************
+#  Copyright (c) 2022-2023 by THALES
+#  All rights reserved.
+#  SIX Background Intellectual Property (69333045)
+#  ---------------------------------------------------------------------------------------------------------------------
+#  Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+#  following conditions are met:
+#  * Redistributions of source code must retain the present copyright notice, this list of conditions and the following
+#  disclaimer.
+#  * Redistributions in binary form must reproduce the present copyright notice, this list of conditions and the
+#  following disclaimer in the documentation and/or other materials provided with the distribution.
+#  * Neither the name of THALES nor the names of its contributors may be used to endorse or promote products derived
+#  from this software without specific prior written permission.
+#  ---------------------------------------------------------------------------------------------------------------------
+#  PART OF THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS ``AS IS'' AND SHALL REMAIN SUBJECT
+#  TO THEIR APPLICABLE TERMS AND CONDITIONS OF LICENCE. ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED
+#  TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+#  SHALL THE REGENTS AND CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF
+#  USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#  ---------------------------------------------------------------------------------------------------------------------
+#  SCR Python Cryptographic Library (SPCL)
+#  File : CBCMAC_AES_autotest.py
+#  Classification : OPEN
+#  *********************************************************************************************************************
+
+from py_public.ModeI.CBCMAC import CBCMAC
+from py_public.ModeC.CBC import CBC
+from py_public.BlockCipher.AES import AES128
+
+"""
+Partie 1 : Comparaison avec le dernier bloc d'un chiffré CBC à IV nul
+"""
+
+key = bytes(range(16))
+message = bytes(range(100, 196))
+expected = CBC(AES128()).encryptOneShot(bytes(16), message, key=key)[-16:]
+
+func = CBCMAC(AES128())
+if func.protectOneShot(message, key=key) != expected:
+    raise Exception("Autotest CBCMAC AES 128 : erreur tag (one shot)")
+
+func.protectInit()
+for offset, end in [(0, 5), (5, 16), (16, 16), (16, 50), (50, 96)]:
+    func.protectUpdate(memoryview(message)[offset:end])
+if func.protectFinal() != expected:
+    raise Exception("Autotest CBCMAC AES 128 : erreur tag (flux)")
+
+"""
+Partie 2 : Message vide et bloc incomplet
+Le tag d'un message vide est vide, y compris après un premier message sur la même instance.
+"""
+
+if func.protectOneShot(b'', key=key) != b'':
+    raise Exception("Autotest CBCMAC AES 128 : erreur message vide")
+
+func.protectInit()
+func.protectUpdate(message[:20])
+try:
+    func.protectFinal()
+except Exception:
+    pass
+else:
+    raise Exception("Autotest CBCMAC AES 128 : erreur bloc incomplet accepté")
@@ -29,47 +29,61 @@
 from py_abstract.ModeI import ModeI
 from py_abstract.BlockCipher import BlockCipher
 from py_abstract.Error import *
-from py_public.Toolbox.ByteArrayTools import ByteArray_XOR
+
+from collections import OrderedDict
 
 
 class CMAC(ModeI):
-    def __init__(self, blockCipher: BlockCipher):
+    def __init__(self, blockCipher: BlockCipher, subKeyCacheSize=4):
         """!
         Primitive de protection en intégrité CMAC.
         Standard défini par NIST SP 800-38B.
 
         @param blockCipher: (BlockCipher) algorithme de chiffrement par bloc instancié
+        @param subKeyCacheSize: (int) optionnel, nombre de clés dont les sous-clés K1 et K2 sont conservées dans un cache
+        LRU (4 par défaut : un PRF appelé avec un petit ensemble de clés ne recalcule pas L = E_K(0))
         """
         super().__init__("CMAC", blockCipher)
 
         self._cache = bytearray(0)  # Stores parts of the message that are less than blockSize long
         self._cacheLenT1 = 0
         self._currentTag = bytearray(0)  # Calcul du tag intermédiaire
-        self._subKey1 = bytearray(self._blockSizeT8)
-        self._subKey2 = bytearray(self._blockSizeT8)
+        self._subKey1 = 0  # Sous-clés sous forme d'entiers
+        self._subKey2 = 0
+
+        if subKeyCacheSize < 0:
+            raise ErrParameters
+        self._subKeyCacheSize = subKeyCacheSize
+        self._subKeyCache = OrderedDict()  # Cache LRU clé -> (K1, K2)
 
     def setKey(self, key):
         self._blockCipher.setKey(key)
-
-        # subKey generation
+        if self._subKeyCacheSize > 0:
+            cacheKey = bytes(key)
+            cached = self._subKeyCache.get(cacheKey)
+            if cached is not None:
+                self._subKeyCache.move_to_end(cacheKey)  # Clé la plus récemment utilisée
+                self._subKey1, self._subKey2 = cached
+                return
+
+        # subKey generation : doublements dans GF(2^n) sur des entiers de la taille du bloc
         if self._blockSizeT8 == 8:
             xorval = 0x1b
         elif self._blockSizeT8 == 16:
             xorval = 0x87
         else:
             raise ErrParameters
+        blockSizeT1 = 8 * self._blockSizeT8
+        mask = (1 << blockSizeT1) - 1
 
-        encryptzeros = self._blockCipher.encrypt(bytearray(self._blockSizeT8))  # L
+        L = int.from_bytes(self._blockCipher.encrypt(bytearray(self._blockSizeT8)), 'big')
+        self._subKey1 = ((L << 1) & mask) ^ (xorval * (L >> (blockSizeT1 - 1)))
+        self._subKey2 = ((self._subKey1 << 1) & mask) ^ (xorval * (self._subKey1 >> (blockSizeT1 - 1)))
 
-        msb1 = encryptzeros[0] >> 7
-        for i in range(self._blockSizeT8 - 1):
-            self._subKey1[i] = ((encryptzeros[i] << 1) & 0xff) ^ (encryptzeros[i + 1] >> 7)
-        self._subKey1[-1] = (encryptzeros[-1] << 1) & 0xff ^ (xorval * msb1)
-
-        msb2 = self._subKey1[0] >> 7
-        for i in range(self._blockSizeT8 - 1):
-            self._subKey2[i] = ((self._subKey1[i] << 1) & 0xff) ^ (self._subKey1[i + 1] >> 7)
-        self._subKey2[-1] = (self._subKey1[-1] << 1) & 0xff ^ (xorval * msb2)
+        if self._subKeyCacheSize > 0:
+            self._subKeyCache[cacheKey] = (self._subKey1, self._subKey2)
+            if len(self._subKeyCache) > self._subKeyCacheSize:
+                self._subKeyCache.popitem(last=False)  # Éviction de la clé la moins récemment utilisée
 
     def protectInit(self):
         self._cache = bytearray(0)
@@ -84,24 +98,45 @@ class CMAC(ModeI):
             messageSizeT1 = 8 * len(message)
         if (messageSizeT1 % 8) != 0:
             raise ErrNotImplemented
-
-        self._cache += message
-        self._cacheLenT1 += messageSizeT1
-
-        while self._cacheLenT1 > self._blockSizeT8 * 8:
-            currentBlock = self._cache[:self._blockSizeT8]  # nouveau block entier
-            self._cache = self._cache[self._blockSizeT8:]
-            self._cacheLenT1 -= self._blockSizeT8 * 8
-            self._currentTag = self._blockCipher.encrypt(ByteArray_XOR(currentBlock, self._currentTag))  # update du tag
+        messageSizeT8 = messageSizeT1 // 8
+
+        # Le dernier bloc (complet ou non) reste dans le cache jusqu'à protectFinal, qui le masque avec une sous-clé.
+        # Le cache ne contient donc jamais plus d'un bloc : les blocs suivants sont lus directement dans le message.
+        blockSizeT8 = self._blockSizeT8
+        currentTag = self._currentTag
+        encryptInto = self._blockCipher.encryptInto
+        chaining = int.from_bytes(currentTag, 'big')
+        with memoryview(message) as view:  # Blocs lus sans copie
+            offset = 0
+            if len(self._cache) > 0:  # Complétion du bloc en cache
+                offset = min(blockSizeT8 - len(self._cache), messageSizeT8)
+                self._cache += view[:offset]
+                if offset == messageSizeT8:  # Pas de données au-delà : le bloc en cache est peut-être le dernier
+                    self._cacheLenT1 = 8 * len(self._cache)
+                    return
+                currentTag[:] = (chaining ^ int.from_bytes(self._cache, 'big')).to_bytes(blockSizeT8, 'big')
+                encryptInto(currentTag, currentTag)  # update du tag en place
+                chaining = int.from_bytes(currentTag, 'big')
+                del self._cache[:]
+
+            end = offset + ((messageSizeT8 - offset - 1) // blockSizeT8) * blockSizeT8  # au moins 1 octet conservé
+            while offset < end:
+                currentTag[:] = (chaining ^ int.from_bytes(view[offset:offset + blockSizeT8], 'big')).to_bytes(blockSizeT8, 'big')
+                encryptInto(currentTag, currentTag)  # update du tag en place
+                chaining = int.from_bytes(currentTag, 'big')
+                offset += blockSizeT8
+            self._cache += view[end:messageSizeT8]
+        self._cacheLenT1 = 8 * len(self._cache)
 
     def protectFinal(self, digestSizeT8):
         if self._cacheLenT1 == self._blockSizeT8 * 8:  # padding du dernier block
-            finalblock = ByteArray_XOR(self._cache, self._subKey1)
+            finalblock = int.from_bytes(self._cache, 'big') ^ self._subKey1
         else:
             self._cache += bytes([0x80]) + bytearray(self._blockSizeT8 - len(self._cache) - 1)
-            finalblock = ByteArray_XOR(self._cache, self._subKey2)
+            finalblock = int.from_bytes(self._cache, 'big') ^ self._subKey2
 
-        finalcipher = self._blockCipher.encrypt(ByteArray_XOR(finalblock, self._currentTag))  # dernier update
+        finalblock ^= int.from_bytes(self._currentTag, 'big')
+        finalcipher = self._blockCipher.encrypt(finalblock.to_bytes(self._blockSizeT8, 'big'))  # dernier update
         return bytes(finalcipher[:digestSizeT8])
 
     def unprotectInit(self):
@@ -107,4 +107,59 @@ if tag != expected:
 tag = func.protectOneShot(message, 10, key=key)
 
 if tag != expected:
-    raise Exception("Autotest CMAC AES 256 : Erreur vecteur NIST (message 10 octets, tag 10 octets, one shot)")
\ No newline at end of file
+    raise Exception("Autotest CMAC AES 256 : Erreur vecteur NIST (message 10 octets, tag 10 octets, one shot)")
+"""
+Partie 2 : Mise à jour par morceaux de tailles irrégulières, donnés en memoryview.
+Le cache ne dépasse jamais un bloc.
+"""
+
+key = bytes(range(16))
+func = CMAC(AES128())
+for messageSizeT8 in [0, 1, 15, 16, 17, 32, 33, 100]:
+    message = bytes([(3 * i) & 0xff for i in range(messageSizeT8)])
+    expected = func.protectOneShot(message, 16, key=key)
+    for chunkSizes in [[1], [15, 1, 17], [16], [3, 32]]:
+        func.protectInit()
+        offset = 0
+        n = 0
+        while offset < messageSizeT8:
+            chunkSize = chunkSizes[n % len(chunkSizes)]
+            func.protectUpdate(memoryview(message)[offset:offset + chunkSize])
+            offset += chunkSize
+            n += 1
+        if func.protectFinal(16) != expected:
+            raise Exception("Autotest CMAC AES 128 : erreur mise à jour par morceaux " + str(chunkSizes))
+
+
+"""
+Partie 3 : Cache des sous-clés.
+Les sous-clés restituées par le cache, après alternance de clés et éviction, donnent les mêmes tags qu'un CMAC sans cache.
+Le calcul des sous-clés chiffre un bloc nul : les chiffrements de ce bloc comptent les clés absentes du cache.
+"""
+
+
+class _AES128Counter(AES128):
+    def __init__(self):
+        super().__init__()
+        self.nbZeroBlocks = 0
+
+    def encrypt(self, block):
+        if not any(block):
+            self.nbZeroBlocks += 1
+        return super().encrypt(block)
+
+
+keys = [bytes([i] * 16) for i in range(6)]
+message = bytes(range(40))
+reference = CMAC(AES128(), subKeyCacheSize=0)
+blockCipher = _AES128Counter()
+func = CMAC(blockCipher, subKeyCacheSize=2)
+# Clé utilisée, puis sous-clés calculées (True) ou restituées par le cache (False)
+for i, computed in [(0, True), (1, True), (0, False), (2, True), (1, True), (3, True), (4, True), (5, True), (4, False),
+                    (0, True), (5, True)]:
+    nbZeroBlocks = blockCipher.nbZeroBlocks
+    func.setKey(keys[i])
+    if (blockCipher.nbZeroBlocks - nbZeroBlocks == 1) != computed:
+        raise Exception("Autotest CMAC AES 128 : erreur éviction du cache des sous-clés")
+    if func.protectOneShot(message, 16) != reference.protectOneShot(message, 16, key=keys[i]):
+        raise Exception("Autotest CMAC AES 128 : erreur cache des sous-clés")
@@ -28,7 +28,9 @@
 
 from py_abstract.ModeI import ModeI
 from py_abstract.HashFunction import HashFunction
-from py_public.Toolbox.ByteArrayTools import ByteArray_XOR
+from py_abstract.Error import ErrNotImplemented
+
+from concurrent.futures import ThreadPoolExecutor
 
 
 class HMAC(ModeI):
@@ -43,10 +45,17 @@ class HMAC(ModeI):
         self._key = bytearray(0)
         self._ipad = bytearray([0x36] * self._blockSizeT8)
         self._opad = bytearray([0x5c] * self._blockSizeT8)
+        self._innerKey = bytes(0)  # K' xor ipad
+        self._outerKey = bytes(0)  # K' xor opad
+        self._innerState = None  # Fonction de hachage ayant absorbé K' xor ipad (si elle peut être copiée)
+        self._outerState = None  # Fonction de hachage ayant absorbé K' xor opad (si elle peut être copiée)
+        self._hashFunction = hashFunction  # Calcul en cours
 
     def setKey(self, key):
         """!
         Sets the key.
+        The padded keys are computed once, and when the hash function can be copied, the states having absorbed them
+        are kept: each MAC then starts from copies of these states instead of hashing the padded keys again.
 
         @param key: (bytes ou bytearray) key.
         """
@@ -59,14 +68,36 @@ class HMAC(ModeI):
         else:
             self._key = bytearray(key) + bytearray(self._blockSizeT8 - len(key))  # padding(K)
 
+        key = int.from_bytes(self._key, 'big')
+        self._innerKey = (key ^ int.from_bytes(self._ipad, 'big')).to_bytes(self._blockSizeT8, 'big')  # K' xor ipad
+        self._outerKey = (key ^ int.from_bytes(self._opad, 'big')).to_bytes(self._blockSizeT8, 'big')  # K' xor opad
+
+        self._innerState = None
+        self._outerState = None
+        try:  # Précalcul des états internes
+            self._blockCipher.init()
+            self._blockCipher.update(self._innerKey)
+            self._innerState = self._blockCipher.copy()
+            self._blockCipher.init()
+            self._blockCipher.update(self._outerKey)
+            self._outerState = self._blockCipher.copy()
+        except Exception as error:
+            if error is not ErrNotImplemented:  # Les erreurs du module Error sont des instances, pas des classes
+                raise
+            self._innerState = None  # Fonction de hachage sans copie d'état
+            self._outerState = None
+
     def protectInit(self):
         """!
         Initializes the computation of the message authentication code.
         Unlike the generic inegrity mode, HMAC has no IV.
         """
-        self._blockCipher.init()
-        tmp = ByteArray_XOR(self._key, self._ipad)  # K' xor ipad
-        self._blockCipher.update(tmp)  # H((K' xor ipad) || ...
+        if self._innerState is not None:
+            self._hashFunction = self._innerState.copy()  # H((K' xor ipad) || ... sans nouveau hachage de la clé
+        else:
+            self._hashFunction = self._blockCipher
+            self._hashFunction.init()
+            self._hashFunction.update(self._innerKey)  # H((K' xor ipad) || ...
 
     def protectUpdate(self, message, messageSizeT1=None):
         """!
@@ -75,7 +106,7 @@ class HMAC(ModeI):
         @param message: (bytes or bytearray) message to protect.
         @param messageSizeT1: (int) optional, message size in bits.
         """
-        self._blockCipher.update(message, messageSizeT1)  # H((K' xor ipad) || m ...)
+        self._hashFunction.update(message, messageSizeT1)  # H((K' xor ipad) || m ...)
 
     def protectFinal(self):
         """!
@@ -83,9 +114,55 @@ class HMAC(ModeI):
 
         @return:(bytearray) MAC.
         """
-        tmp = ByteArray_XOR(self._key, self._opad)  # K' xor opad
-        tmp += self._blockCipher.final()  # (K' xor opad) || H((K' xor ipad) || m)
-        return self._blockCipher.oneShot(tmp)
+        innerDigest = self._hashFunction.final()  # H((K' xor ipad) || m)
+        if self._outerState is not None:
+            outer = self._outerState.copy()
+            outer.update(innerDigest)  # H((K' xor opad) || H((K' xor ipad) || m))
+            return outer.final()
+        return self._blockCipher.oneShot(self._outerKey + innerDigest)
+
+    def protectMany(self, messages, nbWorkers=0, concatenate=False):
+        """!
+        Computes the message authentication codes of several messages under the loaded key.
+        When the hash function can be copied, each MAC starts from copies of the states precomputed by setKey, as
+        protectInit does: sequentially, the cost is the same as a protectInit/protectUpdate/protectFinal loop.
+        The thread pool only pays off for long messages (tens of kilobytes), on several cores and with a hash function
+        releasing the GIL such as hashlib; for short messages, its scheduling cost exceeds the hashing time.
+
+        @param messages: (iterable of bytes, bytearray or memoryview) messages to protect.
+        @param nbWorkers: (int) optional, number of threads (no thread pool by default), for long messages only.
+        Ignored if the hash function cannot be copied.
+        @param concatenate: (Boolean) optional, returns the concatenation of the MACs in a single buffer.
+        @return:(list of bytes or bytearray, or bytearray) MACs, in the order of the messages.
+        """
+        if self._innerState is None:  # Fonction de hachage sans copie d'état : calcul séquentiel classique
+            tags = [self._blockCipher.oneShot(self._outerKey + self._blockCipher.oneShot(self._innerKey + message))
+                    for message in messages]
+        elif nbWorkers > 1:
+            with ThreadPoolExecutor(max_workers=nbWorkers) as executor:
+                tags = list(executor.map(self._protectFromStates, messages))  # Résultats dans l'ordre des messages
+        else:
+            tags = [self._protectFromStates(message) for message in messages]
+
+        if not concatenate:
+            return tags
+        output = bytearray(len(tags) * self._tagSizeT8)  # Allocation unique de la sortie
+        for i in range(len(tags)):
+            output[i * self._tagSizeT8:(i + 1) * self._tagSizeT8] = tags[i]
+        return output
+
+    def _protectFromStates(self, message):
+        """!
+        Calcul du MAC d'un message à partir de copies des états précalculés, sans modifier l'état courant.
+
+        @param message: (bytes, bytearray ou memoryview) message à protéger
+        @return:(bytes ou bytearray) MAC
+        """
+        inner = self._innerState.copy()
+        inner.update(message)  # H((K' xor ipad) || m)
+        outer = self._outerState.copy()
+        outer.update(inner.final())  # H((K' xor opad) || H((K' xor ipad) || m))
+        return outer.final()
 
     def unprotectInit(self):
         """!
@@ -28,6 +28,9 @@
 
 from py_public.HashFunction.SHA256 import SHA256
 from py_public.ModeI.HMAC import HMAC
+from py_abstract.HashFunction import HashFunction
+
+from hashlib import sha256
 
 """
 Partie 1 : Vecteurs de tests du NIST
@@ -101,4 +104,71 @@ modeI.unprotectUpdate(message[57:])
 verif = modeI.unprotectFinal(wrongTag)
 
 if verif:
-    raise Exception("Autotest HMAC SHA256 : erreur vecteur NIST (unprotect init/update/final avec tag incorrect)")
\ No newline at end of file
+    raise Exception("Autotest HMAC SHA256 : erreur vecteur NIST (unprotect init/update/final avec tag incorrect)")
+
+"""
+Partie 2 : États internes précalculés par clé.
+HMAC sur SHA256 de hashlib et sur SHA256 natif (copies des états après absorption des clés paddées) donnent les
+mêmes MAC, y compris après un changement de clé et pour des clés longues.
+"""
+
+from py_public.HashFunction.HashFunction_hashlib import SHA256 as SHA256_hashlib
+
+modeI = HMAC(SHA256())
+modeIhashlib = HMAC(SHA256_hashlib())
+for key in [b'', b'key', bytes(range(64)), bytes(range(100)), b'key']:
+    modeI.setKey(key)
+    modeIhashlib.setKey(key)
+    for message in [b'', b'message', bytes(range(200))]:
+        tag = modeI.protectOneShot(message)
+        modeIhashlib.protectInit()
+        modeIhashlib.protectUpdate(message[:3])
+        modeIhashlib.protectUpdate(message[3:])
+        if modeIhashlib.protectFinal() != tag or modeIhashlib.protectOneShot(message) != tag:
+            raise Exception("Autotest HMAC SHA256 : erreur états internes précalculés")
+
+"""
+Partie 3 : MAC de plusieurs messages sous la même clé.
+"""
+
+messages = [b'', b'message', bytes(range(200)), memoryview(bytes(range(100)))]
+for modeI in [HMAC(SHA256()), HMAC(SHA256_hashlib())]:
+    modeI.setKey(b'key')
+    expectedTags = [modeI.protectOneShot(message) for message in messages]
+    if (modeI.protectMany(messages) != expectedTags) \
+            or (modeI.protectMany(messages, nbWorkers=3) != expectedTags) \
+            or (modeI.protectMany(messages, concatenate=True) != b''.join(expectedTags)) \
+            or (modeI.protectMany([]) != []):
+        raise Exception("Autotest HMAC SHA256 : erreur MAC de plusieurs messages")
+
+
+"""
+Partie 4 : Fonction de hachage sans copie d'état.
+HMAC hache alors la clé complétée à chaque MAC, avec le même résultat.
+"""
+
+
+class _SHA256WithoutCopy(HashFunction):
+    def __init__(self):
+        super().__init__("SHA256", 64, 32)
+        self._hashlib = sha256()
+
+    def init(self):
+        self._hashlib = sha256()
+
+    def update(self, message, messageSizeT1=None):
+        self._hashlib.update(message)
+
+    def final(self):
+        return self._hashlib.digest()
+
+
+modeI = HMAC(_SHA256WithoutCopy())
+modeI.setKey(b'key')
+reference = HMAC(SHA256_hashlib())
+reference.setKey(b'key')
+expectedTags = [reference.protectOneShot(message) for message in messages]
+if ([modeI.protectOneShot(message) for message in messages] != expectedTags) \
+        or (modeI.protectMany(messages) != expectedTags) \
+        or (modeI.protectMany(messages, nbWorkers=3, concatenate=True) != b''.join(expectedTags)):
+    raise Exception("Autotest HMAC SHA256 : erreur fonction de hachage sans copie d'état")
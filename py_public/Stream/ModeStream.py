@@ -0,0 +1,240 @@
+#  *********************************************************************************************************************
+#  Copyright (c) 2022-2023 by THALES
+#  All rights reserved.
+#  SIX Background Intellectual Property (69333045)
+#  ---------------------------------------------------------------------------------------------------------------------
+#  Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+#  following conditions are met:
+#  * Redistributions of source code must retain the present copyright notice, this list of conditions and the following
+#  disclaimer.
+#  * Redistributions in binary form must reproduce the present copyright notice, this list of conditions and the
+#  following disclaimer in the documentation and/or other materials provided with the distribution.
+#  * Neither the name of THALES nor the names of its contributors may be used to endorse or promote products derived
+#  from this software without specific prior written permission.
+#  ---------------------------------------------------------------------------------------------------------------------
+#  PART OF THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS ``AS IS'' AND SHALL REMAIN SUBJECT
+#  TO THEIR APPLICABLE TERMS AND CONDITIONS OF LICENCE. ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED
+#  TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+#  SHALL THE REGENTS AND CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF
+#  USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#  ---------------------------------------------------------------------------------------------------------------------
+#  SCR Python Cryptographic Library (SPCL)
+#  File : ModeStream.py
+#  Classification : OPEN
+#  *********************************************************************************************************************
+
+from py_abstract.Common import Common
+from py_abstract.ModeC import ModeC
+from py_abstract.ModeCI import ModeCI
+from py_abstract.Error import *
+
+from itertools import chain
+import io
+import mmap
+import os
+
+
+class ModeStream(Common):
+    def __init__(self, mode, chunkSizeT8=1 << 20, useMmap=False):
+        """!
+        Streaming encryption and decryption with a confidentiality mode (ModeC) or an authenticated mode (ModeCI).
+        The input (file path, file object, bytes-like object or iterable of chunks) is processed chunk by chunk: the
+        memory used is bounded by the chunk size, whatever the size of the message.
+        The mode must be keyed and initialized (encryptInit or decryptInit) by the caller, since the initialization
+        parameters depend on the mode.
+
+        @param mode: (ModeC or ModeCI) instantiated mode.
+        @param chunkSizeT8: (int) optional, size in bytes of the chunks read from the input.
+        @param useMmap: (Boolean) optional, reads the input files through a memory mapping instead of read calls.
+        """
+        super().__init__("Stream")
+        if not isinstance(mode, (ModeC, ModeCI)):
+            raise ErrParameters
+        if chunkSizeT8 <= 0:
+            raise ErrParameters
+        self._mode = mode
+        self._chunkSizeT8 = chunkSizeT8
+        self._useMmap = useMmap
+        self._tag = None  # Tag calculé par le dernier chiffrement (ModeCI)
+        self._verification = False  # Résultat de la vérification du dernier déchiffrement
+
+    def getFullName(self):
+        """!
+        Full name of the primitive, combined with the name of the underlying mode.
+
+        @return: (string) full name.
+        """
+        return self.getName() + "-" + self._mode.getFullName()
+
+    def getTag(self):
+        """!
+        Returns the tag computed by the last complete encryption with a ModeCI (None for a ModeC).
+
+        @return: (bytearray) tag.
+        """
+        return self._tag
+
+    def getVerification(self):
+        """!
+        Returns the verification flag of the last complete decryption (always True for a ModeC).
+
+        @return: (Boolean) verification flag.
+        """
+        return self._verification
+
+    def encryptChunks(self, source):
+        """!
+        Generator of the encrypted chunks of a message.
+        For a ModeCI, the tag is available with getTag once the generator is exhausted.
+
+        @param source: (str, os.PathLike, file object, bytes-like object or iterable of bytes) message to encrypt.
+        @return: (generator of bytearray) encrypted chunks.
+        """
+        self._tag = None
+        for chunk in self._readChunks(source):
+            ciphertext = self._mode.encryptUpdate(chunk)
+            if len(ciphertext) > 0:
+                yield ciphertext
+        if isinstance(self._mode, ModeCI):
+            (ciphertext, self._tag) = self._mode.encryptFinal()
+        else:
+            ciphertext = self._mode.encryptFinal()
+        if len(ciphertext) > 0:
+            yield ciphertext
+
+    def decryptChunks(self, source, tag=None):
+        """!
+        Generator of the decrypted chunks of a message.
+        For a ModeCI, the tag is verified at the end only, with getVerification: the decrypted chunks are released
+        before the authenticity is verified and must not be used if the verification fails.
+
+        @param source: (str, os.PathLike, file object, bytes-like object or iterable of bytes) message to decrypt.
+        @param tag: (bytes or bytearray) tag, for a ModeCI.
+        @return: (generator of bytearray) decrypted chunks.
+        """
+        self._verification = False
+        for chunk in self._readChunks(source):
+            plaintext = self._mode.decryptUpdate(chunk)
+            if len(plaintext) > 0:
+                yield plaintext
+        if isinstance(self._mode, ModeCI):
+            (plaintext, self._verification) = self._mode.decryptFinal(tag)
+        else:
+            plaintext = self._mode.decryptFinal()
+            self._verification = True
+        if (plaintext is not None) and (len(plaintext) > 0):
+            yield plaintext
+
+    def encrypt(self, source, destination, prefix=b''):
+        """!
+        Encrypts a message from a source to a destination.
+
+        @param source: (str, os.PathLike, file object, bytes-like object or iterable of bytes) message to encrypt.
+        @param destination: (str, os.PathLike or writable file object) output of the ciphertext.
+        @param prefix: (bytes or bytearray) optional, data written to the destination before the ciphertext (e.g.
+        wrapped keys).
+        @return: (bytearray) tag for a ModeCI, None for a ModeC.
+        """
+        self._writeChunks(chain([prefix], self.encryptChunks(source)), destination)
+        return self._tag
+
+    def decrypt(self, source, destination, tag=None):
+        """!
+        Decrypts a message from a source to a destination.
+        For a ModeCI, the destination must be discarded if the verification fails.
+
+        @param source: (str, os.PathLike, file object, bytes-like object or iterable of bytes) message to decrypt.
+        @param destination: (str, os.PathLike or writable file object) output of the decrypted message.
+        @param tag: (bytes or bytearray) tag, for a ModeCI.
+        @return: (Boolean) verification flag (always True for a ModeC).
+        """
+        self._writeChunks(self.decryptChunks(source, tag), destination)
+        return self._verification
+
+    def readPrefix(self, source, prefixSizeT8):
+        """!
+        Reads the first bytes of a source (e.g. wrapped keys preceding a ciphertext) and returns them with the
+        remaining chunks, which can be given as source to decryptChunks or decrypt.
+        The remaining chunks are read lazily: the source is never loaded in full.
+
+        @param source: (str, os.PathLike, file object, bytes-like object or iterable of bytes) input.
+        @param prefixSizeT8: (int) size in bytes of the prefix.
+        @return: (bytearray, iterable of bytes) prefix (shorter if the source is too short), remaining chunks.
+        """
+        chunks = self._readChunks(source)
+        prefix = bytearray(0)
+        while len(prefix) < prefixSizeT8:
+            chunk = next(chunks, None)
+            if chunk is None:  # Source trop courte
+                break
+            missingSizeT8 = prefixSizeT8 - len(prefix)
+            prefix += chunk[:missingSizeT8]
+            if len(chunk) > missingSizeT8:  # Début des données restantes
+                return prefix, chain([chunk[missingSizeT8:]], chunks)
+        return prefix, chunks
+
+    def _readChunks(self, source):
+        """!
+        Découpe l'entrée en tranches d'au plus chunkSizeT8 octets (ou tranches de l'itérable tel quel).
+
+        @param source: (str, os.PathLike, objet fichier, objet bytes-like ou itérable de bytes) entrée.
+        @return: (générateur de bytes) tranches.
+        """
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, 'rb') as file:
+                yield from self._readFile(file)
+        elif hasattr(source, 'read'):
+            yield from self._readFile(source)
+        elif isinstance(source, (bytes, bytearray, memoryview)):
+            view = memoryview(source)
+            for offset in range(0, len(view), self._chunkSizeT8):
+                yield bytes(view[offset:offset + self._chunkSizeT8])
+            view.release()
+        else:  # Itérable de tranches
+            yield from source
+
+    def _readFile(self, file):
+        """!
+        Lit un fichier ouvert en binaire, à partir de sa position courante, par tranches de chunkSizeT8 octets.
+
+        @param file: (objet fichier) fichier ouvert en lecture binaire.
+        @return: (générateur de bytes) tranches.
+        """
+        mapping = None
+        if self._useMmap:
+            try:
+                start = file.tell()
+                end = os.fstat(file.fileno()).st_size
+                if end <= start:
+                    return
+                mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except (io.UnsupportedOperation, OSError, ValueError):
+                mapping = None  # Flux en mémoire, tube... : lecture par tranches avec read
+        if mapping is not None:
+            with mapping:
+                for offset in range(start, end, self._chunkSizeT8):
+                    yield mapping[offset:min(offset + self._chunkSizeT8, end)]  # Copie d'une tranche seulement
+            file.seek(end)
+            return
+        chunk = file.read(self._chunkSizeT8)
+        while len(chunk) > 0:
+            yield chunk
+            chunk = file.read(self._chunkSizeT8)
+
+    def _writeChunks(self, chunks, destination):
+        """!
+        Écrit des tranches dans un fichier (chemin ou objet fichier).
+
+        @param chunks: (itérable de bytes) tranches.
+        @param destination: (str, os.PathLike ou objet fichier) sortie.
+        """
+        if isinstance(destination, (str, os.PathLike)):
+            with open(destination, 'wb') as file:
+                self._writeChunks(chunks, file)
+        else:
+            for chunk in chunks:
+                if len(chunk) > 0:
+                    destination.write(chunk)
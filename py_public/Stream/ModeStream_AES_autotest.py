@@ -0,0 +1,109 @@
+#  *********************************************************************************************************************
+#  Copyright (c) 2022-2023 by THALES
+#  All rights reserved.
+#  SIX Background Intellectual Property (69333045)
+#  ---------------------------------------------------------------------------------------------------------------------
+#  Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+#  following conditions are met:
+#  * Redistributions of source code must retain the present copyright notice, this list of conditions and the following
+#  disclaimer.
+#  * Redistributions in binary form must reproduce the present copyright notice, this list of conditions and the
+#  following disclaimer in the documentation and/or other materials provided with the distribution.
+#  * Neither the name of THALES nor the names of its contributors may be used to endorse or promote products derived
+#  from this software without specific prior written permission.
+#  ---------------------------------------------------------------------------------------------------------------------
+#  PART OF THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS ``AS IS'' AND SHALL REMAIN SUBJECT
+#  TO THEIR APPLICABLE TERMS AND CONDITIONS OF LICENCE. ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED
+#  TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+#  SHALL THE REGENTS AND CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF
+#  USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#  ---------------------------------------------------------------------------------------------------------------------
+#  SCR Python Cryptographic Library (SPCL)
+#  File : ModeStream_AES_autotest.py
+#  Classification : OPEN
+#  *********************************************************************************************************************
+
+from py_public.BlockCipher.AES import AES128
+from py_public.ModeC.CBC import CBC
+from py_public.ModeC.CTR import CTR
+from py_public.ModeCI.GCM import GCM
+from py_public.Stream.ModeStream import ModeStream
+
+import io
+import os
+import tempfile
+
+key = bytes(range(16))
+IV = bytes(range(16, 32))
+message = bytes(range(256)) * 20
+
+"""
+Partie 1 : Chiffrement et déchiffrement d'un mode C par tranches
+"""
+
+for modeC in [CTR(AES128()), CBC(AES128())]:
+    modeC.setKey(key)
+    expectedCiphertext = modeC.encryptOneShot(IV, message)
+    sources = [message, [message[:1000], message[1000:1001], message[1001:]], io.BytesIO(message)]
+    for source in sources:
+        stream = ModeStream(modeC, chunkSizeT8=100)
+        modeC.encryptInit(IV)
+        ciphertext = b''.join(stream.encryptChunks(source))
+        if ciphertext != expectedCiphertext:
+            raise Exception("Autotest Stream " + modeC.getName() + " AES 128 : erreur chiffrement par tranches")
+
+    stream = ModeStream(modeC, chunkSizeT8=1000)
+    modeC.decryptInit(IV)
+    output = io.BytesIO()
+    if not stream.decrypt(io.BytesIO(expectedCiphertext), output) or output.getvalue() != message:
+        raise Exception("Autotest Stream " + modeC.getName() + " AES 128 : erreur déchiffrement par tranches")
+
+
+"""
+Partie 2 : Chiffrement authentifié de fichiers, avec et sans mmap
+"""
+
+modeCI = GCM(AES128())
+modeCI.setKey(key)
+expectedCiphertext, expectedTag = modeCI.encryptOneShot(IV, message, header=b'header')
+with tempfile.TemporaryDirectory() as directory:
+    plaintextPath = os.path.join(directory, "plaintext")
+    ciphertextPath = os.path.join(directory, "ciphertext")
+    decryptedPath = os.path.join(directory, "decrypted")
+    with open(plaintextPath, 'wb') as file:
+        file.write(message)
+    for useMmap in [False, True]:
+        stream = ModeStream(modeCI, chunkSizeT8=999, useMmap=useMmap)
+        modeCI.encryptInit(IV, b'header')
+        tag = stream.encrypt(plaintextPath, ciphertextPath)
+        with open(ciphertextPath, 'rb') as file:
+            ciphertext = file.read()
+        if (ciphertext != expectedCiphertext) or (tag != expectedTag):
+            raise Exception("Autotest Stream GCM AES 128 : erreur chiffrement de fichier")
+
+        modeCI.decryptInit(IV, b'header')
+        flagVerif = stream.decrypt(ciphertextPath, decryptedPath, tag)
+        with open(decryptedPath, 'rb') as file:
+            plaintext = file.read()
+        if (plaintext != message) or (flagVerif != True):
+            raise Exception("Autotest Stream GCM AES 128 : erreur déchiffrement de fichier")
+
+        modeCI.decryptInit(IV, b'header')
+        if stream.decrypt(ciphertextPath, io.BytesIO(), bytes(16)):
+            raise Exception("Autotest Stream GCM AES 128 : erreur vérification du tag")
+
+
+"""
+Partie 3 : Flux en mémoire avec mmap demandé
+Un BytesIO a une méthode fileno mais ne peut être projeté en mémoire : il est lu par read.
+"""
+
+stream = ModeStream(modeCI, chunkSizeT8=999, useMmap=True)
+modeCI.encryptInit(IV, b'header')
+output = io.BytesIO()
+tag = stream.encrypt(io.BytesIO(message), output)
+if (output.getvalue() != expectedCiphertext) or (tag != expectedTag):
+    raise Exception("Autotest Stream GCM AES 128 : erreur chiffrement d'un flux en mémoire avec mmap")
@@ -57,6 +57,22 @@ def ByteArray_XOR(a, b, c=None, lengthT8=None):
     return c
 
 
+def ByteArray_XORInPlace(a, b, aOffset=0, bOffset=0, lengthT8=None):
+    # a[aOffset:aOffset + lengthT8] ^= b[bOffset:bOffset + lengthT8], a étant un bytearray ou une memoryview modifiable
+    if lengthT8 is None:
+        lengthT8 = len(a) - aOffset
+    if lengthT8 <= 0:
+        return a
+    aView = memoryview(a)
+    bView = memoryview(b)
+    aView[aOffset:aOffset + lengthT8] = (int.from_bytes(aView[aOffset:aOffset + lengthT8], byteorder="big")
+                                         ^ int.from_bytes(bView[bOffset:bOffset + lengthT8], byteorder="big")
+                                         ).to_bytes(lengthT8, byteorder="big")
+    aView.release()
+    bView.release()
+    return a
+
+
 def ByteArray_OR(a, b, c=None, lengthT8=None):
     if lengthT8 is None:
         lengthT8 = len(a)
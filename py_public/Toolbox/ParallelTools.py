@@ -0,0 +1,208 @@
+#  *********************************************************************************************************************
+#  Copyright (c) 2022-2023 by THALES
+#  All rights reserved.
+#  SIX Background Intellectual Property (69333045)
+#  ---------------------------------------------------------------------------------------------------------------------
+#  Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+#  following conditions are met:
+#  * Redistributions of source code must retain the present copyright notice, this list of conditions and the following
+#  disclaimer.
+#  * Redistributions in binary form must reproduce the present copyright notice, this list of conditions and the
+#  following disclaimer in the documentation and/or other materials provided with the distribution.
+#  * Neither the name of THALES nor the names of its contributors may be used to endorse or promote products derived
+#  from this software without specific prior written permission.
+#  ---------------------------------------------------------------------------------------------------------------------
+#  PART OF THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS ``AS IS'' AND SHALL REMAIN SUBJECT
+#  TO THEIR APPLICABLE TERMS AND CONDITIONS OF LICENCE. ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED
+#  TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+#  SHALL THE REGENTS AND CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF
+#  USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#  ---------------------------------------------------------------------------------------------------------------------
+#  SCR Python Cryptographic Library (SPCL)
+#  File : ParallelTools.py
+#  Classification : OPEN
+#  *********************************************************************************************************************
+
+from py_abstract.Error import ErrSequence
+
+from concurrent.futures import ProcessPoolExecutor
+
+_workerBlockCipher = None  # Algorithme de chiffrement par bloc, avec sa clé étendue, propre à chaque processus
+
+
+def _initWorker(blockCipher):
+    global _workerBlockCipher
+    _workerBlockCipher = blockCipher
+
+
+def _encryptChunk(chunk):
+    return _workerBlockCipher.encryptBlocks(chunk)
+
+
+def _decryptChunk(chunk):
+    return _workerBlockCipher.decryptBlocks(chunk)
+
+
+class BlockCipherPool:
+    def __init__(self, blockCipher, nbWorkers):
+        """!
+        Pool of processes encrypting or decrypting independent blocks under the key loaded in blockCipher.
+        The block cipher, with its expanded key, is sent once to each process when the pool is created; the pool is
+        then reused by every call until close. A new pool is required when the key changes.
+
+        @param blockCipher: (BlockCipher) block cipher, key loaded.
+        @param nbWorkers: (int) number of processes.
+        """
+        self._blockSizeT8 = blockCipher.getBlockSizeT8()
+        self._nbWorkers = nbWorkers
+        self._keyCheck = bytes(blockCipher.encrypt(bytes(self._blockSizeT8)))  # Chiffré du bloc nul sous la clé
+        self._executor = ProcessPoolExecutor(max_workers=nbWorkers, initializer=_initWorker, initargs=(blockCipher,))
+
+    def _processBlocks(self, blocks, worker):
+        """!
+        Découpe les blocs en tranches alignées sur la taille de bloc, les traite dans le pool de processus et
+        rassemble les résultats dans l'ordre.
+
+        @param blocks: (bytes, bytearray ou memoryview) blocs indépendants, taille multiple de la taille de bloc.
+        @param worker: (function) traitement d'une tranche.
+        @return: (bytearray) concaténation des blocs traités.
+        """
+        if self._executor is None:
+            raise ErrSequence
+        blockSizeT8 = self._blockSizeT8
+        nbBlocks = len(blocks) // blockSizeT8
+        nbChunks = 4 * self._nbWorkers  # Plusieurs tranches par processus pour équilibrer la charge
+        chunkSizeT8 = ((nbBlocks + nbChunks - 1) // nbChunks) * blockSizeT8
+        output = bytearray(nbBlocks * blockSizeT8)  # Allocation unique de la sortie
+        if nbBlocks == 0:
+            return output
+        blocks = memoryview(blocks)
+        chunks = [bytes(blocks[offset:offset + chunkSizeT8]) for offset in range(0, len(output), chunkSizeT8)]
+        blocks.release()
+
+        offset = 0
+        for result in self._executor.map(worker, chunks):  # Résultats dans l'ordre des tranches
+            output[offset:offset + len(result)] = result
+            offset += len(result)
+        return output
+
+    def encryptBlocks(self, blocks):
+        """!
+        Parallel encryption of independent blocks (ECB, CTR keystream).
+
+        @param blocks: (bytes, bytearray or memoryview) blocks to encrypt, size multiple of the block size.
+        @return: (bytearray) concatenation of the encrypted blocks.
+        """
+        return self._processBlocks(blocks, _encryptChunk)
+
+    def decryptBlocks(self, blocks):
+        """!
+        Parallel decryption of independent blocks (ECB, CBC).
+
+        @param blocks: (bytes, bytearray or memoryview) blocks to decrypt, size multiple of the block size.
+        @return: (bytearray) concatenation of the decrypted blocks.
+        """
+        return self._processBlocks(blocks, _decryptChunk)
+
+    def hasKeyOf(self, blockCipher):
+        """!
+        Checks that the processes hold the key currently loaded in blockCipher, by comparing the encryptions of the
+        null block.
+
+        @param blockCipher: (BlockCipher) block cipher, key loaded.
+        @return: (Boolean) True if the pool encrypts under the key of blockCipher.
+        """
+        return bytes(blockCipher.encrypt(bytes(self._blockSizeT8))) == self._keyCheck
+
+    def close(self):
+        """!
+        Shuts the processes of the pool down.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+class ParallelBlocks:
+    """!
+    Mixin of the confidentiality modes whose independent blocks may be processed by a BlockCipherPool.
+    The mode sets _nbWorkers and _parallelMinSizeT8 in its constructor and calls _checkPool in its init methods.
+    The pool is kept from one update and one message to the next while the block cipher holds the same key, whoever
+    loaded it.
+    """
+    _nbWorkers = 0
+    _parallelMinSizeT8 = 0
+    _pool = None
+
+    def _isParallel(self, sizeT8):
+        """!
+        Indique si sizeT8 octets de blocs indépendants sont traités par le pool de processus.
+
+        @param sizeT8: (int) taille en octets des blocs à traiter.
+        @return: (Boolean) vrai pour un traitement parallèle.
+        """
+        return (self._nbWorkers > 1) and (sizeT8 >= self._parallelMinSizeT8)
+
+    def _checkPool(self):
+        """!
+        Arrête le pool de processus si la clé chargée dans l'algorithme de chiffrement par bloc a changé depuis sa
+        création (setKey du mode ou de l'algorithme partagé).
+        """
+        if (self._pool is not None) and not self._pool.hasKeyOf(self._blockCipher):
+            self.close()
+
+    def _getPool(self):
+        """!
+        Retourne le pool de processus, créé au premier besoin avec la clé chargée.
+
+        @return: (BlockCipherPool) pool de processus.
+        """
+        if self._pool is None:
+            self._pool = BlockCipherPool(self._blockCipher, self._nbWorkers)
+        return self._pool
+
+    def close(self):
+        """!
+        Shuts the processes of the parallel processing down, if any.
+        A pool is created again by the next update processed in parallel.
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+
+
+def Parallel_encryptBlocks(blockCipher, blocks, nbWorkers):
+    """!
+    Chiffrement parallèle de blocs indépendants (ECB) par un pool de processus temporaire.
+    Pour plusieurs appels sous la même clé, un BlockCipherPool évite de recréer les processus.
+
+    @param blockCipher: (BlockCipher) algorithme de chiffrement par bloc, clé chargée.
+    @param blocks: (bytes, bytearray ou memoryview) blocs à chiffrer, taille multiple de la taille de bloc.
+    @param nbWorkers: (int) nombre de processus.
+    @return: (bytearray) concaténation des blocs chiffrés.
+    """
+    pool = BlockCipherPool(blockCipher, nbWorkers)
+    try:
+        return pool.encryptBlocks(blocks)
+    finally:
+        pool.close()
+
+
+def Parallel_decryptBlocks(blockCipher, blocks, nbWorkers):
+    """!
+    Déchiffrement parallèle de blocs indépendants (ECB, CBC) par un pool de processus temporaire.
+    Pour plusieurs appels sous la même clé, un BlockCipherPool évite de recréer les processus.
+
+    @param blockCipher: (BlockCipher) algorithme de chiffrement par bloc, clé chargée.
+    @param blocks: (bytes, bytearray ou memoryview) blocs à déchiffrer, taille multiple de la taille de bloc.
+    @param nbWorkers: (int) nombre de processus.
+    @return: (bytearray) concaténation des blocs déchiffrés.
+    """
+    pool = BlockCipherPool(blockCipher, nbWorkers)
+    try:
+        return pool.decryptBlocks(blocks)
+    finally:
+        pool.close()
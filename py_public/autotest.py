@@ -33,7 +33,9 @@ import py_public.BlockCipher.AES_autotest
 """------------------------------
 Autotests fonctions de hashage et XOF
 ------------------------------"""
+import py_public.HashFunction.SHA256_autotest
 import py_public.HashFunction.HashFunction_hashlib_autotest
+import py_public.HashFunction.HashFunction_dispatch_autotest
 """------------------------------
 Autotests Mode C
 ------------------------------"""
@@ -45,12 +47,18 @@ Autotests Mode I
 ------------------------------"""
 import py_public.ModeI.HMAC_SHA256_autotest
 import py_public.ModeI.HMAC_SHA512_autotest
+import py_public.ModeI.CBCMAC_AES_autotest
+import py_public.ModeI.CMAC_AES_autotest
 """------------------------------
 Autotests Mode CI
 ------------------------------"""
 import py_public.ModeCI.GCM_AES_autotest
 import py_public.ModeCI.CCM_AES_autotest
 """------------------------------
+Autotests chiffrement par flux de fichiers
+------------------------------"""
+import py_public.Stream.ModeStream_AES_autotest
+"""------------------------------
 Autotests KDF et KDM
 ------------------------------"""
 import py_public.KDF.SP800_108_CTR_HMAC_SHA256_autotest
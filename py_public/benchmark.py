@@ -0,0 +1,159 @@
+#  *********************************************************************************************************************
+#  Copyright (c) 2022-2023 by THALES
+#  All rights reserved.
+#  SIX Background Intellectual Property (69333045)
+#  ---------------------------------------------------------------------------------------------------------------------
+#  Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+#  following conditions are met:
+#  * Redistributions of source code must retain the present copyright notice, this list of conditions and the following
+#  disclaimer.
+#  * Redistributions in binary form must reproduce the present copyright notice, this list of conditions and the
+#  following disclaimer in the documentation and/or other materials provided with the distribution.
+#  * Neither the name of THALES nor the names of its contributors may be used to endorse or promote products derived
+#  from this software without specific prior written permission.
+#  ---------------------------------------------------------------------------------------------------------------------
+#  PART OF THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS ``AS IS'' AND SHALL REMAIN SUBJECT
+#  TO THEIR APPLICABLE TERMS AND CONDITIONS OF LICENCE. ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED
+#  TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+#  SHALL THE REGENTS AND CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+#  CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF
+#  USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+#  CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#  ---------------------------------------------------------------------------------------------------------------------
+#  SCR Python Cryptographic Library (SPCL)
+#  File : benchmark.py
+#  Classification : OPEN
+#  *********************************************************************************************************************
+
+"""------------------------------
+Mesure du débit (Mo/s) des modes de chiffrement
+Lancement : python -m py_public.benchmark [taille en Mo]
+------------------------------"""
+from py_public.BlockCipher.AES import AES128
+from py_public.ModeC.ECB import ECB
+from py_public.ModeC.CBC import CBC
+from py_public.ModeC.CTR import CTR
+from py_public.ModeCI.GCM import GCM
+from py_abstract.ModeCI import ModeCI
+from time import perf_counter
+from multiprocessing import cpu_count, get_start_method
+import sys
+
+
+def _measure(function, sizeT8, nbRuns=3):
+    """!
+    Mesure le débit d'une fonction traitant sizeT8 octets, meilleur temps sur nbRuns exécutions.
+
+    @param function: (function) fonction sans argument à mesurer.
+    @param sizeT8: (int) nombre d'octets traités par un appel de function.
+    @param nbRuns: (int) optionnel, nombre d'exécutions.
+    @return: (float) débit en Mo/s.
+    """
+    bestTime = None
+    for _ in range(nbRuns):
+        start = perf_counter()
+        function()
+        elapsed = perf_counter() - start
+        if (bestTime is None) or (elapsed < bestTime):
+            bestTime = elapsed
+    return sizeT8 / (1 << 20) / max(bestTime, 1e-9)
+
+
+def _benchmarkModeC(name, mode, data, key, IV=None):
+    """!
+    Affiche le débit du chiffrement et du déchiffrement d'un mode, en une passe puis par morceaux de 4 Ko.
+
+    @param name: (string) nom affiché.
+    @param mode: (ModeC or ModeCI) mode à mesurer.
+    @param data: (bytes or bytearray) message, de taille multiple de la taille de bloc.
+    @param key: (bytes or bytearray) clé.
+    @param IV: (bytes or bytearray) optionnel, IV (None pour ECB).
+    """
+    IVArgs = () if IV is None else (IV,)
+    mode.setKey(key)
+    finalArgs = ()
+    if isinstance(mode, ModeCI):  # Le déchiffrement d'un mode ModeCI vérifie le tag
+        mode.encryptInit(*IVArgs)
+        mode.encryptUpdate(data)
+        finalArgs = (mode.encryptFinal()[1],)
+
+    def encrypt():
+        mode.encryptInit(*IVArgs)
+        mode.encryptUpdate(data)
+        mode.encryptFinal()
+
+    def decrypt():
+        mode.decryptInit(*IVArgs)
+        mode.decryptUpdate(data)
+        mode.decryptFinal(*finalArgs)
+
+    def encryptChunks():
+        mode.encryptInit(*IVArgs)
+        view = memoryview(data)
+        for offset in range(0, len(data), 4096):
+            mode.encryptUpdate(view[offset:offset + 4096])
+        mode.encryptFinal()
+
+    results = [_measure(encrypt, len(data)), _measure(decrypt, len(data)), _measure(encryptChunks, len(data))]
+    print("%-8s chiffrement %8.2f Mo/s | déchiffrement %8.2f Mo/s | chiffrement par morceaux de 4 Ko %8.2f Mo/s"
+          % (name, results[0], results[1], results[2]))
+
+
+def _benchmarkParallel(data, key, IV, nbWorkers, chunkSizeT8=1 << 16):
+    """!
+    Affiche l'accélération du traitement parallèle : déchiffrement ECB et CBC en une passe, chiffrement CTR par
+    morceaux de chunkSizeT8 octets. Le pool de processus est créé avant la mesure et réutilisé par chaque exécution.
+
+    @param data: (bytes or bytearray) message, de taille multiple de la taille de bloc.
+    @param key: (bytes or bytearray) clé.
+    @param IV: (bytes or bytearray) IV.
+    @param nbWorkers: (int) nombre de processus.
+    @param chunkSizeT8: (int) optionnel, taille des morceaux, seuil du traitement parallèle.
+    """
+    def measure(mode, function):
+        mode.setKey(key)
+        function(mode)  # Création du pool de processus hors mesure
+        throughput = _measure(lambda: function(mode), len(data))
+        mode.close()
+        return throughput
+
+    def decryptECB(mode):
+        mode.decryptInit()
+        mode.decryptUpdate(data)
+
+    def decryptCBC(mode):
+        mode.decryptInit(IV)
+        mode.decryptUpdate(data)
+
+    def encryptCTRChunks(mode):
+        mode.encryptInit(IV)
+        view = memoryview(data)
+        for offset in range(0, len(data), chunkSizeT8):
+            mode.encryptUpdate(view[offset:offset + chunkSizeT8])
+
+    print("Traitement parallèle sur", len(data), "octets,", nbWorkers, "processus,", cpu_count(), "processeur(s)")
+    for name, constructor, function in [("ECB", ECB, decryptECB), ("CBC", CBC, decryptCBC),
+                                        ("CTR", CTR, encryptCTRChunks)]:
+        sequential = measure(constructor(AES128()), function)
+        parallel = measure(constructor(AES128(), nbWorkers=nbWorkers, parallelMinSizeT8=chunkSizeT8), function)
+        print("%-8s séquentiel %8.2f Mo/s | parallèle %8.2f Mo/s | accélération x%.2f"
+              % (name, sequential, parallel, parallel / sequential))
+
+
+if __name__ == "__main__":
+    sizeT8 = int(float(sys.argv[1]) * (1 << 20)) if len(sys.argv) > 1 else 1 << 18
+    sizeT8 -= sizeT8 % 16
+    data = bytes(i & 0xFF for i in range(sizeT8))
+    key = b'benchmarkKey....'
+    IV = b'benchmarkIV.....'
+
+    for tTables in [False, True]:
+        print("Débit sur", sizeT8, "octets, AES-128", "(T-tables)" if tTables else "")
+        _benchmarkModeC("ECB", ECB(AES128(tTables)), data, key)
+        _benchmarkModeC("CBC", CBC(AES128(tTables)), data, key, IV)
+        _benchmarkModeC("CTR", CTR(AES128(tTables)), data, key, IV)
+        _benchmarkModeC("GCM", GCM(AES128(tTables)), data, key, IV[:12])
+
+    if get_start_method() == "fork":  # Les processus reprennent l'état du module sans le réimporter
+        _benchmarkParallel(data, key, IV, max(2, cpu_count()))